@@ -82,3 +82,99 @@ get_python_cmd() {
     echo ""
     return 0
 }
+
+# Run one of the plugin's Python tools
+# Usage: run_tool <tool.py> [args...]
+# Runs it as a module (`python -m`) with tools/ on PYTHONPATH, so Python
+# reuses the cached bytecode in tools/__pycache__ instead of recompiling the
+# whole script on every start. The working directory stays the caller's:
+# the tools fall back to it (git root) to find the project
+# Returns 1 if Python or the tool is missing
+run_tool() {
+    local tool="$1"
+    shift
+    local python_cmd tools_dir
+    python_cmd=$(get_python_cmd)
+    tools_dir="$(get_plugin_root)/tools"
+    [[ -n "$python_cmd" && -f "$tools_dir/$tool" ]] || return 1
+    PYTHONPATH="$tools_dir${PYTHONPATH:+:$PYTHONPATH}" "$python_cmd" -m "${tool%.py}" "$@"
+}
+
+# Build the JSON request for one event (also one line of `emit --batch` input)
+# Usage: emitter_request <type> <subtype> <payload_json> [tool_name]
+emitter_request() {
+    local event_type="$1"
+    local subtype="$2"
+    local payload="$3"
+    local tool_name="${4:-}"
+    local request
+
+    # type/subtype are fixed identifiers; payload is already compact JSON from jq
+    tool_name=${tool_name//\\/\\\\}
+    tool_name=${tool_name//\"/\\\"}
+    request=$(printf '{"type":"%s","subtype":"%s","source":"hook","tool_name":"%s","payload":%s}' \
+        "$event_type" "$subtype" "$tool_name" "$payload")
+    if [[ -z "$tool_name" ]]; then
+        request=${request/\"tool_name\":\"\",/}
+    fi
+    printf '%s\n' "$request"
+}
+
+# Send one prepared request line to the event_store emitter daemon
+# (Work/markers/emitter.sock)
+# Returns 0 only once the daemon has answered that it queued the event;
+# 1 if it is not running, did not answer, or rejected the request
+send_request_to_emitter() {
+    local request="$1"
+    local project_dir socket python_cmd reply
+
+    project_dir=$(detect_project_dir)
+    socket="$project_dir/Work/markers/emitter.sock"
+    [[ -n "$project_dir" && -S "$socket" ]] || return 1
+
+    # bash has no AF_UNIX support, so use the lightest client available
+    if command -v socat >/dev/null 2>&1; then
+        reply=$(printf '%s\n' "$request" | socat -t 1 -T 1 - "UNIX-CONNECT:$socket" 2>/dev/null || true)
+    elif command -v nc >/dev/null 2>&1 && nc -h 2>&1 | grep -q -- '-U'; then
+        reply=$(printf '%s\n' "$request" | nc -U -w 1 "$socket" 2>/dev/null || true)
+    else
+        python_cmd=$(get_python_cmd)
+        [[ -n "$python_cmd" ]] || return 1
+        # -S -E skips site/env processing: a bare interpreter, no event_store import
+        reply=$("$python_cmd" -S -E -c '
+import socket, sys
+s = socket.socket(socket.AF_UNIX)
+s.settimeout(1)
+s.connect(sys.argv[1])
+s.sendall(sys.argv[2].encode() + b"\n")
+sys.stdout.write(s.makefile("rb").readline().decode())
+s.close()' "$socket" "$request" 2>/dev/null || true)
+    fi
+
+    [[ "$reply" == *'"status": "queued"'* ]]
+}
+
+# Send one event to the emitter daemon
+# Usage: send_to_emitter <type> <subtype> <payload_json> [tool_name]
+# Returns 0 if the daemon took the event, 1 if it is not running
+# (callers then fall back to `event_store.py emit`)
+send_to_emitter() {
+    send_request_to_emitter "$(emitter_request "$@")"
+}
+
+# Deliver queued request lines (from emitter_request): each goes to the
+# daemon if it is running; whatever it doesn't take is written with a single
+# `event_store.py emit --batch` instead of one Python start per event
+# Usage: emit_batch <ndjson>
+emit_batch() {
+    local batch="$1"
+    local failed="" line
+
+    while IFS= read -r line; do
+        [[ -n "$line" ]] || continue
+        send_request_to_emitter "$line" || failed+="$line"$'\n'
+    done <<< "$batch"
+    [[ -n "$failed" ]] || return 0
+
+    printf '%s' "$failed" | run_tool event_store.py emit --batch --source hook >/dev/null 2>&1
+}
@@ -41,33 +41,20 @@ fi
 mkdir -p "$PROJECT_DIR/Memory/events"
 mkdir -p "$PROJECT_DIR/Work/markers"
 
-# Helper function to emit events to event_store.py
+# Helper function to queue events for event_store.py
+# Events are collected here and delivered together by flush_events, so a
+# tool call that produces several events still costs at most one Python start
+PENDING_EVENTS=""
 emit_event() {
-    local event_type="$1"
-    local subtype="$2"
-    local payload="$3"
-    local tool_name="${4:-}"
-
-    EVENT_STORE="$PLUGIN_ROOT/tools/event_store.py"
-    PYTHON_CMD=$(get_python_cmd)
-
-    if [[ -f "$EVENT_STORE" && -n "$PYTHON_CMD" ]]; then
-        # Run in background to avoid blocking
-        if [[ -n "$tool_name" ]]; then
-            ("$PYTHON_CMD" "$EVENT_STORE" emit \
-                --type "$event_type" \
-                --subtype "$subtype" \
-                --payload "$payload" \
-                --source "hook" \
-                --tool "$tool_name" >/dev/null 2>&1) &
-        else
-            ("$PYTHON_CMD" "$EVENT_STORE" emit \
-                --type "$event_type" \
-                --subtype "$subtype" \
-                --payload "$payload" \
-                --source "hook" >/dev/null 2>&1) &
-        fi
-    fi
+    PENDING_EVENTS+="$(emitter_request "$1" "$2" "$3" "${4:-}")"$'\n'
+}
+
+# Deliver queued events in the background: daemon first, then a single
+# `event_store.py emit --batch` for whatever it didn't take
+flush_events() {
+    [[ -n "$PENDING_EVENTS" ]] || return 0
+    (emit_batch "$PENDING_EVENTS" >/dev/null 2>&1) &
+    PENDING_EVENTS=""
 }
 
 # Read stdin JSON from Claude Code
@@ -232,5 +219,7 @@ case "$TOOL_NAME" in
         ;;
 esac
 
+flush_events
+
 # Return success (no blocking, no output to user)
 echo "{}"
@@ -47,15 +47,15 @@ fi
 
 if [[ -f "$PATTERN_ANALYZER" && -n "$PYTHON_CMD" ]]; then
     # Check if there's an orphaned session
-    ORPHAN_RESULT=$("$PYTHON_CMD" "$PATTERN_ANALYZER" check-orphan --current-session "$NEW_SESSION_ID" 2>/dev/null || echo '{}')
+    ORPHAN_RESULT=$(run_tool pattern_analyzer.py check-orphan --current-session "$NEW_SESSION_ID" 2>/dev/null || echo '{}')
     ORPHAN_SESSION=$(echo "$ORPHAN_RESULT" | "$PYTHON_CMD" -c "import sys,json; print(json.load(sys.stdin).get('orphaned_session') or '')" 2>/dev/null || true)
 
     if [[ -n "$ORPHAN_SESSION" ]]; then
-        # Recover orphaned session
+        # Recover orphaned session in the background; context injection
+        # doesn't wait for synthesis (recover skips it if already done)
+        (run_tool pattern_analyzer.py recover --session-id "$ORPHAN_SESSION" >/dev/null 2>&1 &)
         echo "<system-reminder>" >&2
-        echo "Recovering orphaned session: $ORPHAN_SESSION" >&2
-        "$PYTHON_CMD" "$PATTERN_ANALYZER" recover --session-id "$ORPHAN_SESSION" >/dev/null 2>&1 || true
-        echo "Orphaned session recovered and synthesized." >&2
+        echo "Recovering orphaned session in the background: $ORPHAN_SESSION" >&2
         echo "</system-reminder>" >&2
     fi
 fi
@@ -63,6 +63,13 @@ fi
 # Store current session ID
 echo "$NEW_SESSION_ID" > "$SESSION_MARKER"
 
+# Start the event emitter daemon so PostToolUse/UserPromptSubmit hooks can
+# hand events to a running process instead of starting Python per event
+EVENT_STORE="$PLUGIN_ROOT/tools/event_store.py"
+if [[ -f "$EVENT_STORE" && -n "$PYTHON_CMD" ]]; then
+    (run_tool event_store.py daemon start >/dev/null 2>&1 &)
+fi
+
 # ==============================================================================
 # CONTEXT INJECTION
 # ==============================================================================
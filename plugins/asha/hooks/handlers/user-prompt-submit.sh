@@ -43,22 +43,19 @@ mkdir -p "$PROJECT_DIR/Memory/events"
 mkdir -p "$PROJECT_DIR/Work/markers"
 
 # Helper function to emit events to event_store.py
+# Prefers the long-lived emitter daemon; falls back to a one-shot CLI emit
 emit_event() {
     local event_type="$1"
     local subtype="$2"
     local payload="$3"
 
-    EVENT_STORE="$PLUGIN_ROOT/tools/event_store.py"
-    PYTHON_CMD=$(get_python_cmd)
-
-    if [[ -f "$EVENT_STORE" && -n "$PYTHON_CMD" ]]; then
-        # Run in background to avoid blocking
-        ("$PYTHON_CMD" "$EVENT_STORE" emit \
-            --type "$event_type" \
-            --subtype "$subtype" \
-            --payload "$payload" \
-            --source "hook" >/dev/null 2>&1) &
-    fi
+    # Run in background to avoid blocking
+    (send_to_emitter "$event_type" "$subtype" "$payload" || \
+        run_tool event_store.py emit \
+        --type "$event_type" \
+        --subtype "$subtype" \
+        --payload "$payload" \
+        --source "hook" >/dev/null 2>&1) &
 }
 
 # Read stdin JSON from Claude Code
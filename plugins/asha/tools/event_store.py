@@ -7,45 +7,81 @@ Events are stored in JSONL format for efficient append and query.
 
 Usage:
     python event_store.py emit --type event --subtype file_modified --payload '{"file_path": "..."}'
+    python event_store.py emit --batch < events.ndjson
     python event_store.py query --session-id abc123 --type event
+    python event_store.py follow [--type event] [--subtype error]
     python event_store.py synthesize --output activeContext
+    python event_store.py export --format columnar
     python event_store.py rotate --days 30
-    python event_store.py stats
+    python event_store.py stats [--rebuild]
+    python event_store.py daemon start|stop|status
+    python event_store.py compress-archives
+    python event_store.py import-sqlite [--activate]
 """
 
 import os
 import sys
 import re
 import json
-import uuid
 import fcntl
-import argparse
-import subprocess
+import time
+import zlib
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Any, Optional, Dict, List
-from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Dict, List, Tuple
+from collections import defaultdict, Counter
+
+# Hooks start this script for every event they can't hand to the daemon, so
+# only what the hot commands (`emit`, `query`, `claims`) need is imported
+# above. The daemon's socket/threading stack, subprocess and argparse are
+# imported where they are used.
 
 
 # =============================================================================
 # Secret Scrubbing - Redact sensitive values before persisting events
 # =============================================================================
 
-# Pattern matches: api_key, token, secret, password, authorization, credentials, auth
-# followed by separator and 8+ char value
-SECRET_PATTERN = re.compile(
-    r'(?i)'  # Case insensitive
-    r'(api[_-]?key|token|secret|password|authorization|credentials?|auth|bearer)'
-    r'(["\'\s:=]+)'  # Separator (quotes, spaces, colons, equals)
-    r'([A-Za-z]+\s+)?'  # Optional auth scheme (Bearer, Basic)
-    r'([A-Za-z0-9_\-/.+=]{8,})',  # Token value (8+ chars)
-    re.IGNORECASE
+# One alternation, tried left to right at each position:
+#   key/sep/value  api_key, token, secret, password, authorization, credentials,
+#                  auth or bearer, then a separator and an 8+ char value
+#                  (an auth scheme such as "Bearer " before the value is dropped)
+#   jwt, aws, gh   JWTs, AWS access key ids, GitHub tokens
+SCRUB_REGEX = (
+    r'(?P<key>(?i:api[_-]?key|token|secret|password|authorization|credentials?|auth|bearer))'
+    r'(?P<sep>["\'\s:=]+)'  # Separator (quotes, spaces, colons, equals)
+    r'(?:[A-Za-z]+\s+)?'  # Optional auth scheme (Bearer, Basic)
+    r'(?P<value>[A-Za-z0-9_\-/.+=]{8,})'  # Token value (8+ chars)
+    r'|(?P<jwt>eyJ[A-Za-z0-9_-]+\.eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+)'
+    r'|(?P<aws>AKIA[A-Z0-9]{16})'
+    r'|(?P<gh>gh[pousr]_[A-Za-z0-9_]{36,})'
+)
+_scrub_pattern: Optional["re.Pattern"] = None
+
+_REDACTIONS = {"jwt": "[REDACTED_JWT]", "aws": "[REDACTED_AWS_KEY]", "gh": "[REDACTED_GH_TOKEN]"}
+
+# Every SCRUB_REGEX match contains one of these (in lowercased text), and
+# none can be shorter than a minimal JWT; anything else is returned untouched
+# without running the regex. Most hook strings (paths, commands) stop here.
+_SCRUB_TRIGGERS = (
+    "token", "secret", "password", "auth", "credential", "bearer", "api",
+    "eyj", "akia", "ghp_", "gho_", "ghu_", "ghs_", "ghr_"
 )
+_SCRUB_MIN_LENGTH = len("eyJa.eyJb.c")
 
-# Additional patterns for common secret formats
-JWT_PATTERN = re.compile(r'eyJ[A-Za-z0-9_-]+\.eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+')
-AWS_KEY_PATTERN = re.compile(r'AKIA[A-Z0-9]{16}')
-GITHUB_TOKEN_PATTERN = re.compile(r'gh[pousr]_[A-Za-z0-9_]{36,}')
+
+def _redact(match: "re.Match") -> str:
+    if match.group("value") is not None:
+        return match.group("key") + match.group("sep") + "[REDACTED]"
+    return _REDACTIONS[match.lastgroup]
+
+
+def get_scrub_pattern() -> "re.Pattern":
+    """Compile SCRUB_REGEX on first use (most payloads never need it)"""
+    global _scrub_pattern
+    if _scrub_pattern is None:
+        _scrub_pattern = re.compile(SCRUB_REGEX)
+    return _scrub_pattern
 
 
 def scrub_secrets(text: str) -> str:
@@ -54,55 +90,91 @@ def scrub_secrets(text: str) -> str:
 
     Returns text with secrets replaced by [REDACTED].
     """
-    if not text or not isinstance(text, str):
+    if not text or not isinstance(text, str) or len(text) < _SCRUB_MIN_LENGTH:
         return text
 
-    result = text
-
-    # Scrub general secret patterns
-    result = SECRET_PATTERN.sub(r'\1\2[REDACTED]', result)
+    lowered = text.lower()
+    for trigger in _SCRUB_TRIGGERS:
+        if trigger in lowered:
+            return get_scrub_pattern().sub(_redact, text)
+    return text
 
-    # Scrub JWTs
-    result = JWT_PATTERN.sub('[REDACTED_JWT]', result)
 
-    # Scrub AWS keys
-    result = AWS_KEY_PATTERN.sub('[REDACTED_AWS_KEY]', result)
-
-    # Scrub GitHub tokens
-    result = GITHUB_TOKEN_PATTERN.sub('[REDACTED_GH_TOKEN]', result)
-
-    return result
+def _scrub_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return scrub_secrets(value)
+    if isinstance(value, dict):
+        return {key: _scrub_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_scrub_value(item) for item in value]
+    return value
 
 
 def scrub_payload(payload: Any) -> Any:
     """
-    Recursively scrub secrets from a payload dictionary.
-    Returns the input unchanged if not a dict.
+    Recursively scrub secrets from a payload dictionary, including lists
+    nested at any depth. Returns the input unchanged if not a dict.
     """
     if not isinstance(payload, dict):
         return payload
+    return _scrub_value(payload)
 
-    scrubbed = {}
-    for key, value in payload.items():
-        if isinstance(value, str):
-            scrubbed[key] = scrub_secrets(value)
-        elif isinstance(value, dict):
-            scrubbed[key] = scrub_payload(value)
-        elif isinstance(value, list):
-            scrubbed[key] = [
-                scrub_payload(item) if isinstance(item, dict)
-                else scrub_secrets(item) if isinstance(item, str)
-                else item
-                for item in value
-            ]
-        else:
-            scrubbed[key] = value
 
-    return scrubbed
+# Written at the project root once git has located it, so later runs from
+# anywhere below can skip the `git rev-parse` subprocess
+ROOT_MARKER = Path("Work") / "markers" / "project-root"
+
+
+def _read_root_marker(directory: Path) -> Optional[Path]:
+    """Return directory if its root marker is present and still describes it"""
+    try:
+        recorded = json.loads((directory / ROOT_MARKER).read_text())
+        memory_inode = (directory / "Memory").stat().st_ino
+    except (OSError, ValueError):
+        return None
+    if not isinstance(recorded, dict):
+        return None
+    if recorded.get("root") != str(directory) or recorded.get("memory_inode") != memory_inode:
+        return None
+    return directory
+
+
+def _write_root_marker(root: Path):
+    """Record root for later runs (only where Work/markers/ already exists)"""
+    marker = root / ROOT_MARKER
+    if not marker.parent.is_dir():
+        return
+    try:
+        record = {"root": str(root), "memory_inode": (root / "Memory").stat().st_ino}
+        tmp = marker.with_name(f"{marker.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(record) + "\n")
+        os.replace(tmp, marker)
+    except OSError:
+        pass
+
+
+def _find_root_marker() -> Optional[Path]:
+    """
+    Walk up from the working directory to the first valid root marker.
+
+    Stops at the first directory containing .git, which is where
+    `git rev-parse --show-toplevel` would stop, so a nested repository is
+    never answered with an outer project's root.
+    """
+    try:
+        directory = Path.cwd()
+    except OSError:
+        return None
+    for candidate in (directory, *directory.parents):
+        if _read_root_marker(candidate):
+            return candidate
+        if (candidate / ".git").exists():
+            return None
+    return None
 
 
 def detect_project_root() -> Path:
-    """Find project root via environment, git, or upward search for Memory/"""
+    """Find project root via environment, cached marker, git, or upward search for Memory/"""
     # Layer 1: Use CLAUDE_PROJECT_DIR if set (hook invocation)
     claude_project_dir = os.environ.get("CLAUDE_PROJECT_DIR")
     if claude_project_dir:
@@ -110,7 +182,13 @@ def detect_project_root() -> Path:
         if (project_path / "Memory").is_dir():
             return project_path
 
-    # Layer 2: Try git root
+    # Layer 2: Root recorded by an earlier git lookup
+    cached_root = _find_root_marker()
+    if cached_root:
+        return cached_root
+
+    # Layer 3: Try git root
+    import subprocess
     try:
         result = subprocess.run(
             ["git", "rev-parse", "--show-toplevel"],
@@ -118,11 +196,12 @@ def detect_project_root() -> Path:
         )
         git_root = Path(result.stdout.strip())
         if (git_root / "Memory").is_dir():
+            _write_root_marker(git_root)
             return git_root
     except (subprocess.CalledProcessError, FileNotFoundError):
         pass
 
-    # Layer 3: Upward search for Memory/ directory
+    # Layer 4: Upward search for Memory/ directory
     search_dir = Path(__file__).parent.resolve()
     while search_dir != search_dir.parent:
         if (search_dir / "Memory").is_dir():
@@ -137,6 +216,15 @@ PROJECT_ROOT = detect_project_root()
 EVENTS_DIR = PROJECT_ROOT / "Memory" / "events"
 EVENTS_FILE = EVENTS_DIR / "events.jsonl"
 ARCHIVE_DIR = EVENTS_DIR / "archive"
+INDEX_FILE = EVENTS_DIR / "events.idx"
+CLAIMS_FILE = EVENTS_DIR / "claims.json"
+STATS_FILE = EVENTS_DIR / "stats.json"
+SESSIONS_FILE = EVENTS_DIR / "sessions.json"
+ROTATE_JOURNAL = EVENTS_DIR / "rotate.journal"
+EVENTS_DB = EVENTS_DIR / "events.db"
+PROJECT_CONFIG = PROJECT_ROOT / ".asha" / "config.json"
+SESSION_MARKER = PROJECT_ROOT / "Work" / "markers" / "session-id"
+SESSION_FILE = PROJECT_ROOT / "Memory" / "sessions" / "current-session.md"
 
 # Ensure events directory exists
 EVENTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -151,49 +239,93 @@ VALID_SUBTYPES = {
 }
 
 
+# Storage engines: "jsonl" (default) or "sqlite", chosen by the
+# ASHA_EVENT_BACKEND env var or "eventBackend" in .asha/config.json
+EVENT_BACKENDS = {"jsonl", "sqlite"}
+_backend: Optional[str] = None
+
+
+def get_event_backend() -> str:
+    """Return the configured storage engine (cached per process)"""
+    global _backend
+    if _backend is None:
+        backend = os.environ.get("ASHA_EVENT_BACKEND")
+        if not backend:
+            try:
+                backend = json.loads(PROJECT_CONFIG.read_text()).get("eventBackend")
+            except (OSError, json.JSONDecodeError, AttributeError):
+                backend = None
+        _backend = backend if backend in EVENT_BACKENDS else "jsonl"
+    return _backend
+
+
+# Session sources already read, keyed by path: (stat signature, session id)
+_session_cache: Dict[Path, Tuple[Tuple[int, int, int, int], Optional[str]]] = {}
+
+
+def _parse_session_file(text: str) -> Optional[str]:
+    for line in text.split('\n'):
+        if line.startswith('sessionID:'):
+            return line.split(':', 1)[1].strip()
+    return None
+
+
+def _read_session_source(path: Path, parse) -> Tuple[bool, Optional[str]]:
+    """
+    Return (exists, parse(contents)) for a session source, re-reading the
+    file only when its inode, size or timestamps have changed since last time
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        _session_cache.pop(path, None)
+        return False, None
+    signature = (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+    cached = _session_cache.get(path)
+    if cached and cached[0] == signature:
+        return True, cached[1]
+    try:
+        value = parse(path.read_text())
+    except OSError:
+        return False, None
+    _session_cache[path] = (signature, value)
+    return True, value
+
+
 def get_current_session_id() -> str:
     """Get session ID from marker or session file"""
     # Check marker file first
-    marker = PROJECT_ROOT / "Work" / "markers" / "session-id"
-    if marker.exists():
-        return marker.read_text().strip()
+    exists, session_id = _read_session_source(SESSION_MARKER, str.strip)
+    if exists:
+        return session_id
 
     # Fall back to session file
-    session_file = PROJECT_ROOT / "Memory" / "sessions" / "current-session.md"
-    if session_file.exists():
-        for line in session_file.read_text().split('\n'):
-            if line.startswith('sessionID:'):
-                return line.split(':', 1)[1].strip()
+    _, session_id = _read_session_source(SESSION_FILE, _parse_session_file)
+    if session_id is not None:
+        return session_id
 
     # Generate new session ID
     return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
 
-def emit_event(
+def build_event(
     event_type: str,
     subtype: str,
     payload: Dict[str, Any],
     source: str = "hook",
-    tool_name: Optional[str] = None
+    tool_name: Optional[str] = None,
+    session_id: Optional[str] = None
 ) -> Dict:
-    """Emit a structured event to the event store"""
-
-    # Validate type
-    if event_type not in VALID_TYPES:
-        return {"error": f"Invalid type. Must be one of: {VALID_TYPES}"}
-
-    # Validate subtype (warn but allow unknown)
-    if subtype not in VALID_SUBTYPES.get(event_type, set()):
-        # Allow unknown subtypes but log warning
-        pass
+    """Build a scrubbed event record without persisting it"""
 
     # Scrub secrets from payload before persisting
     scrubbed_payload = scrub_payload(payload)
 
-    event_id = f"evt_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
-    session_id = get_current_session_id()
+    event_id = f"evt_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.urandom(4).hex()}"
+    if session_id is None:
+        session_id = get_current_session_id()
 
-    event = {
+    return {
         "id": event_id,
         "timestamp": datetime.now(tz=None).isoformat() + "Z",
         "session_id": session_id,
@@ -207,239 +339,1433 @@ def emit_event(
         }
     }
 
-    # Append to JSONL file with exclusive lock
-    with open(EVENTS_FILE, 'a') as f:
-        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-        try:
-            f.write(json.dumps(event, ensure_ascii=False) + '\n')
-        finally:
-            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
-    return {"status": "emitted", "event_id": event_id, "session_id": session_id}
+# =============================================================================
+# Offset Index - Sidecar events.idx so queries seek instead of parsing every line
+# =============================================================================
+#
+# events.idx is append-only and maintained under the events.jsonl flock:
+#
+#   # asha-events-index v1 inode=<events.jsonl inode>
+#   <offset>\t<length>\t<timestamp>\t<session_id>\t<type>\t<subtype>
+#
+# Lines that don't decode as events get a two-field "<offset>\t<length>"
+# record so the covered byte range stays contiguous. The index is a cache:
+# if it is missing, stale, or belongs to a replaced file it is rebuilt.
 
+INDEX_VERSION = 1
+_INDEX_HEADER_PREFIX = f"# asha-events-index v{INDEX_VERSION} inode="
 
-def query_events(
-    session_id: Optional[str] = None,
-    event_type: Optional[str] = None,
-    subtype: Optional[str] = None,
-    since: Optional[str] = None,
-    until: Optional[str] = None,
-    limit: int = 100
-) -> Dict:
-    """Query events from the store with filters"""
 
-    if not EVENTS_FILE.exists():
-        return {"events": [], "count": 0, "total_scanned": 0}
+def _index_field(value: Any) -> str:
+    return str(value or "").replace('\t', ' ').replace('\n', ' ')
 
-    events = []
-    scanned = 0
 
-    with open(EVENTS_FILE, 'r') as f:
-        for line in f:
-            if not line.strip():
-                continue
-            scanned += 1
+def _index_record(offset: int, raw: bytes) -> str:
+    """Build the index line for one raw events.jsonl line"""
+    try:
+        event = json.loads(raw) if raw.strip() else None
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        event = None
 
-            try:
-                event = json.loads(line)
-            except json.JSONDecodeError:
-                continue
+    if not isinstance(event, dict):
+        return f"{offset}\t{len(raw)}\n"
 
-            # Apply filters
-            if session_id and event.get("session_id") != session_id:
-                continue
-            if event_type and event.get("type") != event_type:
-                continue
-            if subtype and event.get("subtype") != subtype:
-                continue
+    return "\t".join([
+        str(offset),
+        str(len(raw)),
+        _index_field(event.get("timestamp")),
+        _index_field(event.get("session_id")),
+        _index_field(event.get("type")),
+        _index_field(event.get("subtype")),
+    ]) + "\n"
 
-            if since:
-                event_time = event.get("timestamp", "")
-                if event_time < since:
-                    continue
 
-            if until:
-                event_time = event.get("timestamp", "")
-                if event_time > until:
-                    continue
+def _index_coverage() -> Tuple[Optional[int], int]:
+    """Return (inode recorded in the index header, bytes of events.jsonl covered)"""
+    try:
+        with open(INDEX_FILE, 'rb') as f:
+            header = f.readline().decode("utf-8", "replace")
+            if not header.startswith(_INDEX_HEADER_PREFIX):
+                return None, 0
+            inode = int(header[len(_INDEX_HEADER_PREFIX):].strip())
+
+            body_start = f.tell()
+            size = os.fstat(f.fileno()).st_size
+            if size == body_start:
+                return inode, 0
+
+            # Last record holds the highest offset; records are short
+            f.seek(max(body_start, size - 4096))
+            last = f.read().rstrip(b'\n').rsplit(b'\n', 1)[-1]
+            offset, length = last.split(b'\t', 2)[:2]
+            return inode, int(offset) + int(length)
+    except (OSError, ValueError):
+        return None, 0
+
+
+def _sync_index(events_fd: int) -> int:
+    """
+    Bring events.idx up to date with events.jsonl.
 
-            events.append(event)
+    Caller must hold the flock on events_fd. Returns the byte offset the
+    index now covers (the current events.jsonl size).
+    """
+    st = os.fstat(events_fd)
+    inode, covered = _index_coverage()
+
+    if inode != st.st_ino or covered > st.st_size:
+        # Missing, foreign, or describes a different file: rebuild from scratch
+        with open(INDEX_FILE, 'w') as idx:
+            idx.write(f"{_INDEX_HEADER_PREFIX}{st.st_ino}\n")
+        covered = 0
+
+    if covered < st.st_size:
+        with open(EVENTS_FILE, 'rb') as f, open(INDEX_FILE, 'a') as idx:
+            f.seek(covered)
+            offset = covered
+            for raw in f:
+                if offset >= st.st_size:
+                    break
+                idx.write(_index_record(offset, raw))
+                offset += len(raw)
+        covered = st.st_size
+
+    return covered
+
+
+@contextmanager
+def locked_events_file():
+    """
+    Open events.jsonl and hold its exclusive flock for the with-block.
+
+    Yields None if there is no events file. If the file was replaced (by
+    rotation) while we waited for the lock, retries on the new one, so the
+    handle always matches what EVENTS_FILE names.
+    """
+    while True:
+        try:
+            f = open(EVENTS_FILE, 'rb')
+        except FileNotFoundError:
+            yield None
+            return
+        with f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    current = os.stat(EVENTS_FILE).st_ino == os.fstat(f.fileno()).st_ino
+                except FileNotFoundError:
+                    current = False
+                if current:
+                    yield f
+                    return
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def ensure_index() -> bool:
+    """Catch events.idx up with events.jsonl; False if it cannot be maintained"""
+    try:
+        with locked_events_file() as f:
+            if f is None:
+                return False
+            _sync_index(f.fileno())
+        return True
+    except OSError:
+        return False
 
-    # Sort by timestamp descending (most recent first)
-    events.sort(key=lambda e: e.get("timestamp", ""), reverse=True)
 
-    return {
-        "events": events[:limit],
-        "count": min(len(events), limit),
-        "total_matched": len(events),
-        "total_scanned": scanned
-    }
+def iter_index():
+    """Yield (offset, length, timestamp, session_id, type, subtype) per indexed event"""
+    try:
+        f = open(INDEX_FILE, 'r', encoding="utf-8", errors="replace")
+    except FileNotFoundError:
+        return
+    with f:
+        f.readline()  # Header
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) != 6:
+                continue  # Undecodable events.jsonl line
+            yield int(parts[0]), int(parts[1]), parts[2], parts[3], parts[4], parts[5]
 
 
 # =============================================================================
-# File Claims - Dynamic file locking for agent coordination
+# Reverse Streaming - Newest-first reads that stop as soon as enough is found
 # =============================================================================
 
-def claim_file(
-    file_path: str,
-    agent: str,
-    reason: Optional[str] = None
-) -> dict:
+REVERSE_BLOCK_SIZE = 64 * 1024
+
+# Appends are ordered by lock acquisition, timestamps by creation, so file
+# order can trail timestamp order slightly. A reverse walk bounded by
+# `since` keeps going this far past it before stopping.
+REVERSE_ORDER_SLACK = timedelta(minutes=5)
+
+
+def iter_lines_reverse(f, end: Optional[int] = None, block_size: int = REVERSE_BLOCK_SIZE):
     """
-    Claim a file for exclusive work. Other agents should check claims before editing.
+    Yield (offset, line) pairs from a binary file, last line first.
 
-    Claims are soft locks - advisory, not enforced. jj handles actual conflicts.
+    Reads fixed-size blocks backwards from `end` (default: EOF), so the cost
+    is proportional to how far the caller iterates, not to the file size.
     """
-    return emit_event(
-        event_type="claim",
-        subtype="acquire",
-        payload={
-            "file_path": file_path,
-            "agent": agent,
-            "reason": reason or "Working on file"
-        }
-    )
+    if end is None:
+        end = os.fstat(f.fileno()).st_size
+
+    pos = end
+    carry = b""  # Start of the line that continues into data already read
+    while pos > 0:
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step) + carry
+
+        pieces = chunk.split(b'\n')
+        if len(pieces) == 1:
+            # No newline yet: still inside one (unterminated) line
+            carry = chunk
+            continue
 
+        cursor = pos + len(chunk)
+        tail = pieces.pop()
+        if tail:
+            # Unterminated final line at EOF
+            cursor -= len(tail)
+            yield cursor, tail
 
-def release_file(
-    file_path: str,
-    agent: str
-) -> dict:
-    """Release a claimed file."""
-    return emit_event(
-        event_type="claim",
-        subtype="release",
-        payload={
-            "file_path": file_path,
-            "agent": agent
-        }
-    )
+        for piece in reversed(pieces[1:]):
+            cursor -= len(piece) + 1
+            yield cursor, piece + b'\n'
+        carry = pieces[0] + b'\n'
 
+    if carry:
+        yield 0, carry
 
-def check_claims(
-    file_path: Optional[str] = None
-) -> dict:
+
+def _reverse_stop_bound(since: Optional[str]) -> Optional[str]:
+    """Timestamp below which a newest-first walk can stop for `since`"""
+    if not since:
+        return None
+    try:
+        bound = datetime.fromisoformat(since.rstrip("Z")) - REVERSE_ORDER_SLACK
+    except ValueError:
+        return None
+    return bound.isoformat() + "Z"
+
+
+def _event_matches(
+    event: Dict,
+    session_id: Optional[str],
+    event_type: Optional[str],
+    subtype: Optional[str],
+    since: Optional[str],
+    until: Optional[str]
+) -> bool:
+    timestamp = event.get("timestamp", "")
+    return not ((session_id and event.get("session_id") != session_id)
+                or (event_type and event.get("type") != event_type)
+                or (subtype and event.get("subtype") != subtype)
+                or (since and timestamp < since)
+                or (until and timestamp > until))
+
+
+def _walk_live_reverse(session_id, event_type, subtype, since, until, stop_below):
     """
-    Check active file claims.
+    _walk_reverse over events.jsonl only.
 
-    Returns claims that have acquire but no matching release.
+    Returns True if the walk stopped at stop_below, i.e. nothing older can match.
     """
-    # Get all claim events from current session
-    result = query_events(event_type="claim", limit=500)
+    if not EVENTS_FILE.exists():
+        return False
+
+    if ensure_index():
+        with open(EVENTS_FILE, 'rb') as events_f, open(INDEX_FILE, 'rb') as idx:
+            for _, raw in iter_lines_reverse(idx):
+                parts = raw.rstrip(b'\n').decode("utf-8", "replace").split('\t')
+                if len(parts) != 6:
+                    continue  # Header or undecodable events.jsonl line
+                offset, length, timestamp, sid, etype, esub = parts
+
+                if stop_below and timestamp < stop_below:
+                    return True
+                if ((session_id and sid != session_id)
+                        or (event_type and etype != event_type)
+                        or (subtype and esub != subtype)
+                        or (since and timestamp < since)
+                        or (until and timestamp > until)):
+                    yield None
+                    continue
+
+                events_f.seek(int(offset))
+                try:
+                    yield json.loads(events_f.read(int(length)))
+                except (json.JSONDecodeError, UnicodeDecodeError, ValueError):
+                    yield None
+        return False
+
+    with open(EVENTS_FILE, 'rb') as f:
+        for _, raw in iter_lines_reverse(f):
+            if not raw.strip():
+                continue
+            try:
+                event = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                yield None
+                continue
 
-    claims: Dict[str, dict] = {}  # file_path -> claim info
+            if stop_below and event.get("timestamp", "") < stop_below:
+                return True
+            if not _event_matches(event, session_id, event_type, subtype, since, until):
+                yield None
+                continue
+            yield event
+    return False
 
-    for event in reversed(result["events"]):  # Process oldest first
-        path = event["payload"].get("file_path")
-        if not path:
+
+def _walk_archive_reverse(path: Path, session_id, event_type, subtype, since, until):
+    """_walk_reverse over one archive file"""
+    for raw in _archive_lines_reverse(path, since, until):
+        if not raw.strip():
+            continue
+        try:
+            event = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            yield None
+            continue
+        if not isinstance(event, dict) or not _event_matches(
+                event, session_id, event_type, subtype, since, until):
+            yield None
             continue
+        yield event
 
-        if event["subtype"] == "acquire":
-            claims[path] = {
-                "file_path": path,
-                "agent": event["payload"].get("agent"),
-                "reason": event["payload"].get("reason"),
-                "claimed_at": event["timestamp"],
-                "event_id": event["id"]
-            }
-        elif event["subtype"] == "release":
-            # Release clears the claim
-            if path in claims:
-                del claims[path]
 
-    # Filter to specific file if requested
-    if file_path:
-        if file_path in claims:
-            return {"claims": [claims[file_path]], "count": 1}
-        return {"claims": [], "count": 0}
+def _walk_reverse(
+    session_id: Optional[str] = None,
+    event_type: Optional[str] = None,
+    subtype: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    include_archives: bool = True
+):
+    """
+    Walk the store newest-first, yielding each matching event and None for
+    every record examined that didn't match (so callers can count scans).
+
+    The live log comes first: through events.idx when it can be maintained,
+    so non-matching records are rejected without decoding JSON, otherwise
+    directly. Then, with include_archives, the monthly archives newest month
+    first; months outside [since, until] are skipped by file name and
+    compressed blocks outside it are never decompressed.
+    """
+    stop_below = _reverse_stop_bound(since)
+
+    stopped = yield from _walk_live_reverse(session_id, event_type, subtype, since, until, stop_below)
+    if stopped or not include_archives:
+        return
+
+    for path in reversed(archive_files_in_range(since, until)):
+        yield from _walk_archive_reverse(path, session_id, event_type, subtype, since, until)
+
+
+def iter_events_reverse(
+    session_id: Optional[str] = None,
+    event_type: Optional[str] = None,
+    subtype: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    include_archives: bool = True
+):
+    """Yield matching events newest-first, reading only as much as consumed"""
+    if get_event_backend() == "sqlite":
+        yield from _sqlite_iter_events(session_id, event_type, subtype, since, until, include_archives)
+        return
+
+    for event in _walk_reverse(session_id, event_type, subtype, since, until, include_archives):
+        if event is not None:
+            yield event
 
+
+# =============================================================================
+# Session Ledger - sessions.json: where each session starts, ends and was synthesized
+# =============================================================================
+#
+# Kept like stats.json: it records the events.jsonl inode and byte offset it
+# covers, writers fold their own events in under the events flock and save
+# it when the newest session changes, every LEDGER_CHECKPOINT_EVENTS events
+# and on close, and anything past the saved offset is picked up from
+# there (get_session_ledger catches up before answering). Per
+# session it holds the first and last event timestamps, the offset just
+# past the session's last event in the live log (None once rotated out),
+# and the newest event timestamp synthesis has covered ("synthesized";
+# "synthesized_through" covers every session). pattern_analyzer.py reads
+# it to find orphaned sessions and records synthesis in it through
+# mark_session_ledger. Entries survive rotation; only their offsets are
+# renumbered.
+
+LEDGER_MAX_SESSIONS = 100
+LEDGER_CHECKPOINT_EVENTS = 256
+
+
+def _empty_ledger(inode: Optional[int] = None) -> Dict:
     return {
-        "claims": list(claims.values()),
-        "count": len(claims)
+        "inode": inode,
+        "offset": 0,
+        "last_session": None,
+        "synthesized_through": None,
+        "sessions": {}
     }
 
 
-def synthesize_active_context(
-    session_id: Optional[str] = None,
-    days: int = 7
-) -> str:
-    """Synthesize activeContext.md content from recent events"""
+def _apply_ledger(ledger: Dict, records):
+    """Fold (end offset, timestamp, session_id) records, in log order, into the ledger"""
+    sessions = ledger["sessions"]
+    for end, timestamp, session_id in records:
+        if not session_id:
+            continue
+        timestamp = timestamp or ""
+        entry = sessions.get(session_id)
+        if entry is None:
+            sessions[session_id] = {"started": timestamp, "last_event": timestamp,
+                                    "offset": end, "synthesized": None}
+        else:
+            entry["started"] = min(entry["started"], timestamp) if entry["started"] else timestamp
+            entry["last_event"] = max(entry["last_event"], timestamp)
+            entry["offset"] = end
+        ledger["last_session"] = session_id
+
+
+def _scan_ledger(ledger: Dict, f, end: int) -> Dict:
+    """Fold complete lines of f between ledger["offset"] and end into the ledger"""
+    f.seek(ledger["offset"])
+    offset = ledger["offset"]
+    records = []
+    for raw in f:
+        if offset + len(raw) > end or not raw.endswith(b'\n'):
+            break  # Partial line still being written
+        offset += len(raw)
+        if not raw.strip():
+            continue
+        try:
+            event = json.loads(raw)
+            records.append((offset, event.get("timestamp"), event.get("session_id")))
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+            pass
+    _apply_ledger(ledger, records)
+    ledger["offset"] = offset
+    return ledger
 
-    # Query recent events
-    if session_id:
-        result = query_events(session_id=session_id, limit=1000)
-    else:
-        since = (datetime.now(tz=None) - timedelta(days=days)).isoformat() + "Z"
-        result = query_events(since=since, limit=1000)
 
-    events = result["events"]
+def _load_ledger() -> Optional[Dict]:
+    try:
+        ledger = json.loads(SESSIONS_FILE.read_text())
+        return ledger if isinstance(ledger.get("sessions"), dict) else None
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+        return None
+
+
+def _save_ledger(ledger: Dict):
+    """Atomically replace sessions.json, dropping the oldest sessions past LEDGER_MAX_SESSIONS"""
+    sessions = ledger["sessions"]
+    if len(sessions) > LEDGER_MAX_SESSIONS:
+        newest = sorted(sessions, key=lambda s: sessions[s]["last_event"])[-LEDGER_MAX_SESSIONS:]
+        keep = set(newest) | {ledger["last_session"]}
+        ledger["sessions"] = {s: entry for s, entry in sessions.items() if s in keep}
+    tmp = SESSIONS_FILE.with_name(SESSIONS_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(ledger, ensure_ascii=False))
+    os.replace(tmp, SESSIONS_FILE)
+
+
+def _ledger_version() -> Optional[Tuple[int, int, int]]:
+    """Identifies the sessions.json on disk, so a cached copy can tell it was replaced"""
+    try:
+        st = os.stat(SESSIONS_FILE)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
 
-    if not events:
-        return "# activeContext\n\nNo recent events found.\n"
 
-    # Separate by type
-    tasks = [e for e in events if e["type"] == "task"]
-    contexts = [e for e in events if e["type"] == "context"]
-    activities = [e for e in events if e["type"] == "event"]
+def _renumber_ledger(ledger: Dict, inode: int):
+    """Point the ledger at a new events.jsonl; live offsets must be re-folded"""
+    for entry in ledger["sessions"].values():
+        entry["offset"] = None
+    ledger["inode"] = inode
+    ledger["offset"] = 0
 
-    lines = []
-    lines.append("---")
-    lines.append(f'version: "1.0"')
-    lines.append(f'lastUpdated: "{datetime.now().strftime("%Y-%m-%d")}"')
-    lines.append(f'lifecycle: "active"')
-    lines.append(f'synthesizedFrom: "events"')
-    lines.append("---")
-    lines.append("")
-    lines.append("# activeContext")
-    lines.append("")
 
-    # Current Project Status (from recent decisions)
-    decisions = [c for c in contexts if c["subtype"] == "decision"]
-    learnings = [c for c in contexts if c["subtype"] == "learning"]
+def _sync_ledger(events_fd: int) -> Dict:
+    """
+    Bring sessions.json up to date with events.jsonl and return it.
 
-    if decisions or learnings:
-        lines.append("## Current Project Status")
-        lines.append("")
+    Caller must hold the flock on events_fd. A replaced log keeps the
+    sessions already recorded and re-folds the new file from the start.
+    """
+    st = os.fstat(events_fd)
+    ledger = _load_ledger()
+    if ledger is None:
+        ledger = _empty_ledger(st.st_ino)
+    elif ledger["inode"] != st.st_ino or ledger["offset"] > st.st_size:
+        _renumber_ledger(ledger, st.st_ino)
 
-        if decisions:
-            for d in decisions[-5:]:
-                key = d["payload"].get("key", "Decision")
-                value = d["payload"].get("value", "")
-                lines.append(f"- **{key}**: {value}")
+    if ledger["offset"] < st.st_size:
+        with open(EVENTS_FILE, 'rb') as f:
+            _scan_ledger(ledger, f, st.st_size)
+        _save_ledger(ledger)
+    elif not SESSIONS_FILE.exists():
+        _save_ledger(ledger)
 
-        if learnings:
-            lines.append("")
-            lines.append("**Key Learnings**:")
-            for l in learnings[-5:]:
-                insight = l["payload"].get("insight", l["payload"].get("detail", ""))
-                lines.append(f"- {insight}")
+    return ledger
 
-        lines.append("")
 
-    # Recent Activities (grouped by date)
-    if activities:
-        by_date: Dict[str, List] = defaultdict(list)
-        for a in activities:
-            date = a["timestamp"][:10]
-            by_date[date].append(a)
+def get_session_ledger() -> Optional[Dict]:
+    """
+    The session ledger, caught up with events.jsonl. None for the SQLite
+    backend, or if there is neither a log nor a ledger.
+    """
+    if get_event_backend() == "sqlite":
+        return None
 
-        lines.append("## Recent Activities")
-        lines.append("")
+    with locked_events_file() as f:
+        if f is None:
+            return _load_ledger()
+        try:
+            return _sync_ledger(f.fileno())
+        except OSError:
+            return None
 
-        # Last 7 days
-        for date in sorted(by_date.keys(), reverse=True)[:7]:
-            lines.append(f"**{date}**:")
-            lines.append("")
 
-            # Group by subtype within date
-            day_events = by_date[date]
-            for evt in day_events[:15]:  # Max 15 per day
-                subtype = evt["subtype"]
-                payload = evt["payload"]
+def mark_session_ledger(marks: Dict[Optional[str], str]) -> bool:
+    """
+    Record how far synthesis got: marks maps a session id (None: all
+    sessions) to the timestamp of the last event synthesized. Applied to the
+    caught-up ledger under the events flock, so appenders holding a cached
+    copy re-read it. False for the SQLite backend, without a log, or if
+    sessions.json cannot be written.
+    """
+    if get_event_backend() == "sqlite":
+        return False
 
-                if subtype == "file_modified" or subtype == "file_created":
-                    file_path = payload.get("file_path", payload.get("detail", "unknown"))
-                    lines.append(f"- [{subtype}] {file_path}")
+    try:
+        with locked_events_file() as f:
+            if f is None:
+                return False
+            ledger = _sync_ledger(f.fileno())
+            for session_id, through in marks.items():
+                if session_id is None:
+                    ledger["synthesized_through"] = max(ledger.get("synthesized_through") or "", through)
+                elif session_id in ledger["sessions"]:
+                    entry = ledger["sessions"][session_id]
+                    entry["synthesized"] = max(entry.get("synthesized") or "", through)
+            _save_ledger(ledger)
+            return True
+    except OSError:
+        return False
+
+
+# =============================================================================
+# Running Statistics - stats.json snapshot kept current by appends and rotation
+# =============================================================================
+#
+# The snapshot records the events.jsonl inode and the byte offset it covers.
+# Writers fold their own events into an in-memory copy under the events
+# flock and save it every STATS_CHECKPOINT_EVENTS events and on close;
+# anything appended past the saved offset (events not yet checkpointed, a
+# crash, a foreign writer) is picked up by re-scanning from that offset.
+#
+# The snapshot lists every session id in the log so session_count stays
+# exact however sessions interleave; in memory the list is held as a set.
+
+STATS_CHECKPOINT_EVENTS = 256
+
+
+def _empty_stats(inode: Optional[int] = None) -> Dict:
+    return {
+        "inode": inode,
+        "offset": 0,
+        "total_events": 0,
+        "by_type": {},
+        "by_subtype": {},
+        "sessions": set(),
+        "earliest": None,
+        "latest": None
+    }
+
+
+def _apply_stats(snapshot: Dict, events: List[Dict]):
+    """Fold events into a stats snapshot"""
+    by_type = snapshot["by_type"]
+    by_subtype = snapshot["by_subtype"]
+    for event in events:
+        snapshot["total_events"] += 1
+        event_type = event.get("type", "unknown")
+        subtype = event.get("subtype", "unknown")
+        by_type[event_type] = by_type.get(event_type, 0) + 1
+        by_subtype[subtype] = by_subtype.get(subtype, 0) + 1
+
+        snapshot["sessions"].add(event.get("session_id", ""))
+
+        ts = event.get("timestamp", "")
+        if ts:
+            if snapshot["earliest"] is None or ts < snapshot["earliest"]:
+                snapshot["earliest"] = ts
+            if snapshot["latest"] is None or ts > snapshot["latest"]:
+                snapshot["latest"] = ts
+
+
+def _scan_stats(snapshot: Dict, f, end: int) -> Dict:
+    """Fold complete lines of f between snapshot["offset"] and end into snapshot"""
+    f.seek(snapshot["offset"])
+    offset = snapshot["offset"]
+    for raw in f:
+        if offset + len(raw) > end or not raw.endswith(b'\n'):
+            break  # Partial line still being written
+        offset += len(raw)
+        if not raw.strip():
+            continue
+        try:
+            _apply_stats(snapshot, [json.loads(raw)])
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+            pass
+    snapshot["offset"] = offset
+    return snapshot
+
+
+def _load_stats() -> Optional[Dict]:
+    try:
+        snapshot = json.loads(STATS_FILE.read_text())
+        if not isinstance(snapshot["sessions"], list):
+            return None
+        snapshot["sessions"] = set(snapshot["sessions"])
+        return snapshot
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+        return None
+
+
+def _save_stats(snapshot: Dict):
+    """Atomically replace stats.json"""
+    tmp = STATS_FILE.with_name(STATS_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(dict(snapshot, sessions=list(snapshot["sessions"])), ensure_ascii=False))
+    os.replace(tmp, STATS_FILE)
+
+
+def _sync_stats(events_fd: int, rebuild: bool = False) -> Dict:
+    """
+    Bring stats.json up to date with events.jsonl and return the snapshot.
+
+    Caller must hold the flock on events_fd.
+    """
+    st = os.fstat(events_fd)
+    snapshot = None if rebuild else _load_stats()
+    if snapshot is None or snapshot["inode"] != st.st_ino or snapshot["offset"] > st.st_size:
+        snapshot = _empty_stats(st.st_ino)
+
+    if snapshot["offset"] < st.st_size:
+        with open(EVENTS_FILE, 'rb') as f:
+            _scan_stats(snapshot, f, st.st_size)
+        _save_stats(snapshot)
+    elif rebuild or not STATS_FILE.exists():
+        _save_stats(snapshot)
+
+    return snapshot
+
+
+class EventAppender:
+    """
+    Append handle for events.jsonl.
+
+    Holds the file open between writes (the emitter daemon keeps one for its
+    whole lifetime) and reopens it if the file was replaced underneath, e.g.
+    by rotation. Every write happens under an exclusive flock, and the offset
+    index is extended in the same critical section.
+    """
+
+    def __init__(self):
+        self._file = None
+        self._indexed = None  # (inode, covered bytes) after our last write
+        self._stats = None  # stats.json snapshot as of our last write
+        self._stats_pending = 0  # Events in _stats not yet saved to stats.json
+        self._ledger = None  # sessions.json as of our last write
+        self._ledger_version = None  # _ledger_version() after that write
+        self._ledger_pending = 0  # Events in _ledger not yet saved to sessions.json
+
+    def _same_file(self) -> bool:
+        try:
+            return os.stat(EVENTS_FILE).st_ino == os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return False
+
+    def _prepare_index(self, st: os.stat_result) -> bool:
+        """Make sure the index covers everything before our append offset"""
+        try:
+            if self._indexed != (st.st_ino, st.st_size):
+                # First write, or someone else appended since our last one
+                _sync_index(self._file.fileno())
+            return True
+        except OSError:
+            return False
+
+    def _extend_index(self, st: os.stat_result, lines: List[bytes]):
+        """Append index records for lines written at st.st_size"""
+        try:
+            offset = st.st_size
+            with open(INDEX_FILE, 'a') as idx:
+                for raw in lines:
+                    idx.write(_index_record(offset, raw))
+                    offset += len(raw)
+            self._indexed = (st.st_ino, offset)
+        except OSError:
+            # The index is a cache; readers rebuild whatever is missing
+            self._indexed = None
+
+    def _prepare_stats(self, st: os.stat_result) -> Optional[Dict]:
+        """Return a stats snapshot covering everything before our append offset"""
+        stats = self._stats
+        if stats is None or (stats["inode"], stats["offset"]) != (st.st_ino, st.st_size):
+            try:
+                stats = _sync_stats(self._file.fileno())
+            except OSError:
+                return None
+            self._stats_pending = 0
+        # A torn line at the end means our first event won't parse either
+        return stats if stats["offset"] == st.st_size else None
+
+    def _extend_stats(self, stats: Dict, st: os.stat_result, events: List[Dict], written: int):
+        _apply_stats(stats, events)
+        stats["offset"] = st.st_size + written
+        self._stats = stats
+        self._stats_pending += len(events)
+        if self._stats_pending >= STATS_CHECKPOINT_EVENTS:
+            self._save_stats()
+
+    def _save_stats(self):
+        try:
+            _save_stats(self._stats)
+            self._stats_pending = 0
+        except OSError:
+            # Like the index, the snapshot is a cache; stats re-scans the tail
+            pass
+
+    def _checkpoint(self):
+        """Save what only memory holds, if it still describes all of events.jsonl"""
+        if not (self._stats_pending or self._ledger_pending):
+            return
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            # Otherwise the file was rotated or appended to since, and
+            # whoever did that saved their own copies
+            st = os.fstat(self._file.fileno())
+            if not self._same_file():
+                return
+            if self._stats_pending and (self._stats["inode"], self._stats["offset"]) == (st.st_ino, st.st_size):
+                self._save_stats()
+            # Synthesis marks sessions in the file; never save over those
+            if self._ledger_pending and (self._ledger["inode"], self._ledger["offset"]) == (st.st_ino, st.st_size) \
+                    and self._ledger_version == _ledger_version():
+                self._save_ledger()
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _prepare_ledger(self, st: os.stat_result) -> Optional[Dict]:
+        """Return a session ledger covering everything before our append offset"""
+        ledger = self._ledger
+        # Synthesis also writes it (marking sessions synthesized), so the
+        # cached copy is only good while the file is still ours
+        if ledger is None or (ledger["inode"], ledger["offset"]) != (st.st_ino, st.st_size) \
+                or self._ledger_version != _ledger_version():
+            try:
+                ledger = _sync_ledger(self._file.fileno())
+            except OSError:
+                return None
+            self._ledger_version = _ledger_version()
+            self._ledger_pending = 0
+        return ledger if ledger["offset"] == st.st_size else None
+
+    def _extend_ledger(self, ledger: Dict, st: os.stat_result, events: List[Dict], lines: List[bytes]):
+        records = []
+        end = st.st_size
+        for event, raw in zip(events, lines):
+            end += len(raw)
+            records.append((end, event.get("timestamp"), event.get("session_id")))
+        last_session = ledger["last_session"]
+        _apply_ledger(ledger, records)
+        ledger["offset"] = end
+        self._ledger = ledger
+        self._ledger_pending += len(events)
+        if ledger["last_session"] != last_session or self._ledger_pending >= LEDGER_CHECKPOINT_EVENTS:
+            self._save_ledger()
+
+    def _save_ledger(self):
+        try:
+            _save_ledger(self._ledger)
+            self._ledger_version = _ledger_version()
+            self._ledger_pending = 0
+        except OSError:
+            self._ledger = None
+            self._ledger_pending = 0
+
+    def write(self, events: List[Dict]):
+        """Append events in a single locked write"""
+        if not events:
+            return
+
+        lines = [(json.dumps(event, ensure_ascii=False) + '\n').encode() for event in events]
+
+        while True:
+            if self._file is None:
+                self._file = open(EVENTS_FILE, 'ab')
+
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                if not self._same_file():
+                    # Rotated or removed while we held the old handle
+                    self.close()
+                    continue
+                st = os.fstat(self._file.fileno())
+                indexed = self._prepare_index(st)
+                stats = self._prepare_stats(st)
+                ledger = self._prepare_ledger(st)
+                data = b"".join(lines)
+                self._file.write(data)
+                self._file.flush()
+                if indexed:
+                    self._extend_index(st, lines)
+                else:
+                    self._indexed = None
+                if stats is not None:
+                    self._extend_stats(stats, st, events, len(data))
+                else:
+                    self._stats = None
+                    self._stats_pending = 0
+                if ledger is not None:
+                    self._extend_ledger(ledger, st, events, lines)
+                else:
+                    self._ledger = None
+                    self._ledger_pending = 0
+
+                claim_events = [e for e in events if e.get("type") == "claim"]
+                if claim_events:
+                    try:
+                        _update_claims(claim_events)
+                    except OSError:
+                        # Never leave a stale table behind; check_claims replays
+                        CLAIMS_FILE.unlink(missing_ok=True)
+                return
+            finally:
+                if self._file is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._checkpoint()
+            except OSError:
+                pass
+            self._file.close()
+            self._file = None
+        self._indexed = None
+        self._stats = None
+        self._stats_pending = 0
+        self._ledger = None
+        self._ledger_pending = 0
+
+
+def open_event_writer():
+    """Return a writer (write(events)/close()) for the configured backend"""
+    if get_event_backend() == "sqlite":
+        return SqliteEventWriter()
+    return EventAppender()
+
+
+def emit_event(
+    event_type: str,
+    subtype: str,
+    payload: Dict[str, Any],
+    source: str = "hook",
+    tool_name: Optional[str] = None
+) -> Dict:
+    """Emit a structured event to the event store"""
+
+    # Validate type
+    if event_type not in VALID_TYPES:
+        return {"error": f"Invalid type. Must be one of: {VALID_TYPES}"}
+
+    # Validate subtype (warn but allow unknown)
+    if subtype not in VALID_SUBTYPES.get(event_type, set()):
+        # Allow unknown subtypes but log warning
+        pass
+
+    event = build_event(event_type, subtype, payload, source, tool_name)
+
+    # Append with exclusive lock (JSONL) or in a transaction (SQLite)
+    writer = open_event_writer()
+    try:
+        writer.write([event])
+    finally:
+        writer.close()
+
+    return {"status": "emitted", "event_id": event["id"], "session_id": event["session_id"]}
+
+
+def validate_event_request(request: Any) -> Optional[str]:
+    """Return an error message if request can't become an event, else None"""
+    if not isinstance(request, dict):
+        return "Event must be a JSON object"
+    if request.get("type") not in VALID_TYPES:
+        return f"Invalid type. Must be one of: {VALID_TYPES}"
+    if not isinstance(request.get("subtype"), str) or not request["subtype"]:
+        return "Missing subtype"
+    if not isinstance(request.get("payload", {}), dict):
+        return "Payload must be a JSON object"
+    return None
+
+
+def emit_many(requests: List[Any], source: str = "hook") -> Dict:
+    """
+    Emit a batch of events in one locked append (one transaction for SQLite).
+
+    Each request is a dict with type, subtype, payload and optional
+    tool_name/source, validated and scrubbed like emit_event(). Invalid
+    requests are reported and skipped; the rest are written together.
+    Returns per-event results in request order.
+    """
+    results: List[Dict] = []
+    events: List[Dict] = []
+    session_id = get_current_session_id()
+
+    for index, request in enumerate(requests):
+        error = validate_event_request(request)
+        if error:
+            results.append({"index": index, "error": error})
+            continue
+        event = build_event(
+            event_type=request["type"],
+            subtype=request["subtype"],
+            payload=request.get("payload") or {},
+            source=request.get("source") or source,
+            tool_name=request.get("tool_name"),
+            session_id=session_id
+        )
+        events.append(event)
+        results.append({"index": index, "status": "emitted", "event_id": event["id"]})
+
+    if events:
+        writer = open_event_writer()
+        try:
+            writer.write(events)
+        finally:
+            writer.close()
+
+    return {
+        "status": "emitted" if events else "nothing_emitted",
+        "emitted": len(events),
+        "errors": len(results) - len(events),
+        "session_id": session_id,
+        "results": results
+    }
+
+
+def query_events(
+    session_id: Optional[str] = None,
+    event_type: Optional[str] = None,
+    subtype: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 100,
+    include_archives: bool = True
+) -> Dict:
+    """
+    Query events from the store with filters, most recent first.
+
+    Streams newest-first and stops as soon as `limit` matches are found,
+    so matches are counted only up to the limit (`count`). `complete` is
+    true when the walk ended before the limit, i.e. `events` holds every
+    match. Rotated archives are searched after the live log unless
+    include_archives is False.
+    """
+
+    if get_event_backend() == "sqlite":
+        return _sqlite_query_events(session_id, event_type, subtype, since, until, limit, include_archives)
+
+    events = []
+    scanned = 0
+
+    if limit > 0:
+        for event in _walk_reverse(session_id, event_type, subtype, since, until, include_archives):
+            scanned += 1
+            if event is None:
+                continue
+            events.append(event)
+            if len(events) >= limit:
+                break
+
+    return {
+        "events": events,
+        "count": len(events),
+        "total_scanned": scanned,
+        "complete": len(events) < limit
+    }
+
+
+# =============================================================================
+# Follow Mode - Stream events as they are appended
+# =============================================================================
+
+FOLLOW_POLL_INTERVAL = 1.0  # Seconds between checks without inotify (and the inotify safety net)
+
+# inotify(7) flags for the watched Memory/events/ directory
+_IN_MODIFY = 0x002
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_INOTIFY_EVENT = "iIII"  # wd, mask, cookie, len (followed by len bytes of name)
+
+
+class EventsWatcher:
+    """
+    Wait for writes to files in Memory/events/.
+
+    Uses inotify on the directory where the platform has it (Linux), so an
+    idle follower costs nothing between appends; elsewhere wait() just
+    sleeps for poll_interval and callers re-check the file themselves.
+    """
+
+    def __init__(self, names: Tuple[str, ...], poll_interval: float = FOLLOW_POLL_INTERVAL):
+        self.names = {name.encode() for name in names}
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            mask = _IN_MODIFY | _IN_MOVED_TO | _IN_CREATE
+            if libc.inotify_add_watch(fd, str(EVENTS_DIR).encode(), mask) < 0:
+                os.close(fd)
+                return
+            self._fd = fd
+        except (OSError, AttributeError):
+            pass  # No inotify: poll
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def wait(self, timeout: Optional[float] = None):
+        """Return once a watched file changes (possibly) or timeout passes"""
+        timeout = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+        if self._fd is None:
+            time.sleep(timeout)
+            return
+
+        import select
+        import struct
+        header = struct.calcsize(_INOTIFY_EVENT)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self._fd], [], [], remaining)[0]:
+                return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            pos = 0
+            while pos + header <= len(data):
+                _wd, _mask, _cookie, length = struct.unpack_from(_INOTIFY_EVENT, data, pos)
+                name = data[pos + header:pos + header + length].rstrip(b"\0")
+                pos += header + length
+                if name in self.names:
+                    return
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _last_complete_line(f) -> Tuple[int, Optional[bytes]]:
+    """(offset just past the last newline-terminated line, that line)"""
+    for offset, line in iter_lines_reverse(f):
+        if line.endswith(b'\n'):
+            return offset + len(line), line
+    return 0, None
+
+
+def _replacement_offset(new_f, old_f, last_line: Optional[bytes]) -> int:
+    """
+    Offset in a swapped-in events.jsonl where events appended after the
+    swap begin.
+
+    Rotation copies the kept lines to the front of the new file in their old
+    order, so anything after the old file's last line is new. If that line
+    was itself archived, skip the prefix of lines the old file also had.
+    """
+    if last_line is None:
+        return 0
+
+    new_f.seek(0)
+    offset = 0
+    for line in new_f:
+        offset += len(line)
+        if line == last_line:
+            return offset
+
+    old_f.seek(0)
+    seen = {hash(line) for line in old_f}
+    new_f.seek(0)
+    offset = 0
+    for line in new_f:
+        if hash(line) not in seen:
+            break
+        offset += len(line)
+    return offset
+
+
+def _read_appended(f, offset: int, partial: bytes) -> Tuple[List[bytes], int, bytes]:
+    """
+    Complete lines written past offset (newline included), the offset after
+    them, and any trailing partial line (carried into the next read)
+    """
+    f.seek(offset + len(partial))
+    pieces = (partial + f.read()).split(b'\n')
+    partial = pieces.pop()
+    lines = [piece + b'\n' for piece in pieces]
+    return lines, offset + sum(map(len, lines)), partial
+
+
+def _parse_event_line(line: bytes) -> Optional[Dict]:
+    if not line.strip():
+        return None
+    try:
+        event = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def follow_events(
+    session_id: Optional[str] = None,
+    event_type: Optional[str] = None,
+    subtype: Optional[str] = None,
+    poll_interval: float = FOLLOW_POLL_INTERVAL,
+    idle_timeout: Optional[float] = None
+):
+    """
+    Yield events as they are appended from now on, oldest first.
+
+    Starts at the current end of the log and reads only new bytes, waking
+    on inotify where available (stat polling elsewhere). Rotation is
+    followed across the file swap without repeating or losing events.
+    Runs until the caller stops iterating, or until no matching event has
+    arrived for idle_timeout seconds.
+    """
+    if get_event_backend() == "sqlite":
+        yield from _sqlite_follow_events(session_id, event_type, subtype, poll_interval, idle_timeout)
+        return
+
+    watcher = EventsWatcher((EVENTS_FILE.name,), poll_interval)
+    f = None
+    offset = 0
+    last_line: Optional[bytes] = None
+    partial = b""
+    started = True  # Events already in the file when following starts are skipped
+    last_yield = time.monotonic()
+
+    try:
+        while True:
+            if f is None:
+                try:
+                    f = open(EVENTS_FILE, 'rb')
+                except FileNotFoundError:
+                    pass
+                else:
+                    if started:
+                        offset, last_line = _last_complete_line(f)
+            started = False
+
+            if f is not None:
+                lines, offset, partial = _read_appended(f, offset, partial)
+
+                try:
+                    current = os.stat(EVENTS_FILE)
+                except FileNotFoundError:
+                    current = None
+                opened = os.fstat(f.fileno())
+                swapped = current is None or (current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev)
+                if swapped:
+                    # Rotation stops appends to the old file before replacing
+                    # it, so one more read drains it completely
+                    more, offset, _ = _read_appended(f, offset, partial)
+                    lines += more
+
+                for line in lines:
+                    last_line = line
+                    event = _parse_event_line(line)
+                    if event and _event_matches(event, session_id, event_type, subtype, None, None):
+                        last_yield = time.monotonic()
+                        yield event
+
+                if swapped:
+                    old_f, f = f, None
+                    partial = b""
+                    if current is not None:
+                        try:
+                            f = open(EVENTS_FILE, 'rb')
+                            offset = _replacement_offset(f, old_f, last_line)
+                        except FileNotFoundError:
+                            f = None
+                    if f is None:
+                        offset, last_line = 0, None
+                    old_f.close()
+                    continue
+                if opened.st_size < offset:
+                    # Truncated in place
+                    offset, last_line, partial = 0, None, b""
+                    continue
+
+            if idle_timeout is not None:
+                remaining = idle_timeout - (time.monotonic() - last_yield)
+                if remaining <= 0:
+                    return
+                watcher.wait(remaining)
+            else:
+                watcher.wait()
+    finally:
+        watcher.close()
+        if f is not None:
+            f.close()
+
+
+# =============================================================================
+# File Claims - Dynamic file locking for agent coordination
+# =============================================================================
+
+def claim_file(
+    file_path: str,
+    agent: str,
+    reason: Optional[str] = None
+) -> dict:
+    """
+    Claim a file for exclusive work. Other agents should check claims before editing.
+
+    Claims are soft locks - advisory, not enforced. jj handles actual conflicts.
+    """
+    return emit_event(
+        event_type="claim",
+        subtype="acquire",
+        payload={
+            "file_path": file_path,
+            "agent": agent,
+            "reason": reason or "Working on file"
+        }
+    )
+
+
+def release_file(
+    file_path: str,
+    agent: str
+) -> dict:
+    """Release a claimed file."""
+    return emit_event(
+        event_type="claim",
+        subtype="release",
+        payload={
+            "file_path": file_path,
+            "agent": agent
+        }
+    )
+
+
+def _apply_claim_events(claims: Dict[str, dict], events: List[Dict]):
+    """Fold claim acquire/release events (oldest first) into the claims table"""
+    for event in events:
+        payload = event.get("payload") or {}
+        path = payload.get("file_path")
+        if not path:
+            continue
+
+        if event.get("subtype") == "acquire":
+            claims[path] = {
+                "file_path": path,
+                "agent": payload.get("agent"),
+                "reason": payload.get("reason"),
+                "claimed_at": event.get("timestamp"),
+                "event_id": event.get("id")
+            }
+        elif event.get("subtype") == "release":
+            # Release clears the claim
+            claims.pop(path, None)
+
+
+def _replay_claims() -> Dict[str, dict]:
+    """
+    Rebuild the claims table from every claim event in events.jsonl.
+
+    Only needed when claims.json is missing. Reads the file directly rather
+    than through the index, since callers already hold the events flock.
+    """
+    claims: Dict[str, dict] = {}
+    if not EVENTS_FILE.exists():
+        return claims
+
+    with open(EVENTS_FILE, 'rb') as f:
+        for raw in f:
+            if b'"claim"' not in raw:
+                continue
+            try:
+                event = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if event.get("type") == "claim":
+                _apply_claim_events(claims, [event])
+    return claims
+
+
+def _save_claims(claims: Dict[str, dict]):
+    """Atomically replace claims.json"""
+    tmp = CLAIMS_FILE.with_name(CLAIMS_FILE.name + ".tmp")
+    tmp.write_text(json.dumps({"claims": claims}, indent=2, ensure_ascii=False))
+    os.replace(tmp, CLAIMS_FILE)
+
+
+def _load_claims() -> Optional[Dict[str, dict]]:
+    try:
+        return json.loads(CLAIMS_FILE.read_text()).get("claims", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _update_claims(events: List[Dict]):
+    """
+    Apply newly appended claim events to claims.json.
+
+    Called by EventAppender while it holds the events flock, so updates are
+    serialized with the appends that produced them.
+    """
+    claims = _load_claims()
+    if claims is None:
+        # Replay already includes the events just written
+        claims = _replay_claims()
+    else:
+        _apply_claim_events(claims, events)
+    _save_claims(claims)
+
+
+def check_claims(
+    file_path: Optional[str] = None
+) -> dict:
+    """
+    Check active file claims.
+
+    Returns claims that have acquire but no matching release, read from the
+    materialized claims table (rebuilt from the log if it is missing).
+    """
+    if get_event_backend() == "sqlite":
+        claims = _sqlite_load_claims()
+    else:
+        claims = _load_claims()
+
+    if claims is None:
+        claims = {}
+        with locked_events_file() as f:
+            if f is not None:
+                claims = _load_claims()
+                if claims is None:
+                    claims = _replay_claims()
+                    _save_claims(claims)
+
+    # Filter to specific file if requested
+    if file_path:
+        if file_path in claims:
+            return {"claims": [claims[file_path]], "count": 1}
+        return {"claims": [], "count": 0}
+
+    return {
+        "claims": list(claims.values()),
+        "count": len(claims)
+    }
+
+
+def synthesize_active_context(
+    session_id: Optional[str] = None,
+    days: int = 7
+) -> str:
+    """Synthesize activeContext.md content from recent events"""
+
+    # Query recent events
+    if session_id:
+        result = query_events(session_id=session_id, limit=1000)
+    else:
+        since = (datetime.now(tz=None) - timedelta(days=days)).isoformat() + "Z"
+        result = query_events(since=since, limit=1000)
+
+    events = result["events"]
+
+    if not events:
+        return "# activeContext\n\nNo recent events found.\n"
+
+    # Separate by type
+    tasks = [e for e in events if e["type"] == "task"]
+    contexts = [e for e in events if e["type"] == "context"]
+    activities = [e for e in events if e["type"] == "event"]
+
+    lines = []
+    lines.append("---")
+    lines.append(f'version: "1.0"')
+    lines.append(f'lastUpdated: "{datetime.now().strftime("%Y-%m-%d")}"')
+    lines.append(f'lifecycle: "active"')
+    lines.append(f'synthesizedFrom: "events"')
+    lines.append("---")
+    lines.append("")
+    lines.append("# activeContext")
+    lines.append("")
+
+    # Current Project Status (from recent decisions)
+    decisions = [c for c in contexts if c["subtype"] == "decision"]
+    learnings = [c for c in contexts if c["subtype"] == "learning"]
+
+    if decisions or learnings:
+        lines.append("## Current Project Status")
+        lines.append("")
+
+        if decisions:
+            for d in decisions[-5:]:
+                key = d["payload"].get("key", "Decision")
+                value = d["payload"].get("value", "")
+                lines.append(f"- **{key}**: {value}")
+
+        if learnings:
+            lines.append("")
+            lines.append("**Key Learnings**:")
+            for l in learnings[-5:]:
+                insight = l["payload"].get("insight", l["payload"].get("detail", ""))
+                lines.append(f"- {insight}")
+
+        lines.append("")
+
+    # Recent Activities (grouped by date)
+    if activities:
+        by_date: Dict[str, List] = defaultdict(list)
+        for a in activities:
+            date = a["timestamp"][:10]
+            by_date[date].append(a)
+
+        lines.append("## Recent Activities")
+        lines.append("")
+
+        # Last 7 days
+        for date in sorted(by_date.keys(), reverse=True)[:7]:
+            lines.append(f"**{date}**:")
+            lines.append("")
+
+            # Group by subtype within date
+            day_events = by_date[date]
+            for evt in day_events[:15]:  # Max 15 per day
+                subtype = evt["subtype"]
+                payload = evt["payload"]
+
+                if subtype == "file_modified" or subtype == "file_created":
+                    file_path = payload.get("file_path", payload.get("detail", "unknown"))
+                    lines.append(f"- [{subtype}] {file_path}")
                 elif subtype == "agent_deployed":
                     agent = payload.get("agent_type", "unknown")
                     desc = payload.get("description", "")
@@ -454,219 +1780,1870 @@ def synthesize_active_context(
                     detail = payload.get("detail", str(payload)[:100])
                     lines.append(f"- [{subtype}] {detail}")
 
-            lines.append("")
+            lines.append("")
+
+    # Next Steps (from pending tasks)
+    pending = [t for t in tasks if t["payload"].get("status") == "pending"]
+    in_progress = [t for t in tasks if t["payload"].get("status") == "in_progress"]
+    blocked = [t for t in tasks if t["payload"].get("status") == "blocked"]
+
+    if pending or in_progress or blocked:
+        lines.append("## Next Steps")
+        lines.append("")
+
+        if in_progress:
+            lines.append("**In Progress**:")
+            for t in in_progress[-5:]:
+                subject = t["payload"].get("subject", "Unknown task")
+                lines.append(f"- {subject}")
+            lines.append("")
+
+        if pending:
+            lines.append("**Pending**:")
+            for t in pending[-10:]:
+                subject = t["payload"].get("subject", "Unknown task")
+                lines.append(f"- [ ] {subject}")
+            lines.append("")
+
+        if blocked:
+            lines.append("**Blocked**:")
+            for t in blocked[-5:]:
+                subject = t["payload"].get("subject", "Unknown task")
+                reason = t["payload"].get("context", "")
+                lines.append(f"- {subject}" + (f" ({reason})" if reason else ""))
+            lines.append("")
+
+    return "\n".join(lines)
+
+
+# =============================================================================
+# Compressed Archives - Block-compressed monthly files with a block index
+# =============================================================================
+#
+# archive/events-YYYY-MM.jsonl.gz is a series of independent gzip members of
+# up to ARCHIVE_BLOCK_EVENTS lines each (so `zcat` still reads it whole).
+# The sidecar events-YYYY-MM.jsonl.gz.idx lists one member per line:
+#
+#   <offset>\t<length>\t<events>\t<earliest timestamp>\t<latest timestamp>
+#
+# Readers decompress only members whose time range overlaps the query. Only
+# rotation (under the events flock) writes the block index; readers that find
+# it behind the data locate the missing members in memory. Plain .jsonl
+# archives from before compression are still read, just without pruning.
+
+ARCHIVE_BLOCK_EVENTS = 512
+ARCHIVE_COMPRESS_LEVEL = 6
+
+
+def archive_month_paths(month: str) -> List[Path]:
+    """Existing archive files for a YYYY-MM month (legacy plain file first)"""
+    return [
+        path for path in (ARCHIVE_DIR / f"events-{month}.jsonl", ARCHIVE_DIR / f"events-{month}.jsonl.gz")
+        if path.exists()
+    ]
+
+
+def list_archive_files() -> List[Path]:
+    """All archive files, oldest month first"""
+    if not ARCHIVE_DIR.exists():
+        return []
+    paths = list(ARCHIVE_DIR.glob("events-*.jsonl")) + list(ARCHIVE_DIR.glob("events-*.jsonl.gz"))
+    return sorted(paths, key=lambda p: (p.name.split(".", 1)[0], p.suffix == ".gz"))
+
+
+def _archive_index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _block_time_range(data: bytes) -> Tuple[int, str, str]:
+    """Return (events, earliest, latest) for the decompressed lines of a block"""
+    count, earliest, latest = 0, "", ""
+    for raw in data.splitlines():
+        try:
+            ts = json.loads(raw).get("timestamp", "") or ""
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+            continue
+        count += 1
+        if not earliest or ts < earliest:
+            earliest = ts
+        if ts > latest:
+            latest = ts
+    return count, earliest, latest
+
+
+def _scan_archive_blocks(f, start: int) -> List[Tuple[int, int, int, str, str]]:
+    """Locate complete gzip members from start onward (for an index that lags)"""
+    blocks = []
+    f.seek(start)
+    pending = f.read()
+    offset = start
+    while pending:
+        decomp = zlib.decompressobj(wbits=31)
+        try:
+            data = decomp.decompress(pending)
+        except zlib.error:
+            break
+        if not decomp.eof:
+            break  # Member still being written
+        length = len(pending) - len(decomp.unused_data)
+        blocks.append((offset, length) + _block_time_range(data))
+        offset += length
+        pending = decomp.unused_data
+    return blocks
+
+
+def _load_archive_index(path: Path) -> List[Tuple[int, int, int, str, str]]:
+    """Block records as written to the index file"""
+    blocks = []
+    try:
+        with open(_archive_index_path(path), 'r', encoding="utf-8", errors="replace") as idx:
+            for line in idx:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) == 5:
+                    blocks.append((int(parts[0]), int(parts[1]), int(parts[2]), parts[3], parts[4]))
+    except (FileNotFoundError, ValueError):
+        return []
+    return blocks
+
+
+def _read_archive_index(path: Path) -> List[Tuple[int, int, int, str, str]]:
+    """Block records for a compressed archive, including any the index lacks"""
+    blocks = _load_archive_index(path)
+    covered = blocks[-1][0] + blocks[-1][1] if blocks else 0
+    size = path.stat().st_size
+    if covered != size:
+        with open(path, 'rb') as f:
+            if covered > size:
+                blocks, covered = [], 0  # Index describes a different file
+            blocks = blocks + _scan_archive_blocks(f, covered)
+    return blocks
+
+
+class ArchiveWriter:
+    """
+    Appends raw event lines to one month's compressed archive.
+
+    Lines are buffered into gzip members of ARCHIVE_BLOCK_EVENTS; close()
+    writes the final partial block, fsyncs the data, then records the new
+    blocks in the index. Callers must hold the events flock.
+    """
+
+    def __init__(self, month: str):
+        self.path = ARCHIVE_DIR / f"events-{month}.jsonl.gz"
+        self._lines: List[bytes] = []
+        self._earliest = ""
+        self._latest = ""
+        self._blocks: List[Tuple[int, int, int, str, str]] = []
+
+        records = _read_archive_index(self.path) if self.path.exists() else []
+        if records != _load_archive_index(self.path):
+            # Persist blocks a crashed rotation wrote but never indexed
+            _write_archive_index(self.path, records)
+
+        self._file = open(self.path, 'ab')
+        # Drop a torn trailing member so new blocks start on a boundary
+        self.start = records[-1][0] + records[-1][1] if records else 0
+        if os.fstat(self._file.fileno()).st_size != self.start:
+            self._file.truncate(self.start)
+            self._file.seek(0, os.SEEK_END)
+
+    def add(self, raw: bytes, timestamp: str):
+        self._lines.append(raw)
+        if not self._earliest or timestamp < self._earliest:
+            self._earliest = timestamp
+        if timestamp > self._latest:
+            self._latest = timestamp
+        if len(self._lines) >= ARCHIVE_BLOCK_EVENTS:
+            self._flush_block()
+
+    def _flush_block(self):
+        if not self._lines:
+            return
+        data = _gzip_member(b"".join(self._lines))
+        offset = self._file.tell()
+        self._file.write(data)
+        self._blocks.append((offset, len(data), len(self._lines), self._earliest, self._latest))
+        self._lines, self._earliest, self._latest = [], "", ""
+
+    def close(self):
+        """Write remaining lines, make them durable, then index the new blocks"""
+        self._flush_block()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        with open(_archive_index_path(self.path), 'a') as idx:
+            for block in self._blocks:
+                idx.write("\t".join(str(v) for v in block) + "\n")
+
+    def rollback(self):
+        """Discard everything written since the writer was opened"""
+        if not self._file.closed:
+            self._file.close()
+        _truncate_archive(self.path, self.start)
+
+
+def _write_archive_index(path: Path, blocks: List[Tuple[int, int, int, str, str]]):
+    """Atomically replace an archive's block index"""
+    index_path = _archive_index_path(path)
+    tmp = index_path.with_name(index_path.name + ".tmp")
+    tmp.write_text("".join("\t".join(str(v) for v in block) + "\n" for block in blocks))
+    os.replace(tmp, index_path)
+
+
+def _truncate_archive(path: Path, size: int):
+    """Cut an archive (and its index) back to its first size bytes"""
+    if not path.exists():
+        return
+    blocks = [b for b in _read_archive_index(path) if b[0] + b[1] <= size]
+    _write_archive_index(path, blocks)
+    os.truncate(path, size)
+
+
+def _gzip_member(data: bytes) -> bytes:
+    """Compress data as one standalone gzip member"""
+    compressor = zlib.compressobj(ARCHIVE_COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def archive_files_in_range(since: Optional[str] = None, until: Optional[str] = None) -> List[Path]:
+    """Archive files whose month can hold events in [since, until], oldest first"""
+    first = since[:7] if since else None
+    last = until[:7] if until else None
+    return [
+        path for path in list_archive_files()
+        if not (first and _archive_month(path) < first) and not (last and _archive_month(path) > last)
+    ]
+
+
+def _archive_month(path: Path) -> str:
+    return path.name[len("events-"):].split(".", 1)[0]
+
+
+def iter_archive_blocks(
+    path: Path,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    newest_first: bool = False
+):
+    """
+    Yield the raw lines of each block of a compressed archive as a list.
+
+    Blocks whose time range falls entirely outside [since, until] are never
+    read or decompressed.
+    """
+    blocks = _read_archive_index(path)
+    if newest_first:
+        blocks.reverse()
+    with open(path, 'rb') as f:
+        for offset, length, _count, earliest, latest in blocks:
+            if (since and latest < since) or (until and earliest > until):
+                continue
+            f.seek(offset)
+            try:
+                yield zlib.decompress(f.read(length), wbits=31).splitlines(keepends=True)
+            except zlib.error:
+                continue
+
+
+def _archive_lines_reverse(path: Path, since: Optional[str] = None, until: Optional[str] = None):
+    """Yield raw lines of one archive file, last first"""
+    if path.suffix == ".gz":
+        for lines in iter_archive_blocks(path, since, until, newest_first=True):
+            yield from reversed(lines)
+        return
+    with open(path, 'rb') as f:
+        for _, raw in iter_lines_reverse(f):
+            yield raw
+
+
+def iter_archive_events(path: Path, since: Optional[str] = None, until: Optional[str] = None):
+    """
+    Yield events from one archive file, oldest block first.
+
+    For compressed archives, blocks outside [since, until] are skipped
+    without decompressing them (see iter_archive_blocks).
+    """
+    if path.suffix == ".gz":
+        lines = (raw for block in iter_archive_blocks(path, since, until) for raw in block)
+    else:
+        lines = _iter_file_lines(path)
+
+    for raw in lines:
+        if not raw.strip():
+            continue
+        try:
+            event = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if not isinstance(event, dict):
+            continue
+        ts = event.get("timestamp", "")
+        if (since and ts < since) or (until and ts > until):
+            continue
+        yield event
+
+
+def _iter_file_lines(path: Path):
+    with open(path, 'rb') as f:
+        yield from f
+
+
+def iter_events(
+    session_id: Optional[str] = None,
+    event_type: Optional[str] = None,
+    subtype: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """
+    Yield matching events oldest-first across archives and the live log.
+
+    Treats archive/ plus events.jsonl as one time-partitioned store:
+    archive months outside [since, until] are skipped by file name.
+    """
+    if get_event_backend() == "sqlite":
+        yield from _sqlite_iter_events(session_id, event_type, subtype, since, until, newest_first=False)
+        return
+
+    for path in archive_files_in_range(since, until):
+        for event in iter_archive_events(path, since, until):
+            if _event_matches(event, session_id, event_type, subtype, since, until):
+                yield event
+
+    if EVENTS_FILE.exists():
+        for event in _iter_jsonl_events(EVENTS_FILE):
+            if _event_matches(event, session_id, event_type, subtype, since, until):
+                yield event
+
+
+def read_new_events(position: Optional[Dict], since: Optional[str] = None) -> Tuple[List[Dict], Dict]:
+    """
+    Events added to the store after `position`, sorted by timestamp, and
+    the position to pass next time (None: everything at or after `since`).
+    For readers that fold the store in incrementally.
+
+    For JSONL the position is the events.jsonl inode and offset. If that
+    file has been replaced since (rotation, compaction), events are picked
+    by timestamp instead, from the archives and the new live file. An
+    event can be appended after one with a later timestamp (see
+    REVERSE_ORDER_SLACK). So the pick starts that far before the newest
+    timestamp returned so far ("through"), and skips the ids the position
+    lists as already returned from that stretch ("recent"). For SQLite the
+    position is the last row seq. Events before `since` are skipped.
+    """
+    if get_event_backend() == "sqlite":
+        return _sqlite_read_new_events(position, since)
+
+    position = dict(position or {})
+    events = []
+
+    def appended(f):
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break  # Partial line still being written
+            position["offset"] += len(raw)
+            event = _parse_event_line(raw)
+            if event is not None:
+                yield event
+
+    def archived(bound: str):
+        for path in archive_files_in_range(since=bound):
+            yield from iter_archive_events(path, since=bound)
+
+    bound, keep = _resume_filter(position, since)
+    try:
+        with open(EVENTS_FILE, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if position.get("inode") == st.st_ino and position.get("offset", 0) <= st.st_size:
+                f.seek(position["offset"])
+                events.extend(e for e in appended(f) if not since or e.get("timestamp", "") >= since)
+            else:
+                events.extend(filter(keep, archived(bound)))
+                position["offset"] = 0
+                events.extend(filter(keep, appended(f)))
+            position["inode"] = st.st_ino
+    except FileNotFoundError:
+        events.extend(filter(keep, archived(bound)))
+        position.update(inode=None, offset=0)
+
+    return _finish_new_events(events, position)
+
+
+def _resume_filter(position: Dict, since: Optional[str]):
+    """
+    (bound, keep) for reading on at a position without a usable cursor:
+    nothing before bound can be new, and keep(event) drops what was returned
+    """
+    through = position.get("through") or ""
+    recent = position.get("recent")
+    tracked = isinstance(recent, dict)
+    if tracked:
+        bound = max(since or "", _reverse_stop_bound(through) or "")
+    else:
+        # Positions from before "recent" was kept: only later timestamps are known new
+        bound = max(since or "", through)
+
+    def keep(event: Dict) -> bool:
+        timestamp = event.get("timestamp", "")
+        if timestamp < bound:
+            return False
+        event_id = event.get("id")
+        if not tracked or event_id is None:
+            return timestamp > through
+        return event_id not in recent
+
+    return bound, keep
+
+
+def _finish_new_events(events: List[Dict], position: Dict) -> Tuple[List[Dict], Dict]:
+    """Sort new events and advance the position's "through" and "recent" past them"""
+    events.sort(key=lambda e: e.get("timestamp", ""))
+    through = position.get("through") or ""
+    if events:
+        through = max(through, events[-1].get("timestamp", ""))
+        position["through"] = through
+
+    bound = _reverse_stop_bound(through) or ""
+    recent = dict(position["recent"]) if isinstance(position.get("recent"), dict) else {}
+    recent.update((e["id"], e.get("timestamp", "")) for e in events if e.get("id") is not None)
+    position["recent"] = {event_id: ts for event_id, ts in recent.items() if ts >= bound}
+    return events, position
+
+
+def compress_archives() -> Dict:
+    """Convert legacy plain archive/events-YYYY-MM.jsonl files to compressed archives"""
+    converted = []
+    with locked_events_file() as events_f:
+        if events_f is not None:
+            _recover_rotation(os.fstat(events_f.fileno()).st_ino)
+        for path in sorted(ARCHIVE_DIR.glob("events-*.jsonl")) if ARCHIVE_DIR.exists() else []:
+            month = path.name[len("events-"):-len(".jsonl")]
+            writer = ArchiveWriter(month)
+            try:
+                with open(path, 'rb') as f:
+                    for raw in f:
+                        if not raw.strip():
+                            continue
+                        try:
+                            ts = json.loads(raw).get("timestamp", "") or ""
+                        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                            continue
+                        writer.add(raw if raw.endswith(b'\n') else raw + b'\n', ts)
+                writer.close()
+            except OSError as e:
+                writer.rollback()
+                return {"error": f"Compressing {path.name} failed: {e}", "converted": converted}
+            path.unlink()
+            converted.append(path.name)
+    return {"converted": converted}
+
+
+def _fsync_dir(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_rotate_journal(inode: int, archives: Dict[str, ArchiveWriter]):
+    """Record where each archive ended before this rotation touched it"""
+    tmp = ROTATE_JOURNAL.with_name(ROTATE_JOURNAL.name + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump({"inode": inode, "archives": {w.path.name: w.start for w in archives.values()}}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, ROTATE_JOURNAL)
+    _fsync_dir(EVENTS_DIR)
+
+
+def _recover_rotation(inode: int):
+    """
+    Undo archive appends of a rotation that died before swapping the log.
+
+    Caller must hold the events flock. If events.jsonl is still the file the
+    journal names, its lines were never removed, so anything the rotation
+    added to archives would be a duplicate.
+    """
+    try:
+        journal = json.loads(ROTATE_JOURNAL.read_text())
+    except FileNotFoundError:
+        return
+    except json.JSONDecodeError:
+        journal = {}
+
+    if journal.get("inode") == inode:
+        for name, size in journal.get("archives", {}).items():
+            _truncate_archive(ARCHIVE_DIR / name, size)
+    ROTATE_JOURNAL.unlink()
+
+
+def rotate_events(days_threshold: int = 30) -> Dict:
+    """
+    Archive events older than threshold to monthly files.
+
+    Streams the log under the events flock, classifying lines by the
+    timestamps in events.idx and moving them as raw bytes: old lines into
+    compressed monthly blocks (see ArchiveWriter), retained lines into a
+    temp file that is fsynced and renamed over events.jsonl. Concurrent
+    appends wait for rotation instead of being lost. A failure or crash
+    before the rename leaves the old log intact, and the archive appends
+    are rolled back (on the spot, or via rotate.journal by the next
+    rotation).
+    """
+
+    if get_event_backend() == "sqlite":
+        return _sqlite_rotate_events(days_threshold)
+
+    if not EVENTS_FILE.exists():
+        return {"archived": 0, "retained": 0}
+
+    ARCHIVE_DIR.mkdir(exist_ok=True)
+
+    cutoff = datetime.now(tz=None) - timedelta(days=days_threshold)
+    cutoff_str = cutoff.isoformat() + "Z"
+
+    try:
+        with locked_events_file() as f:
+            if f is None:
+                return {"archived": 0, "retained": 0}
+            _recover_rotation(os.fstat(f.fileno()).st_ino)
+            return _rotate_locked(f, cutoff_str)
+    except OSError as e:
+        return {"error": f"Rotation failed: {e}"}
+
+
+def _rotate_locked(f, cutoff_str: str) -> Dict:
+    """Body of rotate_events; caller holds the flock on f (events.jsonl)"""
+    old_inode = os.fstat(f.fileno()).st_ino
+    tmp_events = EVENTS_FILE.with_name(EVENTS_FILE.name + ".rotate")
+    tmp_index = INDEX_FILE.with_name(INDEX_FILE.name + ".rotate")
+    archives: Dict[str, ArchiveWriter] = {}
+    archived_count = 0
+    retained_count = 0
+    swapped = False
+
+    try:
+        _sync_index(f.fileno())
+        try:
+            ledger = _sync_ledger(f.fileno())
+        except OSError:
+            ledger = None  # Re-folded from the new log on next use
+        retained_sessions = []
+
+        with open(tmp_events, 'wb') as out, open(tmp_index, 'w') as idx_out, \
+                open(INDEX_FILE, 'r', encoding="utf-8", errors="replace") as idx_in:
+            new_inode = os.fstat(out.fileno()).st_ino
+            idx_out.write(f"{_INDEX_HEADER_PREFIX}{new_inode}\n")
+            stats = _empty_stats(new_inode)
+
+            idx_in.readline()  # Header
+            offset = 0
+            for record in idx_in:
+                parts = record.rstrip('\n').split('\t')
+                raw = f.read(int(parts[1]))
+                if len(parts) != 6:
+                    continue  # Blank or undecodable line: dropped
+                if not raw.endswith(b'\n'):
+                    raw += b'\n'
+
+                timestamp, session_id, event_type, subtype = parts[2:]
+                if timestamp < cutoff_str:
+                    # Archive by month
+                    month_key = timestamp[:7]  # YYYY-MM
+                    if month_key not in archives:
+                        archives[month_key] = ArchiveWriter(month_key)
+                        _write_rotate_journal(old_inode, archives)
+                    archives[month_key].add(raw, timestamp)
+                    archived_count += 1
+                else:
+                    out.write(raw)
+                    idx_out.write("\t".join([str(offset), str(len(raw))] + parts[2:]) + "\n")
+                    _apply_stats(stats, [{
+                        "timestamp": timestamp,
+                        "session_id": session_id,
+                        "type": event_type or "unknown",
+                        "subtype": subtype or "unknown"
+                    }])
+                    offset += len(raw)
+                    retained_sessions.append((offset, timestamp, session_id))
+                    retained_count += 1
+
+            if not archived_count:
+                tmp_events.unlink()
+                tmp_index.unlink()
+                return {"archived": 0, "retained": retained_count, "archive_files": []}
+
+            # Archives must be durable before their lines leave the log
+            for archive in archives.values():
+                archive.close()
+            out.flush()
+            os.fsync(out.fileno())
+            stats["offset"] = offset
+
+        # Swap in the sidecars first: anyone who opens events.jsonl
+        # after the rename must find them describing the new file
+        os.replace(tmp_index, INDEX_FILE)
+        try:
+            _save_stats(stats)
+        except OSError:
+            STATS_FILE.unlink(missing_ok=True)
+        if ledger is not None:
+            _renumber_ledger(ledger, new_inode)
+            _apply_ledger(ledger, retained_sessions)
+            ledger["offset"] = offset
+            try:
+                _save_ledger(ledger)
+            except OSError:
+                pass  # The old ledger still holds every session; it re-folds the new log
+        os.replace(tmp_events, EVENTS_FILE)
+        swapped = True
+        _fsync_dir(EVENTS_DIR)
+        ROTATE_JOURNAL.unlink(missing_ok=True)
+
+    except OSError:
+        if not swapped:
+            for tmp in (tmp_events, tmp_index):
+                tmp.unlink(missing_ok=True)
+            for archive in archives.values():
+                archive.rollback()
+        ROTATE_JOURNAL.unlink(missing_ok=True)
+        raise
+
+    return {
+        "archived": archived_count,
+        "retained": retained_count,
+        "archive_files": list(archives.keys())
+    }
+
+
+def get_stats(rebuild: bool = False) -> Dict:
+    """
+    Get event store statistics.
+
+    Served from the stats.json snapshot, so only events appended since the
+    last checkpoint are read. rebuild=True recomputes it from the whole log.
+    """
+
+    if get_event_backend() == "sqlite":
+        return _sqlite_get_stats()
+
+    snapshot = _empty_stats()
+
+    with locked_events_file() as f:
+        if f is not None:
+            try:
+                snapshot = _sync_stats(f.fileno(), rebuild=rebuild)
+            except OSError:
+                # Snapshot can't be written; count without checkpointing
+                snapshot = _scan_stats(_empty_stats(), f, os.fstat(f.fileno()).st_size)
+
+    stats = {
+        "backend": "jsonl",
+        "events_file": str(EVENTS_FILE),
+        "total_events": snapshot["total_events"],
+        "by_type": snapshot["by_type"],
+        "by_subtype": snapshot["by_subtype"],
+        "date_range": {"earliest": snapshot["earliest"], "latest": snapshot["latest"]},
+        "archive_files": [],
+        "session_count": len(snapshot["sessions"])
+    }
+
+    # Check archives
+    stats["archive_files"] = [f.name for f in list_archive_files()]
+
+    return stats
 
-    # Next Steps (from pending tasks)
-    pending = [t for t in tasks if t["payload"].get("status") == "pending"]
-    in_progress = [t for t in tasks if t["payload"].get("status") == "in_progress"]
-    blocked = [t for t in tasks if t["payload"].get("status") == "blocked"]
 
-    if pending or in_progress or blocked:
-        lines.append("## Next Steps")
-        lines.append("")
+# =============================================================================
+# SQLite Backend - Indexed storage behind the same emit/query/rotate/stats API
+# =============================================================================
+#
+# Enabled with "eventBackend": "sqlite" in .asha/config.json (or
+# ASHA_EVENT_BACKEND=sqlite). Events live in Memory/events/events.db with the
+# full JSON record in `data`; rotation flags rows as archived instead of
+# moving them, so history stays queryable through the same indexes.
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT UNIQUE,
+    timestamp TEXT NOT NULL DEFAULT '',
+    session_id TEXT,
+    type TEXT,
+    subtype TEXT,
+    archived INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events(session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_type ON events(type, subtype, timestamp);
+CREATE TABLE IF NOT EXISTS claims (
+    file_path TEXT PRIMARY KEY,
+    agent TEXT,
+    reason TEXT,
+    claimed_at TEXT,
+    event_id TEXT
+);
+"""
 
-        if in_progress:
-            lines.append("**In Progress**:")
-            for t in in_progress[-5:]:
-                subject = t["payload"].get("subject", "Unknown task")
-                lines.append(f"- {subject}")
-            lines.append("")
+SQLITE_IMPORT_BATCH = 5000
 
-        if pending:
-            lines.append("**Pending**:")
-            for t in pending[-10:]:
-                subject = t["payload"].get("subject", "Unknown task")
-                lines.append(f"- [ ] {subject}")
-            lines.append("")
 
-        if blocked:
-            lines.append("**Blocked**:")
-            for t in blocked[-5:]:
-                subject = t["payload"].get("subject", "Unknown task")
-                reason = t["payload"].get("context", "")
-                lines.append(f"- {subject}" + (f" ({reason})" if reason else ""))
-            lines.append("")
+def _sqlite_connect():
+    """Open events.db in WAL mode, creating the schema if needed"""
+    import sqlite3
 
-    return "\n".join(lines)
+    conn = sqlite3.connect(str(EVENTS_DB), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SQLITE_SCHEMA)
+    return conn
 
 
-def rotate_events(days_threshold: int = 30) -> Dict:
-    """Archive events older than threshold to monthly files"""
+def _sqlite_row(event: Dict, archived: int = 0) -> Tuple:
+    return (
+        event.get("id"),
+        event.get("timestamp", ""),
+        event.get("session_id"),
+        event.get("type"),
+        event.get("subtype"),
+        archived,
+        json.dumps(event, ensure_ascii=False)
+    )
 
-    if not EVENTS_FILE.exists():
-        return {"archived": 0, "retained": 0}
 
-    ARCHIVE_DIR.mkdir(exist_ok=True)
+def _sqlite_apply_claims(conn, events: List[Dict]):
+    """Fold claim events into the claims table (same rules as claims.json)"""
+    claims: Dict[str, Optional[dict]] = {}
+    for event in events:
+        path = (event.get("payload") or {}).get("file_path")
+        if not path:
+            continue
+        scratch = {}
+        _apply_claim_events(scratch, [event])
+        claims[path] = scratch.get(path)
 
-    cutoff = datetime.now(tz=None) - timedelta(days=days_threshold)
-    cutoff_str = cutoff.isoformat() + "Z"
+    for path, claim in claims.items():
+        if claim is None:
+            conn.execute("DELETE FROM claims WHERE file_path = ?", (path,))
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO claims VALUES (?, ?, ?, ?, ?)",
+                (path, claim["agent"], claim["reason"], claim["claimed_at"], claim["event_id"])
+            )
 
-    current_events = []
-    archived_count = 0
-    archive_files: Dict[str, List] = {}
 
-    with open(EVENTS_FILE, 'r') as f:
-        for line in f:
-            if not line.strip():
-                continue
+class SqliteEventWriter:
+    """EventAppender counterpart for the SQLite backend"""
+
+    def __init__(self):
+        self._conn = None
+
+    def write(self, events: List[Dict]):
+        """Insert events (and any claim changes) in one transaction"""
+        if not events:
+            return
+        if self._conn is None:
+            self._conn = _sqlite_connect()
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO events (id, timestamp, session_id, type, subtype, archived, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [_sqlite_row(event) for event in events]
+            )
+            claim_events = [e for e in events if e.get("type") == "claim"]
+            if claim_events:
+                _sqlite_apply_claims(self._conn, claim_events)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _sqlite_where(
+    session_id: Optional[str],
+    event_type: Optional[str],
+    subtype: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    include_archived: bool = False
+) -> Tuple[str, List]:
+    clauses = [] if include_archived else ["archived = 0"]
+    params: List = []
+    for column, value in (("session_id", session_id), ("type", event_type), ("subtype", subtype)):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        clauses.append("timestamp <= ?")
+        params.append(until)
+    return " AND ".join(clauses) or "1", params
+
+
+def _sqlite_query_events(
+    session_id: Optional[str],
+    event_type: Optional[str],
+    subtype: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    limit: int,
+    include_archives: bool = True
+) -> Dict:
+    if not EVENTS_DB.exists():
+        return {"events": [], "count": 0, "total_scanned": 0, "complete": limit > 0}
+
+    where, params = _sqlite_where(session_id, event_type, subtype, since, until, include_archives)
+    conn = _sqlite_connect()
+    try:
+        rows = conn.execute(
+            f"SELECT data FROM events WHERE {where} ORDER BY timestamp DESC, seq DESC LIMIT ?",
+            params + [max(limit, 0)]
+        ).fetchall()
+    finally:
+        conn.close()
+
+    events = [json.loads(data) for (data,) in rows]
+    return {
+        "events": events,
+        "count": len(events),
+        "total_scanned": len(events),
+        "complete": len(events) < limit
+    }
+
+
+def _sqlite_iter_events(
+    session_id: Optional[str],
+    event_type: Optional[str],
+    subtype: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    include_archives: bool = True,
+    newest_first: bool = True
+):
+    if not EVENTS_DB.exists():
+        return
+
+    where, params = _sqlite_where(session_id, event_type, subtype, since, until, include_archives)
+    order = "DESC" if newest_first else "ASC"
+    conn = _sqlite_connect()
+    try:
+        cursor = conn.execute(
+            f"SELECT data FROM events WHERE {where} ORDER BY timestamp {order}, seq {order}", params
+        )
+        for (data,) in cursor:
+            yield json.loads(data)
+    finally:
+        conn.close()
 
-            try:
-                event = json.loads(line)
-            except json.JSONDecodeError:
-                continue
 
-            event_time = event.get("timestamp", "")
+def _sqlite_read_new_events(position: Optional[Dict], since: Optional[str]) -> Tuple[List[Dict], Dict]:
+    """read_new_events() for the SQLite backend: rows with seq past the position's"""
+    position = dict(position or {})
+    if not EVENTS_DB.exists():
+        return [], position
 
-            if event_time < cutoff_str:
-                # Archive by month
-                month_key = event_time[:7]  # YYYY-MM
-                if month_key not in archive_files:
-                    archive_files[month_key] = []
-                archive_files[month_key].append(event)
-                archived_count += 1
+    conn = _sqlite_connect()
+    try:
+        last = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+        seq = position.get("seq")
+        if isinstance(seq, int) and seq <= last:
+            events = [json.loads(data) for (data,) in conn.execute(
+                "SELECT data FROM events WHERE seq > ? AND seq <= ? AND timestamp >= ?",
+                (seq, last, since or "")
+            )]
+        else:
+            # No position in this database (first read, or another backend's)
+            bound, keep = _resume_filter(position, since)
+            events = list(filter(keep, (json.loads(data) for (data,) in conn.execute(
+                "SELECT data FROM events WHERE seq <= ? AND timestamp >= ?", (last, bound)
+            ))))
+    finally:
+        conn.close()
+
+    position = {"seq": last, "through": position.get("through"), "recent": position.get("recent")}
+    return _finish_new_events(events, position)
+
+
+def _sqlite_follow_events(
+    session_id: Optional[str],
+    event_type: Optional[str],
+    subtype: Optional[str],
+    poll_interval: float,
+    idle_timeout: Optional[float]
+):
+    """follow_events() for the SQLite backend: rows with seq past the last seen"""
+    watcher = EventsWatcher((EVENTS_DB.name, EVENTS_DB.name + "-wal"), poll_interval)
+    where, params = _sqlite_where(session_id, event_type, subtype, None, None, include_archived=True)
+    conn = _sqlite_connect()
+    last_yield = time.monotonic()
+    try:
+        last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+        while True:
+            newest = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+            if newest > last_seq:
+                rows = conn.execute(
+                    f"SELECT data FROM events WHERE seq > ? AND seq <= ? AND {where} ORDER BY seq",
+                    [last_seq, newest] + params
+                ).fetchall()
+                last_seq = newest
+                for (data,) in rows:
+                    last_yield = time.monotonic()
+                    yield json.loads(data)
+
+            if idle_timeout is not None:
+                remaining = idle_timeout - (time.monotonic() - last_yield)
+                if remaining <= 0:
+                    return
+                watcher.wait(remaining)
             else:
-                current_events.append(event)
+                watcher.wait()
+    finally:
+        watcher.close()
+        conn.close()
 
-    # Append to archive files
-    for month_key, events in archive_files.items():
-        archive_path = ARCHIVE_DIR / f"events-{month_key}.jsonl"
-        with open(archive_path, 'a') as f:
-            for event in events:
-                f.write(json.dumps(event, ensure_ascii=False) + '\n')
 
-    # Rewrite current events file
-    with open(EVENTS_FILE, 'w') as f:
-        for event in current_events:
-            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+def _sqlite_load_claims() -> Dict[str, dict]:
+    if not EVENTS_DB.exists():
+        return {}
+
+    conn = _sqlite_connect()
+    try:
+        rows = conn.execute(
+            "SELECT file_path, agent, reason, claimed_at, event_id FROM claims ORDER BY claimed_at"
+        ).fetchall()
+    finally:
+        conn.close()
 
     return {
-        "archived": archived_count,
-        "retained": len(current_events),
-        "archive_files": list(archive_files.keys())
+        path: {"file_path": path, "agent": agent, "reason": reason,
+               "claimed_at": claimed_at, "event_id": event_id}
+        for path, agent, reason, claimed_at, event_id in rows
     }
 
 
-def get_stats() -> Dict:
-    """Get event store statistics"""
+def _sqlite_rotate_events(days_threshold: int) -> Dict:
+    """Flag live rows older than the threshold as archived"""
+    if not EVENTS_DB.exists():
+        return {"archived": 0, "retained": 0}
 
+    cutoff_str = (datetime.now(tz=None) - timedelta(days=days_threshold)).isoformat() + "Z"
+    conn = _sqlite_connect()
+    try:
+        with conn:
+            months = [row[0] for row in conn.execute(
+                "SELECT DISTINCT substr(timestamp, 1, 7) FROM events "
+                "WHERE archived = 0 AND timestamp < ? ORDER BY 1", (cutoff_str,)
+            )]
+            archived = conn.execute(
+                "UPDATE events SET archived = 1 WHERE archived = 0 AND timestamp < ?", (cutoff_str,)
+            ).rowcount
+        retained = conn.execute("SELECT COUNT(*) FROM events WHERE archived = 0").fetchone()[0]
+    finally:
+        conn.close()
+
+    return {"archived": archived, "retained": retained, "archive_files": months}
+
+
+def _sqlite_get_stats() -> Dict:
     stats = {
-        "events_file": str(EVENTS_FILE),
+        "backend": "sqlite",
+        "events_file": str(EVENTS_DB),
         "total_events": 0,
-        "by_type": defaultdict(int),
-        "by_subtype": defaultdict(int),
-        "sessions": set(),
+        "by_type": {},
+        "by_subtype": {},
         "date_range": {"earliest": None, "latest": None},
-        "archive_files": []
+        "archive_files": [],
+        "session_count": 0,
+        "archived_events": 0
     }
 
+    if EVENTS_DB.exists():
+        conn = _sqlite_connect()
+        try:
+            live = "FROM events WHERE archived = 0"
+            total, sessions, earliest, latest = conn.execute(
+                f"SELECT COUNT(*), COUNT(DISTINCT session_id), MIN(timestamp), MAX(timestamp) {live}"
+            ).fetchone()
+            stats["total_events"] = total
+            stats["session_count"] = sessions
+            stats["date_range"] = {"earliest": earliest, "latest": latest}
+            stats["by_type"] = dict(conn.execute(
+                f"SELECT COALESCE(type, 'unknown'), COUNT(*) {live} GROUP BY 1"))
+            stats["by_subtype"] = dict(conn.execute(
+                f"SELECT COALESCE(subtype, 'unknown'), COUNT(*) {live} GROUP BY 1"))
+            stats["archived_events"] = conn.execute(
+                "SELECT COUNT(*) FROM events WHERE archived = 1").fetchone()[0]
+        finally:
+            conn.close()
+
+    stats["archive_files"] = [f.name for f in list_archive_files()]
+
+    return stats
+
+
+def _iter_jsonl_events(path: Path):
+    """Yield decoded events from a JSONL file, skipping undecodable lines"""
+    with open(path, 'rb') as f:
+        for raw in f:
+            if not raw.strip():
+                continue
+            try:
+                event = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(event, dict):
+                yield event
+
+
+def import_to_sqlite(activate: bool = False) -> Dict:
+    """
+    One-shot import of archive/events-* and events.jsonl into events.db.
+
+    Safe to re-run: rows are keyed by event id. Archived months are imported
+    as archived rows. With activate=True, switches .asha/config.json to the
+    SQLite backend once the import succeeds.
+    """
+    sources: List[Tuple[Path, int]] = [(path, 1) for path in list_archive_files()]
     if EVENTS_FILE.exists():
-        with open(EVENTS_FILE, 'r') as f:
-            for line in f:
-                if not line.strip():
+        sources.append((EVENTS_FILE, 0))
+
+    imported = 0
+    skipped = 0
+    conn = _sqlite_connect()
+    try:
+        for path, archived in sources:
+            batch: List[Tuple] = []
+            claim_events: List[Dict] = []
+            events = iter_archive_events(path) if archived else _iter_jsonl_events(path)
+            for event in events:
+                batch.append(_sqlite_row(event, archived))
+                if event.get("type") == "claim":
+                    claim_events.append(event)
+                if len(batch) >= SQLITE_IMPORT_BATCH:
+                    imported, skipped = _sqlite_import_batch(conn, batch, imported, skipped)
+                    batch = []
+            if batch:
+                imported, skipped = _sqlite_import_batch(conn, batch, imported, skipped)
+            if claim_events:
+                with conn:
+                    _sqlite_apply_claims(conn, claim_events)
+    finally:
+        conn.close()
+
+    result = {
+        "status": "imported",
+        "database": str(EVENTS_DB),
+        "sources": [str(path) for path, _ in sources],
+        "imported": imported,
+        "skipped_duplicates": skipped
+    }
+
+    if activate:
+        config = {}
+        try:
+            config = json.loads(PROJECT_CONFIG.read_text())
+        except (OSError, json.JSONDecodeError):
+            pass
+        config["eventBackend"] = "sqlite"
+        PROJECT_CONFIG.parent.mkdir(parents=True, exist_ok=True)
+        PROJECT_CONFIG.write_text(json.dumps(config, indent=2) + "\n")
+        result["activated"] = True
+
+    return result
+
+
+def _sqlite_import_batch(conn, batch: List[Tuple], imported: int, skipped: int) -> Tuple[int, int]:
+    with conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO events (id, timestamp, session_id, type, subtype, archived, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch
+        )
+        added = conn.total_changes - before
+    return imported + added, skipped + len(batch) - added
+
+
+# =============================================================================
+# Columnar Export - Per-field arrays for analytics without parsing JSON
+# =============================================================================
+#
+# Memory/events/columnar/ holds one little-endian binary file per column plus
+# manifest.json. timestamp.bin is int64 microseconds since the Unix epoch (0
+# if missing or unparseable); type, subtype, session_id and tool_name are
+# dictionary-encoded: codes index the column's "dictionary" list in the
+# manifest (null for a missing value). Each column records both a NumPy dtype
+# and an array-module typecode:
+#
+#   numpy.fromfile(dir / col["file"], dtype=col["dtype"])
+#   array.array(col["typecode"]).frombytes(...)   # or load_columnar()
+
+COLUMNAR_DIR = EVENTS_DIR / "columnar"
+COLUMNAR_VERSION = 1
+COLUMNAR_DICTIONARY_COLUMNS = ("type", "subtype", "session_id", "tool_name")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# (typecode, dtype) per code width, smallest first
+_CODE_TYPES = ((1, "B", "u1"), (2, "H", "u2"), (4, "I", "u4"))
+
+
+def _timestamp_us(timestamp: Any) -> int:
+    """Microseconds since the epoch for an event timestamp (naive = UTC)"""
+    if not isinstance(timestamp, str) or not timestamp:
+        return 0
+    try:
+        parsed = datetime.fromisoformat(timestamp[:-1] if timestamp.endswith("Z") else timestamp)
+    except ValueError:
+        return 0
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+def _snapshot_lines():
+    """
+    Raw event lines from archives then the live log, as of one instant.
+
+    Under the events flock, note each compressed archive's committed blocks
+    and keep a handle on events.jsonl; rotation only appends blocks and
+    swaps in a new live file, so reading exactly those afterwards sees
+    every event once even if a rotation runs meanwhile.
+    """
+    live = None
+    with locked_events_file() as f:
+        archives = [
+            (path, _read_archive_index(path) if path.suffix == ".gz" else None)
+            for path in list_archive_files()
+        ]
+        if f is not None:
+            live = open(os.dup(f.fileno()), 'rb')
+            live_size = os.fstat(live.fileno()).st_size
+
+    for path, blocks in archives:
+        if blocks is None:
+            yield from _iter_file_lines(path)
+            continue
+        with open(path, 'rb') as af:
+            for offset, length, _count, _earliest, _latest in blocks:
+                af.seek(offset)
+                try:
+                    yield from zlib.decompress(af.read(length), wbits=31).splitlines(keepends=True)
+                except zlib.error:
+                    continue
+
+    if live is not None:
+        with live:
+            live.seek(0)
+            remaining = live_size
+            for raw in live:
+                if remaining <= 0:
+                    break
+                remaining -= len(raw)
+                yield raw
+
+
+def _columnar_source_events():
+    if get_event_backend() == "sqlite":
+        yield from _sqlite_iter_events(None, None, None, None, None, newest_first=False)
+        return
+    for raw in _snapshot_lines():
+        event = _parse_event_line(raw)
+        if event is not None:
+            yield event
+
+
+def export_columnar(output: Optional[Path] = None) -> Dict:
+    """
+    Write every event (archives included) as a columnar snapshot.
+
+    The snapshot is built in a temporary directory and swapped in whole, so
+    readers never see a half-written one.
+    """
+    from array import array
+
+    output = Path(output) if output else COLUMNAR_DIR
+    timestamps = array("q")
+    codes = {name: array("I") for name in COLUMNAR_DICTIONARY_COLUMNS}
+    lookups: Dict[str, Dict[Any, int]] = {name: {} for name in COLUMNAR_DICTIONARY_COLUMNS}
+
+    for event in _columnar_source_events():
+        timestamps.append(_timestamp_us(event.get("timestamp")))
+        metadata = event.get("metadata")
+        values = (
+            event.get("type"),
+            event.get("subtype"),
+            event.get("session_id"),
+            metadata.get("tool_name") if isinstance(metadata, dict) else None
+        )
+        for name, value in zip(COLUMNAR_DICTIONARY_COLUMNS, values):
+            if not isinstance(value, str):
+                value = None
+            lookup = lookups[name]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            codes[name].append(code)
+
+    columns: Dict[str, Dict] = {}
+    data: Dict[str, "array"] = {"timestamp": timestamps}
+    columns["timestamp"] = {"file": "timestamp.bin", "dtype": "<i8", "typecode": "q", "unit": "us"}
+    for name in COLUMNAR_DICTIONARY_COLUMNS:
+        dictionary = list(lookups[name])
+        _width, typecode, dtype = next(t for t in _CODE_TYPES if len(dictionary) <= 1 << (8 * t[0]))
+        data[name] = codes[name] if typecode == "I" else array(typecode, codes[name])
+        columns[name] = {"file": f"{name}.bin", "dtype": f"<{dtype}", "typecode": typecode,
+                         "dictionary": dictionary}
+
+    manifest = {
+        "version": COLUMNAR_VERSION,
+        "rows": len(timestamps),
+        "created": datetime.now().isoformat() + "Z",
+        "columns": columns
+    }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    staging = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    staging.mkdir()
+    try:
+        for name, column in columns.items():
+            values = data[name]
+            if sys.byteorder == "big":
+                values.byteswap()
+            with open(staging / column["file"], 'wb') as f:
+                values.tofile(f)
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+
+        retired = output.with_name(f"{output.name}.{os.getpid()}.old")
+        if output.exists():
+            os.replace(output, retired)
+        os.replace(staging, output)
+        if retired.exists():
+            _remove_tree(retired)
+    except BaseException:
+        _remove_tree(staging)
+        raise
+
+    return {
+        "status": "exported",
+        "path": str(output),
+        "rows": manifest["rows"],
+        "bytes": sum((output / column["file"]).stat().st_size for column in columns.values()),
+        "dictionary_sizes": {name: len(columns[name]["dictionary"]) for name in COLUMNAR_DICTIONARY_COLUMNS}
+    }
+
+
+def _remove_tree(path: Path):
+    if not path.exists():
+        return
+    for child in path.iterdir():
+        child.unlink()
+    path.rmdir()
+
+
+def load_columnar(path: Optional[Path] = None) -> Dict:
+    """
+    Load a columnar snapshot with the stdlib array module.
+
+    Returns {"rows", "columns": {name: array}, "dictionaries": {name: list}}.
+    """
+    from array import array
+
+    path = Path(path) if path else COLUMNAR_DIR
+    manifest = json.loads((path / "manifest.json").read_text())
+    if manifest.get("version") != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar snapshot version: {manifest.get('version')}")
+
+    columns = {}
+    for name, column in manifest["columns"].items():
+        values = array(column["typecode"])
+        if values.itemsize != int(column["dtype"][2:]):
+            raise ValueError(f"array typecode {column['typecode']!r} is not {column['dtype']} on this platform")
+        with open(path / column["file"], 'rb') as f:
+            values.frombytes(f.read())
+        if sys.byteorder == "big":
+            values.byteswap()
+        columns[name] = values
+
+    return {
+        "rows": manifest["rows"],
+        "columns": columns,
+        "dictionaries": {
+            name: column["dictionary"] for name, column in manifest["columns"].items() if "dictionary" in column
+        }
+    }
+
+
+def columnar_daily_counts(snapshot: Dict, column: str = "subtype") -> Dict[str, Dict[str, int]]:
+    """Count events per UTC day and value of a dictionary column, from load_columnar() output"""
+    day_us = 86400 * 1000000
+    counts = Counter(zip((ts // day_us for ts in snapshot["columns"]["timestamp"]), snapshot["columns"][column]))
+    dictionary = snapshot["dictionaries"][column]
+
+    result: Dict[str, Dict[str, int]] = {}
+    for (day, code), count in sorted(counts.items()):
+        date = (_EPOCH + timedelta(days=day)).date().isoformat()
+        result.setdefault(date, {})[dictionary[code]] = count
+    return result
+
+
+# =============================================================================
+# Emitter Daemon - Long-lived writer so hooks don't start Python per event
+# =============================================================================
+
+EMITTER_SOCKET = PROJECT_ROOT / "Work" / "markers" / "emitter.sock"
+EMITTER_PID_FILE = PROJECT_ROOT / "Work" / "markers" / "emitter.pid"
+EMITTER_IDLE_TIMEOUT = 1800  # Seconds without a request before the daemon exits
+EMITTER_BATCH_MAX = 256  # Max queued events folded into one locked write
+EMITTER_MAX_REQUEST = 1024 * 1024
+EMITTER_REQUEST_TIMEOUT = 1.0  # Seconds a client has to send its request line
+EMITTER_CHECK_INTERVAL = 5.0  # Seconds between checks that Memory/events/ still exists
+
+# AF_UNIX paths are limited to ~108 bytes including the terminator
+_MAX_SOCKET_PATH = 100
+
+
+def send_to_emitter(request: Dict, timeout: float = 1.0) -> Optional[Dict]:
+    """
+    Send one request to the emitter daemon.
+
+    Returns the daemon's reply, or None if it is not running.
+    """
+    if not EMITTER_SOCKET.exists():
+        return None
+
+    import socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(EMITTER_SOCKET))
+            sock.sendall(json.dumps(request, ensure_ascii=False).encode() + b'\n')
+            reply = sock.makefile('rb').readline()
+    except OSError:
+        return None
+
+    try:
+        return json.loads(reply) if reply else None
+    except json.JSONDecodeError:
+        return None
+
+
+def _parse_request(data: bytes) -> Optional[Dict]:
+    """The JSON request on the first line a client sent (None if unusable)"""
+    line = data.split(b'\n', 1)[0]
+    if not line.strip():
+        return None
+
+    try:
+        request = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return request if isinstance(request, dict) else None
+
+
+def _emitter_writer(pending: "queue.Queue"):
+    """Drain queued events into the store, batching whatever has piled up"""
+    import queue
+    appender = open_event_writer()
+    running = True
+    try:
+        while running:
+            item = pending.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < EMITTER_BATCH_MAX:
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            try:
+                appender.write(batch)
+            except OSError as e:
+                print(json.dumps({"error": f"Emitter write failed: {e}"}), file=sys.stderr)
+    finally:
+        appender.close()
+
+
+def run_emitter(idle_timeout: float = EMITTER_IDLE_TIMEOUT) -> Dict:
+    """
+    Run the emitter daemon in the foreground.
+
+    Accepts one JSON request per connection on EMITTER_SOCKET:
+        {"type": ..., "subtype": ..., "payload": {...}, "source": ..., "tool_name": ...}
+        {"op": "ping"} / {"op": "stop"}
+    and answers each with one JSON line ({"status": "queued", ...} once an
+    event is accepted). Connections are read through a selector, so a slow
+    client only holds up itself, and one that sends no full line within
+    EMITTER_REQUEST_TIMEOUT is dropped. Events are validated and scrubbed
+    exactly like emit_event(), then appended by a single writer thread that
+    owns the events.jsonl handle.
+
+    Exits after idle_timeout seconds without a connection, on a stop
+    request, or once Memory/events/ is gone (the project was removed).
+    """
+    import queue
+    import signal
+    import socket
+    import selectors
+    import threading
+
+    if len(str(EMITTER_SOCKET)) > _MAX_SOCKET_PATH:
+        return {"error": f"Socket path too long for AF_UNIX: {EMITTER_SOCKET}"}
+
+    existing = send_to_emitter({"op": "ping"})
+    if existing:
+        return {"status": "already_running", "pid": existing.get("pid")}
+
+    EVENTS_DIR.mkdir(parents=True, exist_ok=True)
+    EMITTER_SOCKET.parent.mkdir(parents=True, exist_ok=True)
+    if EMITTER_SOCKET.exists() or EMITTER_SOCKET.is_symlink():
+        EMITTER_SOCKET.unlink()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(str(EMITTER_SOCKET))
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+    server.setblocking(False)
+    EMITTER_PID_FILE.write_text(str(os.getpid()))
+
+    if threading.current_thread() is threading.main_thread():
+        def _terminate(signum, frame):
+            raise SystemExit(0)
+        signal.signal(signal.SIGTERM, _terminate)
+
+    pending: "queue.Queue" = queue.Queue()
+    writer = threading.Thread(target=_emitter_writer, args=(pending,), daemon=True)
+    writer.start()
+
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    # Connection -> (bytes received so far, deadline for the request line)
+    clients: Dict[Any, Tuple[bytearray, float]] = {}
+
+    def drop(conn):
+        selector.unregister(conn)
+        del clients[conn]
+        conn.close()
+
+    def handle(request: Optional[Dict]) -> Optional[Dict]:
+        nonlocal accepted, reason
+        if request is None:
+            return None
+        op = request.get("op")
+        if op == "ping":
+            return {"status": "ok", "pid": os.getpid(), "accepted": accepted}
+        if op == "stop":
+            reason = "stopped"
+            return {"status": "stopping", "pid": os.getpid()}
+        error = validate_event_request(request)
+        if error is not None:
+            return {"error": error}
+        event = build_event(
+            event_type=request["type"],
+            subtype=request["subtype"],
+            payload=request.get("payload") or {},
+            source=request.get("source", "hook"),
+            tool_name=request.get("tool_name")
+        )
+        pending.put(event)
+        accepted += 1
+        return {"status": "queued", "event_id": event["id"]}
+
+    accepted = 0
+    reason = None
+    last_activity = next_check = time.monotonic()
+    try:
+        while reason is None:
+            now = time.monotonic()
+            for conn, (_, deadline) in list(clients.items()):
+                if deadline <= now:
+                    drop(conn)
+            if now >= next_check:
+                if not EVENTS_DIR.is_dir():
+                    reason = "project_removed"
+                    break
+                next_check = now + EMITTER_CHECK_INTERVAL
+            if not clients and now - last_activity >= idle_timeout:
+                reason = "idle"
+                break
+
+            wake = min([next_check, last_activity + idle_timeout] + [d for _, d in clients.values()])
+            for key, _ in selector.select(max(wake - now, 0)):
+                if key.fileobj is server:
+                    try:
+                        conn, _ = server.accept()
+                    except (BlockingIOError, InterruptedError):
+                        continue
+                    conn.setblocking(False)
+                    selector.register(conn, selectors.EVENT_READ)
+                    clients[conn] = (bytearray(), time.monotonic() + EMITTER_REQUEST_TIMEOUT)
+                    last_activity = time.monotonic()
+                    continue
+
+                conn = key.fileobj
+                if conn not in clients:
                     continue
                 try:
-                    event = json.loads(line)
-                    stats["total_events"] += 1
-                    stats["by_type"][event.get("type", "unknown")] += 1
-                    stats["by_subtype"][event.get("subtype", "unknown")] += 1
-                    stats["sessions"].add(event.get("session_id", ""))
-
-                    ts = event.get("timestamp", "")
-                    if ts:
-                        if stats["date_range"]["earliest"] is None or ts < stats["date_range"]["earliest"]:
-                            stats["date_range"]["earliest"] = ts
-                        if stats["date_range"]["latest"] is None or ts > stats["date_range"]["latest"]:
-                            stats["date_range"]["latest"] = ts
-                except json.JSONDecodeError:
-                    pass
+                    chunk = conn.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    drop(conn)
+                    continue
+                data = clients[conn][0]
+                data += chunk
+                if chunk and b'\n' not in chunk and len(data) < EMITTER_MAX_REQUEST:
+                    continue
 
-    # Check archives
-    if ARCHIVE_DIR.exists():
-        stats["archive_files"] = sorted([f.name for f in ARCHIVE_DIR.glob("events-*.jsonl")])
+                reply = handle(_parse_request(bytes(data)))
+                if reply is not None:
+                    try:
+                        conn.setblocking(True)
+                        conn.settimeout(EMITTER_REQUEST_TIMEOUT)
+                        conn.sendall(json.dumps(reply).encode() + b'\n')
+                    except OSError:
+                        pass  # Gone before reading its reply
+                drop(conn)
+                if reason is not None:
+                    break
+    finally:
+        for conn in list(clients):
+            drop(conn)
+        selector.close()
+        server.close()
+        pending.put(None)
+        writer.join()
+        for path in (EMITTER_SOCKET, EMITTER_PID_FILE):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    return {"status": reason or "stopped", "accepted": accepted}
+
+
+def start_emitter(wait: float = 2.0) -> Dict:
+    """Start the emitter daemon detached from the caller"""
+    existing = send_to_emitter({"op": "ping"})
+    if existing:
+        return {"status": "already_running", "pid": existing.get("pid")}
+
+    if len(str(EMITTER_SOCKET)) > _MAX_SOCKET_PATH:
+        return {"error": f"Socket path too long for AF_UNIX: {EMITTER_SOCKET}"}
+
+    import subprocess
+    env = dict(os.environ, CLAUDE_PROJECT_DIR=str(PROJECT_ROOT))
+    process = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "daemon", "run"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=str(PROJECT_ROOT),
+        env=env,
+        start_new_session=True
+    )
 
-    # Convert sets to counts for JSON serialization
-    stats["session_count"] = len(stats["sessions"])
-    del stats["sessions"]
-    stats["by_type"] = dict(stats["by_type"])
-    stats["by_subtype"] = dict(stats["by_subtype"])
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        reply = send_to_emitter({"op": "ping"})
+        if reply:
+            return {"status": "started", "pid": reply.get("pid"), "socket": str(EMITTER_SOCKET)}
+        if process.poll() is not None:
+            break
+        time.sleep(0.02)
 
-    return stats
+    return {"error": "Emitter daemon did not come up", "socket": str(EMITTER_SOCKET)}
+
+
+def stop_emitter() -> Dict:
+    """Ask a running emitter daemon to flush and exit"""
+    reply = send_to_emitter({"op": "stop"})
+    if reply is None:
+        return {"status": "not_running"}
+    return {"status": "stopped", "pid": reply.get("pid")}
+
+
+def emitter_status() -> Dict:
+    """Report whether the emitter daemon is reachable"""
+    reply = send_to_emitter({"op": "ping"})
+    if reply is None:
+        return {"status": "not_running", "socket": str(EMITTER_SOCKET)}
+    return {
+        "status": "running",
+        "pid": reply.get("pid"),
+        "accepted": reply.get("accepted", 0),
+        "socket": str(EMITTER_SOCKET)
+    }
 
 
 # =============================================================================
 # CLI Interface
 # =============================================================================
 
-def main():
+# CLI subcommands: name -> (help, function adding its arguments). Only the
+# invoked subcommand is built, so a hook's `emit` doesn't pay for the rest.
+
+def _emit_arguments(p):
+    p.add_argument("--type", "-t", choices=list(VALID_TYPES), help="Event type")
+    p.add_argument("--subtype", "-s", help="Event subtype")
+    p.add_argument("--payload", "-p", help="JSON payload")
+    p.add_argument("--batch", action="store_true",
+                   help="Read NDJSON events ({type, subtype, payload, tool_name}) from stdin")
+    p.add_argument("--source", default="cli", help="Event source (default: cli)")
+    p.add_argument("--tool", help="Tool name that triggered the event")
+
+
+def _query_arguments(p):
+    p.add_argument("--session-id", "-S", help="Filter by session ID")
+    p.add_argument("--type", "-t", choices=list(VALID_TYPES), help="Filter by type")
+    p.add_argument("--subtype", "-s", help="Filter by subtype")
+    p.add_argument("--since", help="Events after this timestamp (ISO8601)")
+    p.add_argument("--until", help="Events before this timestamp (ISO8601)")
+    p.add_argument("--limit", "-n", type=int, default=100, help="Max results (default: 100)")
+    p.add_argument("--no-archives", action="store_true",
+                   help="Only search the live events.jsonl, not rotated archives")
+
+
+def _follow_arguments(p):
+    p.add_argument("--session-id", "-S", help="Filter by session ID")
+    p.add_argument("--type", "-t", choices=list(VALID_TYPES), help="Filter by type")
+    p.add_argument("--subtype", "-s", help="Filter by subtype")
+    p.add_argument("--interval", type=float, default=FOLLOW_POLL_INTERVAL,
+                   help=f"Seconds between checks when inotify is unavailable (default: {FOLLOW_POLL_INTERVAL})")
+    p.add_argument("--idle-timeout", type=float, help="Exit after N seconds without a matching event")
+
+
+def _export_arguments(p):
+    p.add_argument("--format", "-f", choices=["columnar"], default="columnar",
+                   help="Snapshot format (default: columnar)")
+    p.add_argument("--output", "-o", help="Output directory (default: Memory/events/columnar)")
+
+
+def _synthesize_arguments(p):
+    p.add_argument("--session-id", "-S", help="Synthesize for specific session")
+    p.add_argument("--days", "-d", type=int, default=7, help="Days of history (default: 7)")
+    p.add_argument("--output", "-o", help="Output file (default: stdout)")
+
+
+def _rotate_arguments(p):
+    p.add_argument("--days", "-d", type=int, default=30, help="Archive events older than N days (default: 30)")
+
+
+def _stats_arguments(p):
+    p.add_argument("--rebuild", action="store_true",
+                   help="Recompute the stats snapshot from the full event log")
+
+
+def _sessions_arguments(p):
+    p.add_argument("--session-id", "-S", help="Show one session's entry")
+
+
+def _import_sqlite_arguments(p):
+    p.add_argument("--activate", action="store_true",
+                   help="Switch .asha/config.json to the SQLite backend after importing")
+
+
+def _daemon_arguments(p):
+    p.add_argument("action", choices=["start", "stop", "status", "run"], help="Daemon action")
+    p.add_argument("--idle-timeout", type=float, default=EMITTER_IDLE_TIMEOUT,
+                   help=f"Exit after N idle seconds (default: {EMITTER_IDLE_TIMEOUT})")
+
+
+def _claim_arguments(p):
+    p.add_argument("file_path", help="Path to file to claim")
+    p.add_argument("--agent", "-a", required=True, help="Agent name claiming the file")
+    p.add_argument("--reason", "-r", help="Reason for claim")
+
+
+def _release_arguments(p):
+    p.add_argument("file_path", help="Path to file to release")
+    p.add_argument("--agent", "-a", required=True, help="Agent name releasing the file")
+
+
+def _claims_arguments(p):
+    p.add_argument("--file", "-f", help="Check specific file")
+
+
+CLI_COMMANDS = {
+    "emit": ("Emit a new event", _emit_arguments),
+    "query": ("Query events", _query_arguments),
+    "follow": ("Print new events as they are appended (one JSON object per line)", _follow_arguments),
+    "export": ("Export all events (archives included) as an analytics snapshot", _export_arguments),
+    "synthesize": ("Synthesize activeContext from events", _synthesize_arguments),
+    "rotate": ("Archive old events", _rotate_arguments),
+    "stats": ("Show event store statistics", _stats_arguments),
+    "sessions": ("Show the session ledger (start, last event, synthesis)", _sessions_arguments),
+    "compress-archives": ("Convert plain archive/*.jsonl files to compressed archives", None),
+    "import-sqlite": ("Import JSONL events and archives into events.db", _import_sqlite_arguments),
+    "daemon": ("Manage the event emitter daemon", _daemon_arguments),
+    "claim": ("Claim a file for exclusive work", _claim_arguments),
+    "release": ("Release a claimed file", _release_arguments),
+    "claims": ("Check active file claims", _claims_arguments),
+}
+
+
+def build_parser(command: Optional[str] = None):
+    """
+    Build the CLI parser. If command names a subcommand only that one is
+    registered; otherwise (help, typos) all of them are.
+    """
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Event Store - Structured event emission and synthesis",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   %(prog)s emit --type event --subtype file_modified --payload '{"file_path": "Memory/activeContext.md"}'
+  %(prog)s emit --batch < events.ndjson
   %(prog)s query --type event --limit 20
   %(prog)s query --session-id clever-skipping --type task
+  %(prog)s follow --type event --subtype error
+  %(prog)s export --format columnar
   %(prog)s synthesize --days 7
   %(prog)s rotate --days 30
   %(prog)s stats
+  %(prog)s sessions
+  %(prog)s daemon start
+  %(prog)s import-sqlite --activate
 """
     )
 
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
+    for name, (help_text, add_arguments) in CLI_COMMANDS.items():
+        if command in CLI_COMMANDS and name != command:
+            continue
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.set_defaults(command_parser=subparser)
+        if add_arguments:
+            add_arguments(subparser)
+    return parser
+
+
+# Hot subcommands parsed without argparse (hooks and agents run these on
+# every tool call): command -> (defaults, options taking a value by every
+# spelling argparse accepts -> (key, conversion), flags -> key)
+_FAST_COMMANDS = {
+    "emit": (
+        {"type": None, "subtype": None, "payload": None, "batch": False, "source": "cli", "tool": None},
+        {"--type": ("type", str), "-t": ("type", str),
+         "--subtype": ("subtype", str), "-s": ("subtype", str),
+         "--payload": ("payload", str), "-p": ("payload", str),
+         "--source": ("source", str), "--tool": ("tool", str)},
+        {"--batch": "batch"},
+    ),
+    "query": (
+        {"session_id": None, "type": None, "subtype": None, "since": None, "until": None,
+         "limit": 100, "no_archives": False},
+        {"--session-id": ("session_id", str), "-S": ("session_id", str),
+         "--type": ("type", str), "-t": ("type", str),
+         "--subtype": ("subtype", str), "-s": ("subtype", str),
+         "--since": ("since", str), "--until": ("until", str),
+         "--limit": ("limit", int), "-n": ("limit", int)},
+        {"--no-archives": "no_archives"},
+    ),
+    "claims": (
+        {"file": None},
+        {"--file": ("file", str), "-f": ("file", str)},
+        {},
+    ),
+}
+
+
+def _parse_fast(argv: List[str]) -> Optional[Any]:
+    """
+    Parse the arguments of a _FAST_COMMANDS subcommand without importing
+    argparse. Returns None for anything unusual (other commands, help,
+    abbreviations, repeated or unknown options, invalid values, missing
+    required options) so that argparse parses it and reports errors the
+    usual way.
+    """
+    if not argv or argv[0] not in _FAST_COMMANDS:
+        return None
+    command = argv[0]
+    defaults, options, flags = _FAST_COMMANDS[command]
+
+    from types import SimpleNamespace
+
+    values: Dict[str, Any] = dict(defaults)
+    seen = set()
+    i = 1
+    while i < len(argv):
+        arg = argv[i]
+        if arg in flags:
+            values[flags[arg]] = True
+            i += 1
+            continue
+        name, eq, value = arg.partition("=")
+        if not eq:
+            if i + 1 >= len(argv):
+                return None
+            value = argv[i + 1]
+            i += 1
+        option = options.get(name)
+        if option is None or option[0] in seen or (not eq and value.startswith("-") and value != "-"):
+            return None
+        key, convert = option
+        try:
+            values[key] = convert(value)
+        except ValueError:
+            return None
+        seen.add(key)
+        i += 1
+
+    if values.get("type") is not None and values["type"] not in VALID_TYPES:
+        return None
+    if command == "emit" and not values["batch"] and \
+            not (values["type"] and values["subtype"] and values["payload"] is not None):
+        return None
+    return SimpleNamespace(command=command, **values)
 
-    # Emit command
-    emit_parser = subparsers.add_parser("emit", help="Emit a new event")
-    emit_parser.add_argument("--type", "-t", required=True, choices=list(VALID_TYPES), help="Event type")
-    emit_parser.add_argument("--subtype", "-s", required=True, help="Event subtype")
-    emit_parser.add_argument("--payload", "-p", required=True, help="JSON payload")
-    emit_parser.add_argument("--source", default="cli", help="Event source (default: cli)")
-    emit_parser.add_argument("--tool", help="Tool name that triggered the event")
-
-    # Query command
-    query_parser = subparsers.add_parser("query", help="Query events")
-    query_parser.add_argument("--session-id", "-S", help="Filter by session ID")
-    query_parser.add_argument("--type", "-t", choices=list(VALID_TYPES), help="Filter by type")
-    query_parser.add_argument("--subtype", "-s", help="Filter by subtype")
-    query_parser.add_argument("--since", help="Events after this timestamp (ISO8601)")
-    query_parser.add_argument("--until", help="Events before this timestamp (ISO8601)")
-    query_parser.add_argument("--limit", "-n", type=int, default=100, help="Max results (default: 100)")
-
-    # Synthesize command
-    synth_parser = subparsers.add_parser("synthesize", help="Synthesize activeContext from events")
-    synth_parser.add_argument("--session-id", "-S", help="Synthesize for specific session")
-    synth_parser.add_argument("--days", "-d", type=int, default=7, help="Days of history (default: 7)")
-    synth_parser.add_argument("--output", "-o", help="Output file (default: stdout)")
-
-    # Rotate command
-    rotate_parser = subparsers.add_parser("rotate", help="Archive old events")
-    rotate_parser.add_argument("--days", "-d", type=int, default=30, help="Archive events older than N days (default: 30)")
-
-    # Stats command
-    subparsers.add_parser("stats", help="Show event store statistics")
-
-    # Claim command
-    claim_parser = subparsers.add_parser("claim", help="Claim a file for exclusive work")
-    claim_parser.add_argument("file_path", help="Path to file to claim")
-    claim_parser.add_argument("--agent", "-a", required=True, help="Agent name claiming the file")
-    claim_parser.add_argument("--reason", "-r", help="Reason for claim")
-
-    # Release command
-    release_parser = subparsers.add_parser("release", help="Release a claimed file")
-    release_parser.add_argument("file_path", help="Path to file to release")
-    release_parser.add_argument("--agent", "-a", required=True, help="Agent name releasing the file")
-
-    # Check-claims command
-    claims_parser = subparsers.add_parser("claims", help="Check active file claims")
-    claims_parser.add_argument("--file", "-f", help="Check specific file")
-
-    args = parser.parse_args()
-
-    if not args.command:
-        parser.print_help()
-        sys.exit(1)
+
+def main():
+    args = _parse_fast(sys.argv[1:])
+    if args is None:
+        parser = build_parser(sys.argv[1] if len(sys.argv) > 1 else None)
+        args = parser.parse_args()
+        if not args.command:
+            parser.print_help()
+            sys.exit(1)
 
     try:
-        if args.command == "emit":
+        if args.command == "emit" and args.batch:
+            requests = []
+            for line in sys.stdin:
+                if not line.strip():
+                    continue
+                try:
+                    requests.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    requests.append(f"Invalid JSON: {e}")
+            result = emit_many(requests, source=args.source)
+            # Report the parse error rather than the generic validation one
+            for item in result["results"]:
+                if isinstance(requests[item["index"]], str):
+                    item["error"] = requests[item["index"]]
+            print(json.dumps(result, indent=2))
+
+        elif args.command == "emit":
+            if not (args.type and args.subtype and args.payload is not None):
+                args.command_parser.error("--type, --subtype and --payload are required (or use --batch)")
             try:
                 payload = json.loads(args.payload)
             except json.JSONDecodeError as e:
@@ -689,10 +3666,28 @@ Examples:
                 subtype=args.subtype,
                 since=args.since,
                 until=args.until,
-                limit=args.limit
+                limit=args.limit,
+                include_archives=not args.no_archives
             )
             print(json.dumps(result, indent=2))
 
+        elif args.command == "follow":
+            try:
+                for event in follow_events(
+                    session_id=args.session_id,
+                    event_type=args.type,
+                    subtype=args.subtype,
+                    poll_interval=args.interval,
+                    idle_timeout=args.idle_timeout
+                ):
+                    print(json.dumps(event, ensure_ascii=False), flush=True)
+            except (KeyboardInterrupt, BrokenPipeError):
+                pass
+
+        elif args.command == "export":
+            result = export_columnar(Path(args.output) if args.output else None)
+            print(json.dumps(result, indent=2))
+
         elif args.command == "synthesize":
             content = synthesize_active_context(
                 session_id=args.session_id,
@@ -709,7 +3704,37 @@ Examples:
             print(json.dumps(result, indent=2))
 
         elif args.command == "stats":
-            result = get_stats()
+            result = get_stats(rebuild=args.rebuild)
+            print(json.dumps(result, indent=2))
+
+        elif args.command == "sessions":
+            ledger = get_session_ledger()
+            if ledger is None:
+                result = {"error": "No session ledger (SQLite backend or no events)"}
+            elif args.session_id:
+                entry = ledger["sessions"].get(args.session_id)
+                result = dict(entry, session_id=args.session_id) if entry else {"error": f"Unknown session: {args.session_id}"}
+            else:
+                result = ledger
+            print(json.dumps(result, indent=2))
+
+        elif args.command == "compress-archives":
+            result = compress_archives()
+            print(json.dumps(result, indent=2))
+
+        elif args.command == "import-sqlite":
+            result = import_to_sqlite(activate=args.activate)
+            print(json.dumps(result, indent=2))
+
+        elif args.command == "daemon":
+            if args.action == "start":
+                result = start_emitter()
+            elif args.action == "stop":
+                result = stop_emitter()
+            elif args.action == "status":
+                result = emitter_status()
+            else:
+                result = run_emitter(idle_timeout=args.idle_timeout)
             print(json.dumps(result, indent=2))
 
         elif args.command == "claim":
@@ -13,6 +13,7 @@ Usage:
         --action "Use HTTP API with num_predict cap" \
         --project "comfyui" --reason "CLI hung on large prompt"
 
+    python learnings_manager.py apply --project "comfyui" < candidates.json
     python learnings_manager.py confirm --id "ollama-http" --project "threshold"
     python learnings_manager.py contradict --id "ollama-http" --project "other" --reason "CLI worked fine"
     python learnings_manager.py query --category "Tool Usage"
@@ -23,10 +24,9 @@ Usage:
 import re
 import sys
 import json
-import argparse
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable
 from dataclasses import dataclass, field, asdict
 
 
@@ -90,18 +90,37 @@ LEARNING_PATTERN = re.compile(
 )
 
 EVIDENCE_PATTERN = re.compile(
-    r'  - (?P<date>[\d-]+) \| (?P<project>[\w-]+) \| (?P<note>.+?)(?:\s*\[(?P<effect>\w+)\])?$'
+    r'  - (?P<date>[\d-]+) \| (?P<project>[\w-]+) \| (?P<note>.+?)(?:\s*\[(?P<effect>\w+)\])?$',
+    re.MULTILINE
 )
 
 CATEGORY_PATTERN = re.compile(r'^## (.+)$', re.MULTILINE)
 
 
+def _read_learnings_text() -> Optional[str]:
+    """Current learnings.md content (None: no file)"""
+    try:
+        return LEARNINGS_PATH.read_text()
+    except FileNotFoundError:
+        return None
+
+
+def _write_learnings_text(text: str):
+    """Replace learnings.md"""
+    LEARNINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    LEARNINGS_PATH.write_text(text)
+
+
 def parse_learnings() -> Dict[str, List[Learning]]:
     """Parse learnings.md into structured data"""
-    if not LEARNINGS_PATH.exists():
+    return _parse_learnings_text(_read_learnings_text())
+
+
+def _parse_learnings_text(content: Optional[str]) -> Dict[str, List[Learning]]:
+    """Parse learnings.md content (None: no file) into structured data"""
+    if content is None:
         return {}
 
-    content = LEARNINGS_PATH.read_text()
     learnings: Dict[str, List[Learning]] = {}
 
     # Split by category
@@ -170,6 +189,11 @@ def parse_learnings() -> Dict[str, List[Learning]]:
 
 def write_learnings(learnings: Dict[str, List[Learning]]):
     """Write learnings back to markdown format"""
+    _write_learnings_text(_render_learnings(learnings))
+
+
+def _render_learnings(learnings: Dict[str, List[Learning]]) -> str:
+    """learnings.md content for structured learnings"""
     lines = [
         "# Learnings",
         "",
@@ -203,9 +227,7 @@ def write_learnings(learnings: Dict[str, List[Learning]]):
 
         lines.append("")
 
-    # Ensure directory exists
-    LEARNINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    LEARNINGS_PATH.write_text('\n'.join(lines))
+    return '\n'.join(lines)
 
 
 # =============================================================================
@@ -221,45 +243,91 @@ def add_learning(
     reason: str
 ) -> Dict[str, Any]:
     """Add a new learning or update existing one"""
-    learnings = parse_learnings()
+    applied = apply_learnings([{
+        "category": category,
+        "id": learning_id,
+        "trigger": trigger,
+        "action": action,
+        "reason": reason
+    }], project)
+    return applied["results"][0]
 
-    if category not in learnings:
-        learnings[category] = []
 
-    # Check if learning already exists
-    existing = next((l for l in learnings[category] if l.id == learning_id), None)
-
-    if existing:
-        existing.add_evidence(project, reason, "confirm")
-        write_learnings(learnings)
-        return {
-            "status": "updated",
-            "id": learning_id,
-            "confidence": existing.confidence
-        }
-
-    # Create new learning
-    learning = Learning(
-        id=learning_id,
-        category=category,
-        confidence=0.3,  # New learnings start low
-        trigger=trigger,
-        action=action,
-        evidence=[Evidence(
-            date=datetime.now().strftime("%Y-%m-%d"),
-            project=project,
-            note=reason,
-            effect="initial"
-        )]
-    )
-    learnings[category].append(learning)
-    write_learnings(learnings)
+def _rendered_state(learning: Learning) -> tuple:
+    """What write_learnings() persists for a learning (only the last 5 evidence entries)"""
+    return learning.confidence, learning.trigger, learning.action, learning.evidence[-5:]
 
-    return {
-        "status": "created",
-        "id": learning_id,
-        "confidence": learning.confidence
-    }
+
+def apply_learnings(
+    candidates: List[Dict[str, Any]],
+    project: str,
+    read: Optional[Callable[[], Optional[str]]] = None,
+    write: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Add or confirm a batch of learnings with one parse and at most one write.
+
+    Each candidate is a dict with category, id, trigger, action and reason
+    (plus an optional project overriding the default). Candidates apply in
+    order with add_learning() semantics, so a batch leaves learnings.md
+    exactly as the same sequence of add_learning() calls would. A confirm
+    that leaves the persisted entry as it was counts as unchanged; if
+    nothing changed the file is not rewritten.
+
+    read and write stand in for learnings.md I/O (read returns None for no
+    file); they default to LEARNINGS_PATH.
+    """
+    learnings = _parse_learnings_text((read or _read_learnings_text)())
+    index = {(category, learning.id): learning
+             for category, entries in learnings.items() for learning in entries}
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    results = []
+
+    for candidate in candidates:
+        try:
+            category = candidate["category"]
+            learning_id = candidate["id"]
+            trigger = candidate["trigger"]
+            action = candidate["action"]
+            reason = candidate["reason"]
+        except (KeyError, TypeError) as e:
+            counts["skipped"] += 1
+            results.append({"status": "skipped", "error": f"Missing field: {e}"})
+            continue
+        source = candidate.get("project") or project
+
+        existing = index.get((category, learning_id))
+        if existing:
+            before = _rendered_state(existing)
+            existing.add_evidence(source, reason, "confirm")
+            status = "updated" if _rendered_state(existing) != before else "unchanged"
+            learning = existing
+        else:
+            # New learnings start low
+            learning = Learning(
+                id=learning_id,
+                category=category,
+                confidence=0.3,
+                trigger=trigger,
+                action=action,
+                evidence=[Evidence(
+                    date=datetime.now().strftime("%Y-%m-%d"),
+                    project=source,
+                    note=reason,
+                    effect="initial"
+                )]
+            )
+            learnings.setdefault(category, []).append(learning)
+            index[(category, learning_id)] = learning
+            status = "created"
+
+        counts[status] += 1
+        results.append({"status": status, "id": learning_id, "confidence": learning.confidence})
+
+    if counts["created"] or counts["updated"]:
+        (write or _write_learnings_text)(_render_learnings(learnings))
+
+    return {"status": "applied", **counts, "results": results}
 
 
 def confirm_learning(learning_id: str, project: str, reason: str = "Pattern confirmed") -> Dict[str, Any]:
@@ -391,6 +459,8 @@ def export_learnings() -> Dict[str, Any]:
 # =============================================================================
 
 def main():
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Learnings Manager - Pattern tracking with confidence",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -407,6 +477,11 @@ def main():
     add_parser.add_argument("--project", "-p", required=True, help="Project where learned")
     add_parser.add_argument("--reason", "-r", required=True, help="Why we learned this")
 
+    # Apply command
+    apply_parser = subparsers.add_parser("apply", help="Add or reinforce a batch of learnings (JSON list)")
+    apply_parser.add_argument("--project", "-p", required=True, help="Project where learned")
+    apply_parser.add_argument("--file", "-f", help="JSON file of candidates (default: stdin)")
+
     # Confirm command
     confirm_parser = subparsers.add_parser("confirm", help="Confirm a learning (raises confidence)")
     confirm_parser.add_argument("--id", "-i", required=True, help="Learning ID")
@@ -450,6 +525,9 @@ def main():
                 project=args.project,
                 reason=args.reason
             )
+        elif args.command == "apply":
+            source = Path(args.file).read_text() if args.file else sys.stdin.read()
+            result = apply_learnings(json.loads(source), args.project)
         elif args.command == "confirm":
             result = confirm_learning(args.id, args.project, args.reason)
         elif args.command == "contradict":
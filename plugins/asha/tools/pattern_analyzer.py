@@ -2,62 +2,61 @@
 """
 Pattern Analyzer - Extract learnings and synthesize Memory from session events
 
-Reads events.jsonl, identifies recurring patterns, extracts calibration signals,
+Reads the event store (events.jsonl and rotated archives, or events.db), identifies recurring patterns, extracts calibration signals,
 and synthesizes Memory files using the Four Questions structure.
 
 Usage:
     python pattern_analyzer.py synthesize [--session-id ID]
     python pattern_analyzer.py patterns [--min-confidence 0.7]
     python pattern_analyzer.py calibration [--session-id ID]
+    python pattern_analyzer.py backfill [--days 30] [--workers N]
 """
 
 import os
 import re
+import sys
 import json
-import argparse
-import subprocess
+import zlib
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
-from collections import defaultdict, Counter
+from itertools import groupby
+from functools import partial
+from contextlib import contextmanager
+from collections import defaultdict, Counter, deque
 
 
-def detect_project_root() -> Path:
-    """Find project root via environment, git, or upward search for Memory/"""
-    claude_project_dir = os.environ.get("CLAUDE_PROJECT_DIR")
-    if claude_project_dir:
-        project_path = Path(claude_project_dir)
-        if (project_path / "Memory").is_dir():
-            return project_path
+def _load_tool(name: str):
+    """A private instance of a sibling tool module (None if the file is missing)"""
+    path = Path(__file__).parent / f"{name}.py"
+    if not path.exists():
+        return None
 
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True, text=True, check=True
-        )
-        git_root = Path(result.stdout.strip())
-        if (git_root / "Memory").is_dir():
-            return git_root
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        return None
 
-    search_dir = Path(__file__).parent.resolve()
-    while search_dir != search_dir.parent:
-        if (search_dir / "Memory").is_dir():
-            return search_dir
-        search_dir = search_dir.parent
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
-    raise RuntimeError("Cannot detect project root. Ensure Memory/ directory exists.")
 
+# event_store.py owns the project root and the event log: its root
+# detection, paths, and archive readers are used as they are
+event_store = _load_tool("event_store")
 
 # Paths
-PROJECT_ROOT = detect_project_root()
-EVENTS_FILE = PROJECT_ROOT / "Memory" / "events" / "events.jsonl"
+PROJECT_ROOT = event_store.PROJECT_ROOT
+EVENTS_FILE = event_store.EVENTS_FILE
+ARCHIVE_DIR = event_store.ARCHIVE_DIR
 ACTIVE_CONTEXT = PROJECT_ROOT / "Memory" / "activeContext.md"
 LEARNINGS_FILE = Path.home() / ".asha" / "learnings.md"
 VOICE_FILE = Path.home() / ".asha" / "voice.md"
 KEEPER_FILE = Path.home() / ".asha" / "keeper.md"
 PATTERNS_FILE = PROJECT_ROOT / "Memory" / "events" / "patterns.json"
+SYNTHESIS_LOCK = PROJECT_ROOT / "Memory" / "events" / "synthesis.lock"
+SESSIONS_FILE = event_store.SESSIONS_FILE
 
 
 # Calibration signal patterns
@@ -76,60 +75,370 @@ KEEPER_PATTERNS = [
 ]
 
 
-def load_events(session_id: Optional[str] = None, days: int = 7) -> List[Dict]:
-    """Load events from JSONL file with optional filtering"""
-    if not EVENTS_FILE.exists():
-        return []
+# =============================================================================
+# Pattern Matching
+# =============================================================================
 
-    events = []
-    cutoff = (datetime.now() - timedelta(days=days)).isoformat() + "Z"
+class PatternMatcher:
+    """
+    A priority-ordered (pattern, category) table, compiled once.
+
+    Calling re.search() with pattern strings goes through re's compile
+    cache on every call, and recompiles everything once the tables outgrow
+    it. A single alternation of the whole table would need a named group
+    per pattern to tell them apart, and under CPython's backtracking engine
+    that scans several times slower than the compiled patterns one by one,
+    so those are kept and tried in table order. Patterns that do not
+    compile are skipped.
+    """
 
-    with open(EVENTS_FILE, 'r') as f:
-        for line in f:
-            if not line.strip():
-                continue
+    def __init__(self, table: List[Tuple[str, str]], flags: int = re.IGNORECASE):
+        self.patterns = []
+        for pattern, category in table:
             try:
-                event = json.loads(line)
+                self.patterns.append((re.compile(pattern, flags), category))
+            except (re.error, TypeError):
+                continue
 
-                # Filter by session if specified
-                if session_id and event.get("session_id") != session_id:
-                    continue
+    def first(self, text: str) -> Optional[str]:
+        """Category of the first pattern in the table that matches text, if any"""
+        for regex, category in self.patterns:
+            if regex.search(text):
+                return category
+        return None
 
-                # Filter by date
-                if event.get("timestamp", "") < cutoff:
-                    continue
+    def all(self, text: str) -> List[str]:
+        """Every category with a pattern matching text, in table order"""
+        return list(dict.fromkeys(category for regex, category in self.patterns if regex.search(text)))
 
-                events.append(event)
-            except json.JSONDecodeError:
-                continue
 
+# User-extended tables, appended after the built-in entries: "voicePatterns"
+# and "keeperPatterns" as [pattern, category] pairs, "taskTypePatterns" as
+# {task type: [patterns]}, from ~/.asha/config.json then .asha/config.json
+PATTERN_CONFIG_FILES = (Path.home() / ".asha" / "config.json", PROJECT_ROOT / ".asha" / "config.json")
+PATTERN_CONFIG_KEYS = {"voice": "voicePatterns", "keeper": "keeperPatterns", "task_type": "taskTypePatterns"}
+
+_matchers: Dict[str, PatternMatcher] = {}
+
+
+def _configured_patterns(name: str) -> List[Tuple[str, str]]:
+    """Extra (pattern, category) entries for a table from the config files"""
+    extra = []
+    for path in PATTERN_CONFIG_FILES:
+        try:
+            entries = json.loads(path.read_text()).get(PATTERN_CONFIG_KEYS[name])
+        except (OSError, json.JSONDecodeError, AttributeError):
+            continue
+        if isinstance(entries, dict):
+            entries = [(pattern, category) for category, patterns in entries.items()
+                       if isinstance(patterns, list) for pattern in patterns]
+        if isinstance(entries, list):
+            extra.extend(tuple(entry) for entry in entries
+                         if isinstance(entry, (list, tuple)) and len(entry) == 2)
+    return extra
+
+
+def get_matcher(name: str) -> PatternMatcher:
+    """Compiled matcher for the "voice", "keeper" or "task_type" table (cached per process)"""
+    if name not in _matchers:
+        if name == "task_type":
+            table = [(pattern, task_type) for task_type, patterns in TASK_TYPE_PATTERNS.items()
+                     for pattern in patterns]
+        else:
+            table = list({"voice": VOICE_PATTERNS, "keeper": KEEPER_PATTERNS}[name])
+        _matchers[name] = PatternMatcher(table + _configured_patterns(name))
+    return _matchers[name]
+
+
+# =============================================================================
+# Event Records
+# =============================================================================
+
+class EventRecord:
+    """
+    Compact, read-only view of one event for the synthesis pipeline.
+
+    Only the fields synthesis reads are kept: type, subtype, session_id and
+    tool_name are interned (a handful of distinct values shared by every
+    event), the rest of metadata is dropped, and the payload stays as its
+    compact JSON text until it is read. Decoded payloads are not cached, so
+    a pass that touches only errors decodes only errors.
+
+    get() and [] mirror the event dict for the keys synthesis uses, so the
+    extract_*/synthesize_* functions accept records and dicts alike.
+    """
+
+    __slots__ = ("id", "timestamp", "session_id", "type", "subtype", "tool_name", "_payload")
+
+    def __init__(self, id: str, timestamp: str, session_id: Optional[str], type: Optional[str],
+                 subtype: Optional[str], tool_name: Optional[str] = None, payload: Optional[str] = None):
+        self.id = id
+        self.timestamp = timestamp
+        self.session_id = session_id
+        self.type = type
+        self.subtype = subtype
+        self.tool_name = tool_name
+        self._payload = payload
+
+    @classmethod
+    def from_dict(cls, event: Dict) -> "EventRecord":
+        payload = event.get("payload")
+        metadata = event.get("metadata")
+        tool_name = metadata.get("tool_name") if isinstance(metadata, dict) else None
+        return cls(
+            event.get("id"),
+            event.get("timestamp", ""),
+            _intern(event.get("session_id")),
+            _intern(event.get("type")),
+            _intern(event.get("subtype")),
+            _intern(tool_name),
+            json.dumps(payload, separators=(",", ":")) if payload else None
+        )
+
+    @property
+    def payload(self) -> Dict:
+        return json.loads(self._payload) if self._payload else {}
+
+    @property
+    def metadata(self) -> Dict:
+        return {"tool_name": self.tool_name} if self.tool_name is not None else {}
+
+    def __getitem__(self, key: str):
+        if key not in _RECORD_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in _RECORD_KEYS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict:
+        """Event dict with the fields this record keeps"""
+        return {key: self[key] for key in _RECORD_KEYS}
+
+
+_RECORD_KEYS = ("id", "timestamp", "session_id", "type", "subtype", "payload", "metadata")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _iter_events(session_id: Optional[str], days: int):
+    """Yield events from the window, optionally limited to one session, from either backend"""
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat() + "Z"
+    return event_store.iter_events(session_id=session_id, since=cutoff)
+
+
+def load_events(session_id: Optional[str] = None, days: int = 7) -> List[Dict]:
+    """Load events from the event store (live and rotated) with optional filtering"""
+    events = list(_iter_events(session_id, days))
     return sorted(events, key=lambda e: e.get("timestamp", ""))
 
 
+def load_event_records(session_id: Optional[str] = None, days: int = 7) -> List[EventRecord]:
+    """Like load_events, as EventRecords (for synthesis over long histories)"""
+    records = [EventRecord.from_dict(event) for event in _iter_events(session_id, days)]
+    records.sort(key=lambda r: r.timestamp)
+    return records
+
+
 def get_last_session_id() -> Optional[str]:
-    """Get the most recent session ID from events"""
-    if not EVENTS_FILE.exists():
-        return None
+    """Get the session ID of the most recent event, reading back from the newest"""
+    for event in event_store.iter_events_reverse():
+        if event.get("session_id"):
+            return event["session_id"]
+    return None
+
+
+# =============================================================================
+# Staged Output
+# =============================================================================
+#
+# Everything synthesis writes (activeContext.md, patterns.json, voice.md,
+# keeper.md, learnings.md, eval_history.jsonl) goes through staged_output().
+# Inside a run the writes are held in memory and applied once at the end:
+# a file rewritten several times is written once, a file whose content
+# would not change is not touched, and each rewritten file is replaced
+# atomically. Outside a run every write is its own one-write batch.
+#
+# Runs can overlap (SessionStart recovers an orphaned session in the
+# background while /asha:save synthesizes), so commits hold the project's
+# synthesis.lock and write each file through its own temporary file.
+
+# Lines that change on every write without changing what a file says
+ACTIVE_CONTEXT_VOLATILE = re.compile(r'^lastUpdated: .*$', re.MULTILINE)
+PATTERNS_VOLATILE = re.compile(r'^  "last_updated": .*$', re.MULTILINE)
+
+
+class StagedOutput:
+    """
+    Writes held until commit(): whole-file writes by path (the last one
+    wins, and read() sees it) and appends by path. commit() sets `report`.
+    """
+
+    def __init__(self):
+        self.files: Dict[Path, Tuple[str, Optional["re.Pattern"]]] = {}
+        self.appends: Dict[Path, List[str]] = {}
+        self.callbacks = []
+        self.report = None
+
+    def read(self, path: Path) -> Optional[str]:
+        """The file's staged content, else what is on disk (None: no file)"""
+        if path in self.files:
+            return self.files[path][0]
+        try:
+            return path.read_text()
+        except FileNotFoundError:
+            return None
+
+    def write(self, path: Path, text: str, volatile: Optional["re.Pattern"] = None):
+        """Stage the file's full content; lines matching volatile don't count as a change"""
+        self.files[path] = (text, volatile)
+
+    def append(self, path: Path, text: str):
+        self.appends.setdefault(path, []).append(text)
+
+    def after_commit(self, callback):
+        """Run callback once the writes are on disk (once per distinct callback)"""
+        if callback not in self.callbacks:
+            self.callbacks.append(callback)
+
+    def commit(self) -> Dict:
+        """
+        Apply the writes under SYNTHESIS_LOCK. A file that cannot be written
+        is reported in files_failed and the rest still land; the callbacks
+        only run if every write did.
+        """
+        import fcntl
+
+        written: Dict[str, int] = {}
+        unchanged = []
+        failed: Dict[str, str] = {}
+        SYNTHESIS_LOCK.parent.mkdir(parents=True, exist_ok=True)
+        with open(SYNTHESIS_LOCK, 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            for path, (text, volatile) in self.files.items():
+                try:
+                    current = path.read_text()
+                except FileNotFoundError:
+                    current = None
+                except OSError as e:
+                    failed[str(path)] = str(e)
+                    continue
+                if current is not None and (
+                    current == text or (volatile and volatile.sub("", current) == volatile.sub("", text))
+                ):
+                    unchanged.append(str(path))
+                    continue
+                try:
+                    _replace_file(path, text)
+                except OSError as e:
+                    failed[str(path)] = str(e)
+                    continue
+                written[str(path)] = len(text.encode())
+
+            for path, chunks in self.appends.items():
+                data = "".join(chunks)
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(path, 'a') as f:
+                        f.write(data)
+                except OSError as e:
+                    failed[str(path)] = str(e)
+                    continue
+                written[str(path)] = written.get(str(path), 0) + len(data.encode())
+
+            if not failed:
+                for callback in self.callbacks:
+                    callback()
+
+        self.report = {
+            "bytes_written": sum(written.values()),
+            "files_written": written,
+            "files_unchanged": unchanged
+        }
+        if failed:
+            self.report["files_failed"] = failed
+        return self.report
+
+
+def _replace_file(path: Path, text: str):
+    """Atomically replace path with text, through a temporary file of our own"""
+    import tempfile
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_staged: Optional[StagedOutput] = None
+
+
+@contextmanager
+def staged_output():
+    """
+    Stage writes for the with-block and commit them at its end (discarded if
+    it raises). Nested blocks join the outermost one.
+    """
+    global _staged
+    if _staged is not None:
+        yield _staged
+        return
+
+    _staged = output = StagedOutput()
+    try:
+        yield output
+    finally:
+        _staged = None
+    output.commit()
 
-    last_session = None
-    with open(EVENTS_FILE, 'r') as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                event = json.loads(line)
-                last_session = event.get("session_id")
-            except json.JSONDecodeError:
-                continue
 
-    return last_session
+def read_output(path: Path) -> Optional[str]:
+    """A file as synthesis will leave it: staged content, else disk (None: no file)"""
+    return _staged.read(path) if _staged is not None else StagedOutput().read(path)
+
+
+def write_output(path: Path, text: str, volatile: Optional["re.Pattern"] = None):
+    with staged_output() as output:
+        output.write(path, text, volatile)
+
+
+def append_output(path: Path, text: str):
+    with staged_output() as output:
+        output.append(path, text)
+
+
+def after_output(callback):
+    """Run callback once the current writes are committed (now, outside a run)"""
+    with staged_output() as output:
+        output.after_commit(callback)
 
 
 def load_existing_patterns() -> Dict:
     """Load existing pattern confidence data"""
-    if PATTERNS_FILE.exists():
+    text = read_output(PATTERNS_FILE)
+    if text is not None:
         try:
-            return json.loads(PATTERNS_FILE.read_text())
+            return json.loads(text)
         except json.JSONDecodeError:
             pass
     return {"patterns": {}, "last_updated": None}
@@ -137,57 +446,421 @@ def load_existing_patterns() -> Dict:
 
 def save_patterns(data: Dict):
     """Save pattern confidence data"""
-    PATTERNS_FILE.parent.mkdir(parents=True, exist_ok=True)
     data["last_updated"] = datetime.now().isoformat()
-    PATTERNS_FILE.write_text(json.dumps(data, indent=2))
+    write_output(PATTERNS_FILE, json.dumps(data, indent=2), PATTERNS_VOLATILE)
 
 
 # =============================================================================
-# Pattern Extraction
+# Extractor Engine
 # =============================================================================
 
-def extract_tool_sequences(events: List[Dict]) -> List[Tuple[str, str, int]]:
-    """Extract recurring tool/agent sequences"""
-    sequences = []
+class Extractor:
+    """
+    Accumulator fed by analyze_events().
 
-    # Get agent deployments in order
-    agents = [
-        e["payload"].get("agent_type")
-        for e in events
-        if e.get("subtype") == "agent_deployed" and e["payload"].get("agent_type")
-    ]
+    feed() is called once per event whose subtype is in `subtypes`, in list
+    order, with the event's position and its decoded payload; result() is
+    read once the pass is over.
 
-    # Find pairs
-    pair_counts = Counter()
-    for i in range(len(agents) - 1):
-        pair = (agents[i], agents[i + 1])
-        pair_counts[pair] += 1
+    state() is the accumulated state as plain JSON data, and merge() folds
+    in the state of a later run of events, so results over a long window
+    can be built from per-day states (see Incremental Synthesis).
+    """
 
-    # Return pairs that occurred more than once
-    for (a, b), count in pair_counts.items():
-        if count >= 2:
-            sequences.append((a, b, count))
+    subtypes: Tuple[str, ...] = ()
 
-    return sequences
+    def feed(self, index: int, event, payload: Dict):
+        raise NotImplementedError
 
+    def result(self):
+        raise NotImplementedError
+
+    def state(self):
+        raise NotImplementedError
+
+    def merge(self, state):
+        raise NotImplementedError
+
+
+def _counter_state(counter: Counter) -> List[List]:
+    # Pairs rather than an object: keys need not be strings, and the order
+    # (which breaks most_common() ties) survives the round trip
+    return [[key, count] for key, count in counter.items()]
+
+
+class PayloadValues(Extractor):
+    """
+    payload[field] of each matching event, in order: only the last `keep`
+    if given, or only the first occurrence of each value if `unique`
+    """
+
+    def __init__(self, subtypes: Tuple[str, ...], field: str, default=None,
+                 keep: Optional[int] = None, unique: bool = False):
+        self.subtypes = subtypes
+        self.field = field
+        self.default = default
+        self.unique = unique
+        self.values = dict() if unique else deque(maxlen=keep) if keep else []
+
+    def _add(self, value):
+        if self.unique:
+            self.values.setdefault(value)
+        else:
+            self.values.append(value)
+
+    def feed(self, index, event, payload):
+        self._add(payload.get(self.field, self.default))
+
+    def result(self) -> List:
+        return list(self.values)
+
+    def state(self) -> List:
+        return list(self.values)
+
+    def merge(self, state):
+        for value in state:
+            self._add(value)
+
+
+class FirstValue(PayloadValues):
+    """payload[field] of the first matching event (None if there was none)"""
+
+    def _add(self, value):
+        if not self.values:
+            self.values.append(value)
+
+    def result(self):
+        return self.values[0] if self.values else None
+
+
+class ValueCounter(Extractor):
+    """Matching events per payload[field] value"""
+
+    def __init__(self, subtypes: Tuple[str, ...], field: str):
+        self.subtypes = subtypes
+        self.field = field
+        self.counts = Counter()
+
+    def feed(self, index, event, payload):
+        self.counts[payload.get(self.field)] += 1
+
+    def result(self) -> Counter:
+        return self.counts
+
+    def state(self) -> List[List]:
+        return _counter_state(self.counts)
+
+    def merge(self, state):
+        for value, count in state:
+            self.counts[value] += count
+
+
+class PairCounter(Extractor):
+    """Counts of consecutive (a, b) pairs among non-empty payload[field] values"""
+
+    def __init__(self, subtypes: Tuple[str, ...], field: str):
+        self.subtypes = subtypes
+        self.field = field
+        self.first = None
+        self.previous = None
+        self.pairs = Counter()
+
+    def _add(self, value):
+        if self.previous is not None:
+            self.pairs[(self.previous, value)] += 1
+        elif self.first is None:
+            self.first = value
+        self.previous = value
+
+    def feed(self, index, event, payload):
+        value = payload.get(self.field)
+        if value:
+            self._add(value)
+
+    def result(self) -> Counter:
+        return self.pairs
+
+    def state(self) -> Dict:
+        return {
+            "first": self.first,
+            "last": self.previous,
+            "pairs": [[a, b, count] for (a, b), count in self.pairs.items()]
+        }
+
+    def merge(self, state):
+        # The pair spanning the two runs, then the later run's own pairs
+        if state["first"] is not None:
+            self._add(state["first"])
+        for a, b, count in state["pairs"]:
+            self.pairs[(a, b)] += count
+        if state["last"] is not None:
+            self.previous = state["last"]
+
+
+class ToolBuckets(Extractor):
+    """Matching events per emitting tool: how many, and payload[field] of the first"""
+
+    def __init__(self, subtypes: Tuple[str, ...], field: str):
+        self.subtypes = subtypes
+        self.field = field
+        self.buckets = {}
+
+    def _add(self, tool, count: int, sample: str):
+        if tool in self.buckets:
+            self.buckets[tool][0] += count
+        else:
+            self.buckets[tool] = [count, sample]
+
+    def feed(self, index, event, payload):
+        tool = event.get("metadata", {}).get("tool_name", "unknown")
+        self._add(tool, 1, payload.get(self.field, "")[:100])
+
+    def result(self) -> Dict[str, Tuple[int, str]]:
+        return {tool: tuple(bucket) for tool, bucket in self.buckets.items()}
+
+    def state(self) -> List[List]:
+        return [[tool, count, sample] for tool, (count, sample) in self.buckets.items()]
+
+    def merge(self, state):
+        for tool, count, sample in state:
+            self._add(tool, count, sample)
+
+
+class ToolCounter(Extractor):
+    """Matching events per (non-empty) tool name"""
+
+    def __init__(self, subtypes: Tuple[str, ...]):
+        self.subtypes = subtypes
+        self.counts = Counter()
+
+    def feed(self, index, event, payload):
+        tool = event.get("metadata", {}).get("tool_name", "")
+        if tool:
+            self.counts[tool] += 1
+
+    def result(self) -> Counter:
+        return self.counts
+
+    def state(self) -> List[List]:
+        return _counter_state(self.counts)
+
+    def merge(self, state):
+        for tool, count in state:
+            self.counts[tool] += count
 
-def extract_file_patterns(events: List[Dict]) -> List[Dict]:
-    """Extract patterns in file modifications"""
-    file_events = [
-        e for e in events
-        if e.get("subtype") in ("file_modified", "file_created")
-    ]
 
-    # Group by directory
-    dir_counts = Counter()
-    ext_counts = Counter()
+class DirectoryCounter(ToolCounter):
+    """Matching events per parent directory of payload["file_path"]"""
 
-    for e in file_events:
-        path = e["payload"].get("file_path", "")
+    def feed(self, index, event, payload):
+        path = payload.get("file_path", "")
         if "/" in path:
-            dir_counts[path.rsplit("/", 1)[0]] += 1
-        if "." in path:
-            ext_counts[path.rsplit(".", 1)[1]] += 1
+            self.counts[path.rsplit("/", 1)[0]] += 1
+
+
+class TaskTracker(Extractor):
+    """Latest payload per task id, and the subject of every blocked-task event"""
+
+    subtypes = ("created", "status_change", "completed", "blocked")
+
+    def __init__(self):
+        self.latest = {}
+        self.blocked = []
+
+    def feed(self, index, event, payload):
+        if event.get("type") != "task":
+            return
+        self.latest[payload.get("id", event.get("id"))] = payload
+        if event.get("subtype") == "blocked":
+            self.blocked.append(payload.get("subject", "Unknown task"))
+
+    def result(self) -> Dict:
+        return {"latest": self.latest, "blocked": self.blocked}
+
+    def state(self) -> Dict:
+        return {"latest": list(self.latest.items()), "blocked": self.blocked}
+
+    def merge(self, state):
+        self.latest.update((task_id, payload) for task_id, payload in state["latest"])
+        self.blocked.extend(state["blocked"])
+
+
+class SignalCollector(Extractor):
+    """
+    Calibration signals from user decisions: each named matcher records a
+    signal for the first of its patterns matching a decision's detail
+    """
+
+    subtypes = ("decision",)
+
+    def __init__(self, matchers: Dict[str, PatternMatcher]):
+        self.matchers = matchers
+        self.signals = {name: [] for name in matchers}
+
+    def feed(self, index, event, payload):
+        if event.get("type") != "context":
+            return
+        text = payload.get("detail", "")
+        timestamp = event.get("timestamp", "")
+        for name, matcher in self.matchers.items():
+            category = matcher.first(text)
+            if category is not None:
+                self.signals[name].append({
+                    "text": text,
+                    "category": category,
+                    "timestamp": timestamp
+                })
+
+    def result(self) -> Dict[str, List[Dict]]:
+        return self.signals
+
+    def state(self) -> Dict[str, List[Dict]]:
+        return self.signals
+
+    def merge(self, state):
+        for name, signals in state.items():
+            self.signals[name].extend(signals)
+
+
+class ResolutionWindows(Extractor):
+    """
+    Error → edit resolutions (an edit within RESOLUTION_WINDOW events after
+    an error) and agent hand-offs with no error between the two deployments.
+
+    Linear in the number of events and bounded in memory: errors wait in a
+    sliding window until the next edit resolves them or they fall out of
+    it, and a running error count (a prefix sum over the event stream),
+    compared at consecutive deployments, tells whether a hand-off was clean.
+
+    Its state is the open window, not the findings: merging a state resumes
+    the stream where it stopped (indices must continue from there too), and
+    result() reports only what was found since.
+    """
+
+    subtypes = ("error", "file_modified", "file_created", "agent_deployed")
+
+    def __init__(self):
+        self.pending = deque()
+        self.error_count = 0
+        self.last_agent = None
+        self.resolutions = []
+        self.handoffs = []
+
+    def feed(self, index, event, payload):
+        subtype = event.get("subtype")
+        if subtype == "error":
+            tool = event.get("metadata", {}).get("tool_name", "unknown")
+            while self.pending and index - self.pending[0][0] > RESOLUTION_WINDOW:
+                self.pending.popleft()
+            self.pending.append((index, payload.get("error", "")[:100], tool))
+            self.error_count += 1
+        elif subtype == "agent_deployed":
+            agent = payload.get("agent_type")
+            if self.last_agent is not None:
+                previous, errors_before = self.last_agent
+                if self.error_count == errors_before and previous and agent:
+                    self.handoffs.append((previous, agent))
+            self.last_agent = (agent, self.error_count)
+        else:
+            # This edit is the first after every pending error: it resolves
+            # those still within the window, and the rest have expired
+            file_path = payload.get("file_path", "")
+            while self.pending:
+                err_idx, error_text, tool = self.pending.popleft()
+                if index - err_idx <= RESOLUTION_WINDOW:
+                    self.resolutions.append((tool, error_text, file_path))
+
+    def result(self) -> Dict[str, List[Tuple]]:
+        return {"resolutions": self.resolutions, "handoffs": self.handoffs}
+
+    def state(self) -> Dict:
+        return {"pending": list(self.pending), "error_count": self.error_count, "last_agent": self.last_agent}
+
+    def merge(self, state):
+        self.pending = deque(tuple(error) for error in state["pending"])
+        self.error_count = state["error_count"]
+        self.last_agent = tuple(state["last_agent"]) if state["last_agent"] else None
+
+
+# An edit this many events or fewer after an error counts as its fix
+RESOLUTION_WINDOW = 10
+
+# Extractors by name; analyze_events() runs any subset of them in one pass
+EXTRACTORS = {
+    "files_modified": lambda: PayloadValues(("file_modified",), "file_path", "", unique=True),
+    "files_created": lambda: PayloadValues(("file_created",), "file_path", "", unique=True),
+    "agents": lambda: ValueCounter(("agent_deployed",), "agent_type"),
+    "commands": lambda: PayloadValues(("command",), "command", unique=True),
+    "recent_errors": lambda: PayloadValues(("error",), "error", "Unknown error", keep=3),
+    "first_decision": lambda: FirstValue(("decision",), "detail", ""),
+    "agent_pairs": lambda: PairCounter(("agent_deployed",), "agent_type"),
+    "errors_by_tool": lambda: ToolBuckets(("error",), "error"),
+    "edit_tools": lambda: ToolCounter(("file_modified", "file_created")),
+    "directories": lambda: DirectoryCounter(("file_modified", "file_created")),
+    "tasks": TaskTracker,
+    "calibration": lambda: SignalCollector({"voice": get_matcher("voice"), "keeper": get_matcher("keeper")}),
+    "resolutions": ResolutionWindows,
+}
+
+
+def _feed_extractors(events: List, extractors: Dict[str, Extractor], start: int = 0) -> Counter:
+    """Feed events (numbered from start) to extractors by subtype; returns per-subtype counts"""
+    by_subtype = defaultdict(list)
+    for extractor in extractors.values():
+        for subtype in extractor.subtypes:
+            by_subtype[subtype].append(extractor)
+
+    subtype_counts = Counter()
+    for index, event in enumerate(events, start):
+        subtype = event.get("subtype")
+        subtype_counts[subtype] += 1
+        targets = by_subtype.get(subtype)
+        if targets:
+            payload = event.get("payload") or {}
+            for extractor in targets:
+                extractor.feed(index, event, payload)
+    return subtype_counts
+
+
+def analyze_events(events: List, names: Optional[Tuple[str, ...]] = None) -> Dict:
+    """
+    Run the named extractors (default: all of them) over events in a single
+    pass. Returns each extractor's result by name, plus "subtype_counts".
+
+    Each payload is decoded at most once, and only for events some
+    extractor subscribes to.
+    """
+    extractors = {name: EXTRACTORS[name]() for name in (names or EXTRACTORS)}
+    subtype_counts = _feed_extractors(events, extractors)
+    analysis = {name: extractor.result() for name, extractor in extractors.items()}
+    analysis["subtype_counts"] = subtype_counts
+    return analysis
+
+
+def _analysis(events: List, analysis: Optional[Dict], names: Optional[Tuple[str, ...]]) -> Dict:
+    """The caller's analysis if it has one, else a pass over events for just `names`"""
+    return analysis if analysis is not None else analyze_events(events, names)
+
+
+# =============================================================================
+# Pattern Extraction
+# =============================================================================
+#
+# Each function takes the event list, plus optionally an analyze_events()
+# result covering it; without one it makes its own pass for the extractors
+# it needs. run_synthesis() analyzes once and hands the result to all.
+
+def extract_tool_sequences(events: List[Dict], analysis: Optional[Dict] = None) -> List[Tuple[str, str, int]]:
+    """Extract recurring tool/agent sequences"""
+    pair_counts = _analysis(events, analysis, ("agent_pairs",))["agent_pairs"]
+
+    # Return pairs that occurred more than once
+    return [(a, b, count) for (a, b), count in pair_counts.items() if count >= 2]
+
+
+def extract_file_patterns(events: List[Dict], analysis: Optional[Dict] = None) -> List[Dict]:
+    """Extract patterns in file modifications"""
+    dir_counts = _analysis(events, analysis, ("directories",))["directories"]
 
     patterns = []
     for dir_path, count in dir_counts.most_common(5):
@@ -201,85 +874,41 @@ def extract_file_patterns(events: List[Dict]) -> List[Dict]:
     return patterns
 
 
-def extract_error_patterns(events: List[Dict]) -> List[Dict]:
+def extract_error_patterns(events: List[Dict], analysis: Optional[Dict] = None) -> List[Dict]:
     """Extract recurring error patterns"""
-    errors = [
-        e for e in events
-        if e.get("subtype") == "error"
-    ]
-
-    # Group by tool
-    by_tool = defaultdict(list)
-    for e in errors:
-        tool = e.get("metadata", {}).get("tool_name", "unknown")
-        by_tool[tool].append(e["payload"].get("error", ""))
+    by_tool = _analysis(events, analysis, ("errors_by_tool",))["errors_by_tool"]
 
     patterns = []
-    for tool, error_list in by_tool.items():
-        if len(error_list) >= 2:
+    for tool, (count, sample) in by_tool.items():
+        if count >= 2:
             patterns.append({
                 "type": "recurring_error",
                 "tool": tool,
-                "count": len(error_list),
-                "sample": error_list[0][:100] if error_list else ""
+                "count": count,
+                "sample": sample
             })
 
     return patterns
 
 
-def extract_calibration_signals(events: List[Dict]) -> Dict[str, List[Dict]]:
+def extract_calibration_signals(events: List[Dict], analysis: Optional[Dict] = None) -> Dict[str, List[Dict]]:
     """Extract voice and keeper calibration signals from decision events"""
-    signals = {"voice": [], "keeper": []}
-
-    decisions = [
-        e for e in events
-        if e.get("type") == "context" and e.get("subtype") == "decision"
-    ]
-
-    for event in decisions:
-        text = event["payload"].get("detail", "")
-        timestamp = event.get("timestamp", "")
-
-        # Check voice patterns
-        for pattern, category in VOICE_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                signals["voice"].append({
-                    "text": text,
-                    "category": category,
-                    "timestamp": timestamp
-                })
-                break
-
-        # Check keeper patterns
-        for pattern, category in KEEPER_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                signals["keeper"].append({
-                    "text": text,
-                    "category": category,
-                    "timestamp": timestamp
-                })
-                break
-
-    return signals
+    signals = _analysis(events, analysis, ("calibration",))["calibration"]
+    return {name: list(found) for name, found in signals.items()}
 
 
 # =============================================================================
 # Four Questions Synthesis
 # =============================================================================
 
-def synthesize_accomplishments(events: List[Dict]) -> List[str]:
+def synthesize_accomplishments(events: List[Dict], analysis: Optional[Dict] = None) -> List[str]:
     """What was accomplished?"""
+    analysis = _analysis(events, analysis, ("files_modified", "files_created", "agents", "commands"))
     accomplishments = []
 
     # File changes
-    files_modified = set()
-    files_created = set()
-
-    for e in events:
-        if e.get("subtype") == "file_modified":
-            files_modified.add(e["payload"].get("file_path", ""))
-        elif e.get("subtype") == "file_created":
-            files_created.add(e["payload"].get("file_path", ""))
+    files_modified = set(analysis["files_modified"])
+    files_created = set(analysis["files_created"])
 
     if files_created:
         accomplishments.append(f"Created {len(files_created)} file(s): {', '.join(sorted(files_created)[:5])}")
@@ -287,35 +916,40 @@ def synthesize_accomplishments(events: List[Dict]) -> List[str]:
         accomplishments.append(f"Modified {len(files_modified)} file(s): {', '.join(sorted(files_modified)[:5])}")
 
     # Agent deployments
-    agents = [
-        e["payload"].get("agent_type")
-        for e in events
-        if e.get("subtype") == "agent_deployed"
-    ]
-    if agents:
-        agent_counts = Counter(agents)
+    agent_counts = analysis["agents"]
+    if agent_counts:
         top_agents = [f"{a} ({c}x)" for a, c in agent_counts.most_common(3)]
         accomplishments.append(f"Deployed agents: {', '.join(top_agents)}")
 
     # Commands/skills used
-    commands = [
-        e["payload"].get("command")
-        for e in events
-        if e.get("subtype") == "command"
-    ]
+    commands = analysis["commands"]
     if commands:
         accomplishments.append(f"Commands used: {', '.join(set(commands))}")
 
     return accomplishments if accomplishments else ["No significant changes recorded"]
 
 
-def synthesize_learnings(events: List[Dict], existing_patterns: Dict) -> List[str]:
+def synthesize_learnings(events: List[Dict], existing_patterns: Dict, analysis: Optional[Dict] = None) -> List[str]:
     """What was learned? (with confidence tracking)"""
-    learnings = []
+    analysis = _analysis(events, analysis, ("agent_pairs", "errors_by_tool"))
     patterns = existing_patterns.get("patterns", {})
+    learnings = update_pattern_counts(
+        patterns, extract_tool_sequences(events, analysis), extract_error_patterns(events, analysis)
+    )
+
+    # Save updated patterns
+    existing_patterns["patterns"] = patterns
+    save_patterns(existing_patterns)
+
+    return learnings if learnings else ["No new patterns detected"]
+
+
+def update_pattern_counts(patterns: Dict, sequences: List[Tuple[str, str, int]],
+                          error_patterns: List[Dict]) -> List[str]:
+    """Add sequence and error counts to the pattern table; returns the learnings they support"""
+    learnings = []
 
     # Tool sequences
-    sequences = extract_tool_sequences(events)
     for a, b, count in sequences:
         pattern_key = f"sequence:{a}->{b}"
 
@@ -332,7 +966,6 @@ def synthesize_learnings(events: List[Dict], existing_patterns: Dict) -> List[st
             learnings.append(f"[auto, conf:{new_conf:.2f}] {a} → {b} is effective sequence")
 
     # Error patterns (negative learnings)
-    error_patterns = extract_error_patterns(events)
     for ep in error_patterns:
         pattern_key = f"error:{ep['tool']}"
         if pattern_key not in patterns:
@@ -341,54 +974,38 @@ def synthesize_learnings(events: List[Dict], existing_patterns: Dict) -> List[st
         patterns[pattern_key]["count"] += ep["count"]
         learnings.append(f"[auto, warning] {ep['tool']} errors ({ep['count']}x): {ep['sample'][:50]}")
 
-    # Save updated patterns
-    existing_patterns["patterns"] = patterns
-    save_patterns(existing_patterns)
-
-    return learnings if learnings else ["No new patterns detected"]
+    return learnings
 
 
-def synthesize_blockers(events: List[Dict]) -> List[str]:
+def synthesize_blockers(events: List[Dict], analysis: Optional[Dict] = None) -> List[str]:
     """What blockers exist?"""
+    analysis = _analysis(events, analysis, ("recent_errors", "tasks"))
     blockers = []
 
-    # Recent errors
-    errors = [e for e in events if e.get("subtype") == "error"]
-    if errors:
-        recent_errors = errors[-3:]  # Last 3 errors
-        for e in recent_errors:
-            error_text = e["payload"].get("error", "Unknown error")[:100]
-            blockers.append(f"Error: {error_text}")
+    # Recent errors (last 3)
+    for error in analysis["recent_errors"]:
+        blockers.append(f"Error: {error[:100]}")
 
     # Blocked tasks
-    blocked = [
-        e for e in events
-        if e.get("type") == "task" and e.get("subtype") == "blocked"
-    ]
-    for t in blocked:
-        blockers.append(f"Blocked: {t['payload'].get('subject', 'Unknown task')}")
+    for subject in analysis["tasks"]["blocked"]:
+        blockers.append(f"Blocked: {subject}")
 
     return blockers if blockers else ["None detected"]
 
 
-def synthesize_next_steps(events: List[Dict]) -> List[str]:
+def synthesize_next_steps(events: List[Dict], analysis: Optional[Dict] = None) -> List[str]:
     """What's next?"""
+    analysis = _analysis(events, analysis, ("tasks", "directories"))
     next_steps = []
 
     # Pending tasks from events
-    tasks = {}
-    for e in events:
-        if e.get("type") == "task":
-            task_id = e["payload"].get("id", e.get("id"))
-            tasks[task_id] = e
-
-    for task in tasks.values():
-        status = task["payload"].get("status")
+    for task in analysis["tasks"]["latest"].values():
+        status = task.get("status")
         if status in ("pending", "in_progress"):
-            next_steps.append(f"[ ] {task['payload'].get('subject', 'Unknown task')}")
+            next_steps.append(f"[ ] {task.get('subject', 'Unknown task')}")
 
     # Infer from recent activity
-    file_patterns = extract_file_patterns(events)
+    file_patterns = extract_file_patterns(events, analysis)
     for fp in file_patterns[:2]:
         if fp["type"] == "directory_focus":
             next_steps.append(f"[ ] Continue work in {fp['path']}/")
@@ -396,8 +1013,16 @@ def synthesize_next_steps(events: List[Dict]) -> List[str]:
     return next_steps if next_steps else ["Review and plan next session"]
 
 
-def generate_active_context(events: List[Dict], existing_patterns: Dict) -> str:
+# Extractors behind the four activeContext sections
+ACTIVE_CONTEXT_EXTRACTORS = (
+    "files_modified", "files_created", "agents", "commands", "agent_pairs",
+    "errors_by_tool", "recent_errors", "tasks", "directories"
+)
+
+
+def generate_active_context(events: List[Dict], existing_patterns: Dict, analysis: Optional[Dict] = None) -> str:
     """Generate activeContext.md content using Four Questions"""
+    analysis = _analysis(events, analysis, ACTIVE_CONTEXT_EXTRACTORS)
     lines = []
 
     # Frontmatter
@@ -414,28 +1039,28 @@ def generate_active_context(events: List[Dict], existing_patterns: Dict) -> str:
     # What was accomplished?
     lines.append("## What Was Accomplished")
     lines.append("")
-    for item in synthesize_accomplishments(events):
+    for item in synthesize_accomplishments(events, analysis):
         lines.append(f"- {item}")
     lines.append("")
 
     # What was learned?
     lines.append("## What Was Learned")
     lines.append("")
-    for item in synthesize_learnings(events, existing_patterns):
+    for item in synthesize_learnings(events, existing_patterns, analysis):
         lines.append(f"- {item}")
     lines.append("")
 
     # What blockers exist?
     lines.append("## Current Blockers")
     lines.append("")
-    for item in synthesize_blockers(events):
+    for item in synthesize_blockers(events, analysis):
         lines.append(f"- {item}")
     lines.append("")
 
     # What's next?
     lines.append("## Next Steps")
     lines.append("")
-    for item in synthesize_next_steps(events):
+    for item in synthesize_next_steps(events, analysis):
         lines.append(f"- {item}")
     lines.append("")
 
@@ -446,70 +1071,40 @@ def generate_active_context(events: List[Dict], existing_patterns: Dict) -> str:
 # Calibration Updates
 # =============================================================================
 
-def detect_learnable_patterns(events: List[Dict]) -> List[Dict]:
+def detect_learnable_patterns(events: List[Dict], analysis: Optional[Dict] = None) -> List[Dict]:
     """
     Detect patterns from events that should become structured learnings.
 
     Returns list of learning candidates with:
     - category, id, trigger, action, reason
     """
+    analysis = _analysis(events, analysis, ("resolutions", "edit_tools"))
     candidates = []
     project_name = PROJECT_ROOT.name
 
     # 1. Error → Resolution patterns
     # If error followed by successful file edit, that's a learning
-    errors = [(i, e) for i, e in enumerate(events) if e.get("subtype") == "error"]
-    edits = [(i, e) for i, e in enumerate(events) if e.get("subtype") in ("file_modified", "file_created")]
-
-    for err_idx, err_event in errors:
-        error_text = err_event.get("payload", {}).get("error", "")[:100]
-        tool = err_event.get("metadata", {}).get("tool_name", "unknown")
-
-        # Look for edit within next 10 events
-        for edit_idx, edit_event in edits:
-            if err_idx < edit_idx <= err_idx + 10:
-                file_path = edit_event.get("payload", {}).get("file_path", "")
-                candidates.append({
-                    "category": "Error Resolution",
-                    "id": f"fix-{tool.lower()}-{hash(error_text[:30]) % 10000}",
-                    "trigger": f"Error in {tool}: {error_text[:50]}",
-                    "action": f"Fix by editing {file_path.split('/')[-1] if file_path else 'related file'}",
-                    "reason": f"Error resolved after edit in {project_name}"
-                })
-                break
-
-    # 2. Effective agent sequences
-    agents = [
-        (i, e.get("payload", {}).get("agent_type"))
-        for i, e in enumerate(events)
-        if e.get("subtype") == "agent_deployed"
-    ]
-
-    # Find pairs that led to successful outcomes (no errors after)
-    for i in range(len(agents) - 1):
-        idx1, agent1 = agents[i]
-        idx2, agent2 = agents[i + 1]
+    for tool, error_text, file_path in analysis["resolutions"]["resolutions"]:
+        candidates.append({
+            "category": "Error Resolution",
+            "id": f"fix-{tool.lower()}-{zlib.crc32(error_text[:30].encode()) % 10000}",
+            "trigger": f"Error in {tool}: {error_text[:50]}",
+            "action": f"Fix by editing {file_path.split('/')[-1] if file_path else 'related file'}",
+            "reason": f"Error resolved after edit in {project_name}"
+        })
 
-        # Check if this sequence was error-free
-        errors_between = [e for e in events[idx1:idx2] if e.get("subtype") == "error"]
-        if not errors_between and agent1 and agent2:
-            candidates.append({
-                "category": "Workflow",
-                "id": f"sequence-{agent1.lower()}-{agent2.lower()}",
-                "trigger": f"Task requiring {agent1} analysis",
-                "action": f"Follow {agent1} with {agent2} for comprehensive coverage",
-                "reason": f"Effective sequence observed in {project_name}"
-            })
+    # 2. Effective agent sequences (no errors between the two deployments)
+    for agent1, agent2 in analysis["resolutions"]["handoffs"]:
+        candidates.append({
+            "category": "Workflow",
+            "id": f"sequence-{agent1.lower()}-{agent2.lower()}",
+            "trigger": f"Task requiring {agent1} analysis",
+            "action": f"Follow {agent1} with {agent2} for comprehensive coverage",
+            "reason": f"Effective sequence observed in {project_name}"
+        })
 
     # 3. Repeated tool patterns (same tool used 3+ times successfully)
-    tool_counts = Counter()
-    for e in events:
-        if e.get("subtype") in ("file_modified", "file_created"):
-            tool = e.get("metadata", {}).get("tool_name", "")
-            if tool:
-                tool_counts[tool] += 1
-
-    for tool, count in tool_counts.items():
+    for tool, count in analysis["edit_tools"].items():
         if count >= 5:
             candidates.append({
                 "category": "Tool Usage",
@@ -522,38 +1117,37 @@ def detect_learnable_patterns(events: List[Dict]) -> List[Dict]:
     return candidates
 
 
-def add_learnings_via_manager(candidates: List[Dict]):
-    """Add learning candidates via learnings_manager.py"""
-    if not candidates:
-        return
+_learnings_manager = None
 
-    # Import the manager module
-    manager_path = Path(__file__).parent / "learnings_manager.py"
-    if not manager_path.exists():
-        return
 
-    import importlib.util
-    spec = importlib.util.spec_from_file_location("learnings_manager", manager_path)
-    if spec is None or spec.loader is None:
-        return
+def _load_learnings_manager():
+    """learnings_manager.py, loaded once per process"""
+    global _learnings_manager
+    if _learnings_manager is None:
+        _learnings_manager = _load_tool("learnings_manager")
+    return _learnings_manager
 
-    manager = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(manager)
 
-    # Add each candidate
-    for candidate in candidates:
-        try:
-            manager.add_learning(
-                category=candidate["category"],
-                learning_id=candidate["id"],
-                trigger=candidate["trigger"],
-                action=candidate["action"],
-                project=PROJECT_ROOT.name,
-                reason=candidate["reason"]
-            )
-        except Exception:
-            # Silently continue if one fails
-            pass
+def add_learnings_via_manager(candidates: List[Dict]) -> Optional[Dict]:
+    """Add learning candidates via learnings_manager.py in one batch, on staged output"""
+    if not candidates:
+        return None
+
+    manager = _load_learnings_manager()
+    if manager is None:
+        return None
+
+    # Resolved per call: HOME may differ from when the module loaded
+    path = Path.home() / ".asha" / "learnings.md"
+    try:
+        with staged_output():
+            applied = manager.apply_learnings(candidates, PROJECT_ROOT.name,
+                                              read=lambda: read_output(path),
+                                              write=lambda text: write_output(path, text))
+    except Exception:
+        # Learnings are best-effort; a bad learnings.md must not fail synthesis
+        return None
+    return {key: applied[key] for key in ("created", "updated", "unchanged")}
 
 
 def append_to_voice(signals: List[Dict]):
@@ -561,11 +1155,7 @@ def append_to_voice(signals: List[Dict]):
     if not signals:
         return
 
-    VOICE_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-    existing = ""
-    if VOICE_FILE.exists():
-        existing = VOICE_FILE.read_text()
+    existing = read_output(VOICE_FILE) or ""
 
     # Find or create calibration log section
     section_header = "## Calibration Log"
@@ -584,7 +1174,7 @@ def append_to_voice(signals: List[Dict]):
     else:
         updated = existing + new_entries
 
-    VOICE_FILE.write_text(updated)
+    write_output(VOICE_FILE, updated)
 
 
 def append_to_keeper(signals: List[Dict]):
@@ -592,11 +1182,7 @@ def append_to_keeper(signals: List[Dict]):
     if not signals:
         return
 
-    KEEPER_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-    existing = ""
-    if KEEPER_FILE.exists():
-        existing = KEEPER_FILE.read_text()
+    existing = read_output(KEEPER_FILE) or ""
 
     # Find calibration log section
     section_header = "## Calibration Log"
@@ -617,15 +1203,33 @@ def append_to_keeper(signals: List[Dict]):
     if "```" in existing:
         parts = existing.rsplit("```", 1)
         updated = parts[0].rstrip() + "\n" + new_entries + "```" + parts[1]
-        KEEPER_FILE.write_text(updated)
+        write_output(KEEPER_FILE, updated)
 
 
 # =============================================================================
 # Main Synthesis
 # =============================================================================
 
-def run_synthesis(session_id: Optional[str] = None, days: int = 7, skip_eval: bool = False) -> Dict:
-    """Run full synthesis pipeline"""
+def run_synthesis(session_id: Optional[str] = None, days: int = 7, skip_eval: bool = False,
+                  full: bool = False) -> Dict:
+    """
+    Run full synthesis pipeline.
+
+    Over all sessions this is incremental (see update_checkpoint): only
+    events appended since the last run are read, and nothing is rewritten
+    if the window has not changed. full=True rebuilds the checkpoint. A
+    single session is always read and analyzed whole.
+
+    All file writes are staged and committed together at the end;
+    results["output"] reports what was written.
+    """
+    with staged_output() as output:
+        results = _run_synthesis(session_id, days, skip_eval, full)
+    results["output"] = output.report
+    return results
+
+
+def _run_synthesis(session_id: Optional[str], days: int, skip_eval: bool, full: bool) -> Dict:
     results = {
         "status": "success",
         "session_id": session_id,
@@ -635,37 +1239,55 @@ def run_synthesis(session_id: Optional[str] = None, days: int = 7, skip_eval: bo
         "eval": None
     }
 
-    # Load events
-    events = load_events(session_id=session_id, days=days)
-    results["events_processed"] = len(events)
+    # Load existing patterns for confidence tracking (and the checkpoint)
+    existing_patterns = load_existing_patterns()
+
+    # One pass over the (new) events feeds every step below
+    checkpoint = None
+    if session_id:
+        events = load_event_records(session_id=session_id, days=days)
+        analysis = analyze_events(events)
+    else:
+        events, analysis, checkpoint, changed = update_checkpoint(
+            existing_patterns.get("checkpoint"), days, full
+        )
+        results["events_new"] = len(events)
+
+    results["events_processed"] = sum(analysis["subtype_counts"].values())
 
-    if not events:
+    if not results["events_processed"]:
+        if checkpoint is not None:
+            _save_checkpoint(existing_patterns, checkpoint)
         results["status"] = "no_events"
         return results
 
     # Get session ID from events if not specified
-    if not session_id and events:
-        session_id = events[-1].get("session_id", "unknown")
+    if not session_id:
+        session_id = checkpoint["last_session"] or "unknown"
         results["session_id"] = session_id
 
-    # Load existing patterns for confidence tracking
-    existing_patterns = load_existing_patterns()
+        if not changed and ACTIVE_CONTEXT.exists():
+            _save_checkpoint(existing_patterns, checkpoint)
+            results["status"] = "up_to_date"
+            return results
 
     # Generate activeContext.md
-    active_context = generate_active_context(events, existing_patterns)
-    ACTIVE_CONTEXT.write_text(active_context)
+    active_context = generate_active_context(events, existing_patterns, analysis)
+    write_output(ACTIVE_CONTEXT, active_context, ACTIVE_CONTEXT_VOLATILE)
 
     # Extract learnings for activeContext display
-    learnings = synthesize_learnings(events, existing_patterns)
+    learnings = synthesize_learnings(events, existing_patterns, analysis)
     results["patterns_found"] = len([l for l in learnings if l != "No new patterns detected"])
 
     # Detect and add structured learnings via learnings_manager
-    learning_candidates = detect_learnable_patterns(events)
-    add_learnings_via_manager(learning_candidates)
+    learning_candidates = detect_learnable_patterns(events, analysis)
+    applied = add_learnings_via_manager(learning_candidates)
     results["learnings_added"] = len(learning_candidates)
+    if applied:
+        results["learnings"] = applied
 
     # Extract and save calibration signals
-    calibration = extract_calibration_signals(events)
+    calibration = extract_calibration_signals(events, analysis)
 
     if calibration["voice"]:
         append_to_voice(calibration["voice"])
@@ -677,7 +1299,7 @@ def run_synthesis(session_id: Optional[str] = None, days: int = 7, skip_eval: bo
 
     # Session evaluation
     if not skip_eval:
-        eval_result = evaluate_session(events, session_id or "unknown")
+        eval_result = evaluate_session(events, session_id or "unknown", analysis)
         save_eval_result(eval_result)
         results["eval"] = {
             "task_type": eval_result["task_type"],
@@ -685,23 +1307,111 @@ def run_synthesis(session_id: Optional[str] = None, days: int = 7, skip_eval: bo
             "passed": eval_result["passed"]
         }
 
+    if checkpoint is not None:
+        _save_checkpoint(existing_patterns, checkpoint)
+    else:
+        after_output(partial(mark_synthesized, max(event.timestamp for event in events), session_id))
+
     return results
 
 
+def _save_checkpoint(existing_patterns: Dict, checkpoint: Dict):
+    """Store the checkpoint in patterns.json and mark everything it has read as synthesized"""
+    existing_patterns["checkpoint"] = checkpoint
+    save_patterns(existing_patterns)
+    after_output(partial(mark_synthesized, (checkpoint["position"] or {}).get("through")))
+
+
+# =============================================================================
+# Session Ledger
+# =============================================================================
+#
+# event_store.py keeps Memory/events/sessions.json as it appends:
+# per session the first and last event timestamps and the offset past its
+# last event, plus the session of the newest event. It is saved in batches
+# and caught up with the log tail on read. Synthesis records here
+# how far it got, so finding an orphaned session (the previous one, never
+# synthesized) is a lookup instead of two passes over the log.
+
+ORPHAN_MAX_AGE_DAYS = 30
+
+
+def load_session_ledger(current: bool = True) -> Optional[Dict]:
+    """
+    sessions.json, or None if there is none. With current=True it is first
+    caught up with events.jsonl (appends are saved to it in batches);
+    synthesis marks hold either way. The SQLite backend keeps no ledger.
+    """
+    if event_store.get_event_backend() == "sqlite":
+        return None
+    if current:
+        return event_store.get_session_ledger()
+    try:
+        ledger = json.loads(SESSIONS_FILE.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return ledger if isinstance(ledger, dict) and isinstance(ledger.get("sessions"), dict) else None
+
+
+def session_synthesized(ledger: Dict, session_id: str) -> bool:
+    """Whether synthesis has covered the session's last event"""
+    entry = ledger["sessions"].get(session_id)
+    if not entry or not entry.get("last_event"):
+        return False
+    through = max(entry.get("synthesized") or "", ledger.get("synthesized_through") or "")
+    return entry["last_event"] <= through
+
+
+def mark_synthesized(through: Optional[str], session_id: Optional[str] = None):
+    """
+    Record in sessions.json that synthesis covered events up to the
+    timestamp `through`: for one session, or (session_id=None) for all.
+    """
+    if through:
+        event_store.mark_session_ledger({session_id: through})
+
+
 def check_orphaned_session(current_session_id: str) -> Optional[str]:
-    """Check if there's an orphaned session that needs synthesis"""
+    """
+    Check if there's an orphaned session that needs synthesis: the session
+    of the newest event, if it is not the current one, has events from the
+    last ORPHAN_MAX_AGE_DAYS days, and synthesis has not covered them. Read
+    from the session ledger; without one (SQLite), from the log.
+    """
+    ledger = load_session_ledger()
+    if ledger is not None:
+        last_session = ledger.get("last_session")
+        if not last_session or last_session == current_session_id:
+            return None
+        cutoff = (datetime.now() - timedelta(days=ORPHAN_MAX_AGE_DAYS)).isoformat()
+        entry = ledger["sessions"].get(last_session) or {}
+        if entry.get("last_event", "") >= cutoff and not session_synthesized(ledger, last_session):
+            return last_session
+        return None
+
     last_session = get_last_session_id()
 
     if last_session and last_session != current_session_id:
         # There's a previous session that might not have been synthesized
         # Check if it has events
-        events = load_events(session_id=last_session, days=30)
+        events = load_event_records(session_id=last_session, days=ORPHAN_MAX_AGE_DAYS)
         if events:
             return last_session
 
     return None
 
 
+def recover_session(session_id: str) -> Dict:
+    """Synthesize an orphaned session, unless synthesis has covered it since it was found"""
+    ledger = load_session_ledger()
+    if ledger is not None and session_synthesized(ledger, session_id):
+        return {"status": "already_synthesized", "session_id": session_id, "recovered": False}
+
+    result = run_synthesis(session_id=session_id, days=ORPHAN_MAX_AGE_DAYS)
+    result["recovered"] = True
+    return result
+
+
 # =============================================================================
 # Session Evaluation
 # =============================================================================
@@ -766,92 +1476,86 @@ EVAL_TEMPLATES = {
 }
 
 
-def classify_task_type(events: List[Dict]) -> str:
+def classify_task_type(events: List[Dict], analysis: Optional[Dict] = None) -> str:
     """Classify task type from session events (especially first user decision)"""
-    # Look for first decision event (user's original request)
-    decisions = [e for e in events if e.get("subtype") == "decision"]
+    # First decision event is the user's original request
+    first_request = _analysis(events, analysis, ("first_decision",))["first_decision"]
 
-    if not decisions:
+    if first_request is None:
         return "unknown"
 
-    # Check first decision (original request)
-    first_request = decisions[0].get("payload", {}).get("detail", "").lower()
-
     # Match against patterns
-    for task_type, patterns in TASK_TYPE_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, first_request, re.IGNORECASE):
-                return task_type
+    return get_matcher("task_type").first(first_request) or "unknown"
+
 
-    return "unknown"
+# Extractors check_criterion() reads, beyond the per-subtype counts
+CRITERIA_EXTRACTORS = ("agents", "commands")
 
 
-def check_criterion(criterion_name: str, events: List[Dict]) -> Tuple[bool, str]:
+def check_criterion(criterion_name: str, events: List[Dict], analysis: Optional[Dict] = None) -> Tuple[bool, str]:
     """Check a single criterion against events, return (passed, reason)"""
+    analysis = _analysis(events, analysis, CRITERIA_EXTRACTORS)
+    counts = analysis["subtype_counts"]
 
     if criterion_name == "files_created":
-        created = [e for e in events if e.get("subtype") == "file_created"]
+        created = counts["file_created"]
         if created:
-            return True, f"{len(created)} files created"
+            return True, f"{created} files created"
         return False, "No files created"
 
     elif criterion_name == "files_modified":
-        modified = [e for e in events if e.get("subtype") == "file_modified"]
+        modified = counts["file_modified"]
         if modified:
-            return True, f"{len(modified)} files modified"
+            return True, f"{modified} files modified"
         return False, "No files modified"
 
     elif criterion_name == "files_created_or_modified":
-        created = [e for e in events if e.get("subtype") == "file_created"]
-        modified = [e for e in events if e.get("subtype") == "file_modified"]
-        total = len(created) + len(modified)
+        total = counts["file_created"] + counts["file_modified"]
         if total > 0:
             return True, f"{total} files created/modified"
         return False, "No files created or modified"
 
     elif criterion_name == "no_errors":
-        errors = [e for e in events if e.get("subtype") == "error"]
+        errors = counts["error"]
         if not errors:
             return True, "No errors"
-        return False, f"{len(errors)} errors occurred"
+        return False, f"{errors} errors occurred"
 
     elif criterion_name == "tests_run":
         # Look for test-related agents or commands
-        agents = [e for e in events if e.get("subtype") == "agent_deployed"]
-        test_agents = [a for a in agents if "test" in a.get("payload", {}).get("agent_type", "").lower()
-                      or "tdd" in a.get("payload", {}).get("agent_type", "").lower()]
+        test_agents = sum(
+            count for agent, count in analysis["agents"].items()
+            if "test" in (agent or "").lower() or "tdd" in (agent or "").lower()
+        )
         if test_agents:
-            return True, f"Test agents deployed: {len(test_agents)}"
+            return True, f"Test agents deployed: {test_agents}"
 
         # Check for test commands in skills
-        commands = [e for e in events if e.get("subtype") == "command"]
-        test_commands = [c for c in commands if "test" in c.get("payload", {}).get("command", "").lower()]
-        if test_commands:
+        if any("test" in (command or "").lower() for command in analysis["commands"]):
             return True, "Tests run via command"
 
         return False, "No tests detected"
 
     elif criterion_name == "session_completed":
         # Session is considered complete if there's substantial activity and no abandonment
-        file_events = [e for e in events if e.get("subtype") in ("file_created", "file_modified")]
-        errors = [e for e in events if e.get("subtype") == "error"]
+        file_events = counts["file_created"] + counts["file_modified"]
+        errors = counts["error"]
 
         # Ratio of successful operations to errors
-        if len(file_events) > 0:
-            error_ratio = len(errors) / (len(file_events) + len(errors))
+        if file_events > 0:
+            error_ratio = errors / (file_events + errors)
             if error_ratio < 0.5:  # Less than 50% error rate
-                return True, f"Session productive ({len(file_events)} file ops, {len(errors)} errors)"
+                return True, f"Session productive ({file_events} file ops, {errors} errors)"
 
         # Check for any meaningful activity
-        if len(events) >= 5:
-            return True, f"Session had activity ({len(events)} events)"
+        total = sum(counts.values())
+        if total >= 5:
+            return True, f"Session had activity ({total} events)"
 
         return False, "Session had minimal activity"
 
     elif criterion_name == "code_reviewed":
-        agents = [e for e in events if e.get("subtype") == "agent_deployed"]
-        review_agents = [a for a in agents if "review" in a.get("payload", {}).get("agent_type", "").lower()]
-        if review_agents:
+        if any("review" in (agent or "").lower() for agent in analysis["agents"]):
             return True, "Code review performed"
         return False, "No code review"
 
@@ -859,10 +1563,11 @@ def check_criterion(criterion_name: str, events: List[Dict]) -> Tuple[bool, str]
         return False, f"Unknown criterion: {criterion_name}"
 
 
-def evaluate_session(events: List[Dict], session_id: str) -> Dict:
+def evaluate_session(events: List[Dict], session_id: str, analysis: Optional[Dict] = None) -> Dict:
     """Evaluate session success based on task type and criteria"""
+    analysis = _analysis(events, analysis, ("first_decision",) + CRITERIA_EXTRACTORS)
 
-    if not events:
+    if not analysis["subtype_counts"]:
         return {
             "session_id": session_id,
             "task_type": "unknown",
@@ -873,7 +1578,7 @@ def evaluate_session(events: List[Dict], session_id: str) -> Dict:
         }
 
     # Classify task type
-    task_type = classify_task_type(events)
+    task_type = classify_task_type(events, analysis)
 
     # Get criteria template
     criteria_template = EVAL_TEMPLATES.get(task_type, EVAL_TEMPLATES["unknown"])
@@ -885,7 +1590,7 @@ def evaluate_session(events: List[Dict], session_id: str) -> Dict:
     for criterion in criteria_template:
         name = criterion["name"]
         weight = criterion["weight"]
-        passed, reason = check_criterion(name, events)
+        passed, reason = check_criterion(name, events, analysis)
 
         criteria_results.append({
             "name": name,
@@ -914,64 +1619,490 @@ def evaluate_session(events: List[Dict], session_id: str) -> Dict:
     return result
 
 
+# Eval results are appended to eval_history.jsonl; eval_index.json keeps
+# running aggregates over it so stats and trends never re-read the history.
+# The index records how far into the history it has folded (inode and
+# offset, as the synthesis checkpoint does for events.jsonl) and folds in
+# whatever was appended since on the next save or query. Aggregates are
+# kept for all time, for the last EVAL_WINDOW_SESSIONS results (added as
+# they arrive, subtracted as they leave) and per day for EVAL_RETAIN_DAYS
+# days. Scores are summed in hundredths so subtraction stays exact.
+
+EVAL_INDEX_FILE = PROJECT_ROOT / "Memory" / "events" / "eval_index.json"
+EVAL_INDEX_VERSION = 1
+EVAL_WINDOW_SESSIONS = 100
+EVAL_RETAIN_DAYS = 90
+
+
+def _eval_counts() -> Dict:
+    return {"total": 0, "passed": 0, "score": 0}
+
+
+def _eval_aggregate() -> Dict:
+    return {**_eval_counts(), "by_task_type": {}}
+
+
+def _eval_row(result: Dict) -> List:
+    """[day, task_type, passed, score in hundredths] for an eval result"""
+    return [
+        str(result.get("timestamp", ""))[:10],
+        result.get("task_type", "unknown"),
+        1 if result.get("passed") else 0,
+        round((result.get("score") or 0) * 100)
+    ]
+
+
+def _eval_add(aggregate: Dict, row: List, sign: int = 1):
+    """Add (sign=-1: remove) one row to an aggregate"""
+    _, task_type, passed, score = row
+    by_type = aggregate["by_task_type"].setdefault(task_type, _eval_counts())
+    for counts in (aggregate, by_type):
+        counts["total"] += sign
+        counts["passed"] += sign * passed
+        counts["score"] += sign * score
+    if not by_type["total"]:
+        del aggregate["by_task_type"][task_type]
+
+
+def _eval_merge(aggregates) -> Dict:
+    merged = _eval_aggregate()
+    for aggregate in aggregates:
+        pairs = [(merged, aggregate)] + [
+            (merged["by_task_type"].setdefault(task_type, _eval_counts()), counts)
+            for task_type, counts in aggregate["by_task_type"].items()
+        ]
+        for into, counts in pairs:
+            for key in ("total", "passed", "score"):
+                into[key] += counts[key]
+    return merged
+
+
+def _eval_summary(aggregate: Dict) -> Dict:
+    """Aggregate in get_eval_stats() form"""
+    total = aggregate["total"]
+    return {
+        "total": total,
+        "passed": aggregate["passed"],
+        "failed": total - aggregate["passed"],
+        "pass_rate": round(aggregate["passed"] / total, 2) if total > 0 else 0.0,
+        "avg_score": round(aggregate["score"] / total / 100, 2) if total > 0 else 0.0,
+        "by_task_type": {
+            task_type: {
+                "total": counts["total"],
+                "passed": counts["passed"],
+                "pass_rate": round(counts["passed"] / counts["total"], 2)
+            }
+            for task_type, counts in sorted(aggregate["by_task_type"].items())
+        }
+    }
+
+
+def _new_eval_index() -> Dict:
+    return {
+        "version": EVAL_INDEX_VERSION,
+        "position": {"inode": None, "offset": 0},
+        "all_time": _eval_aggregate(),
+        "recent": [],
+        "recent_totals": _eval_aggregate(),
+        "days": {}
+    }
+
+
+def _complete_lines(f, position: Dict):
+    """Yield newline-terminated lines from f, advancing position["offset"] past each"""
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        position["offset"] += len(line)
+        yield line
+
+
+def load_eval_index() -> Dict:
+    """
+    The eval index, with anything appended to the history since folded in.
+    Rebuilt from the start if the history was replaced or truncated.
+    """
+    try:
+        index = json.loads(EVAL_INDEX_FILE.read_text())
+        if index.get("version") != EVAL_INDEX_VERSION:
+            index = _new_eval_index()
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = _new_eval_index()
+
+    position = dict(index["position"])
+    try:
+        with open(EVAL_RESULTS_FILE, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if position["inode"] != stat.st_ino or position["offset"] > stat.st_size:
+                index, position = _new_eval_index(), {"inode": stat.st_ino, "offset": 0}
+            f.seek(position["offset"])
+            rows = []
+            for line in _complete_lines(f, position):
+                try:
+                    rows.append(_eval_row(json.loads(line)))
+                except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                    continue
+    except FileNotFoundError:
+        return _new_eval_index()
+
+    if position != index["position"]:
+        _fold_eval_rows(index, rows)
+        index["position"] = position
+        EVAL_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = EVAL_INDEX_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index))
+        os.replace(tmp, EVAL_INDEX_FILE)
+    return index
+
+
+def _fold_eval_rows(index: Dict, rows: List[List]):
+    recent = deque(index["recent"])
+    for row in rows:
+        _eval_add(index["all_time"], row)
+        recent.append(row)
+        _eval_add(index["recent_totals"], row)
+        if len(recent) > EVAL_WINDOW_SESSIONS:
+            _eval_add(index["recent_totals"], recent.popleft(), -1)
+        if row[0]:
+            _eval_add(index["days"].setdefault(row[0], _eval_aggregate()), row)
+    index["recent"] = list(recent)
+
+    cutoff_day = (datetime.now() - timedelta(days=EVAL_RETAIN_DAYS)).strftime("%Y-%m-%d")
+    index["days"] = {day: index["days"][day] for day in sorted(index["days"]) if day >= cutoff_day}
+
+
 def save_eval_result(result: Dict):
-    """Append eval result to history file"""
-    EVAL_RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    """Append eval result to history file and fold it into the index"""
+    save_eval_results([result])
 
-    with open(EVAL_RESULTS_FILE, 'a') as f:
-        f.write(json.dumps(result) + '\n')
+
+def save_eval_results(results: List[Dict]):
+    """Append eval results to the history file in one write and fold them into the index"""
+    if not results:
+        return
+    with staged_output() as output:
+        output.append(EVAL_RESULTS_FILE, "".join(json.dumps(result) + '\n' for result in results))
+        output.after_commit(load_eval_index)
 
 
 def get_eval_history(limit: int = 20) -> List[Dict]:
-    """Get recent eval results"""
-    if not EVAL_RESULTS_FILE.exists():
+    """Get recent eval results, oldest first, reading only the tail of the history"""
+    results = []
+    try:
+        with open(EVAL_RESULTS_FILE, 'rb') as f:
+            for _, line in event_store.iter_lines_reverse(f):
+                if len(results) >= limit:
+                    break
+                if line.strip():
+                    try:
+                        results.append(json.loads(line))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        pass
+    except FileNotFoundError:
         return []
 
-    results = []
-    with open(EVAL_RESULTS_FILE, 'r') as f:
-        for line in f:
-            if line.strip():
-                try:
-                    results.append(json.loads(line))
-                except json.JSONDecodeError:
-                    pass
+    return results[::-1]
+
+
+def get_eval_stats(sessions: Optional[int] = None, days: Optional[int] = None) -> Dict:
+    """
+    Get aggregate eval statistics over the last `sessions` results (default
+    EVAL_WINDOW_SESSIONS) or, given `days`, the last `days` days (at most
+    EVAL_RETAIN_DAYS), plus all-time totals.
+    """
+    index = load_eval_index()
 
-    # Return most recent
-    return results[-limit:]
+    if days is not None:
+        days = min(days, EVAL_RETAIN_DAYS)
+        cutoff_day = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        aggregate = _eval_merge(counts for day, counts in index["days"].items() if day >= cutoff_day)
+        window = {"days": days}
+    else:
+        sessions = EVAL_WINDOW_SESSIONS if sessions is None else max(sessions, 0)
+        recent = index["recent"]
+        if sessions > EVAL_WINDOW_SESSIONS:
+            aggregate = _eval_aggregate()
+            for result in get_eval_history(limit=sessions):
+                _eval_add(aggregate, _eval_row(result))
+        elif sessions >= len(recent):
+            aggregate = index["recent_totals"]
+        else:
+            aggregate = _eval_aggregate()
+            for row in recent[len(recent) - sessions:]:
+                _eval_add(aggregate, row)
+        window = {"sessions": sessions}
+
+    stats = _eval_summary(aggregate)
+    stats["window"] = window
+    stats["all_time"] = {
+        key: value for key, value in _eval_summary(index["all_time"]).items() if key != "by_task_type"
+    }
+    return stats
+
+
+def get_eval_trend(days: int = 14) -> List[Dict]:
+    """Pass rate and average score per day over the last `days` days (at most EVAL_RETAIN_DAYS)"""
+    index = load_eval_index()
+    cutoff_day = (datetime.now() - timedelta(days=min(days, EVAL_RETAIN_DAYS))).strftime("%Y-%m-%d")
+    trend = []
+    for day, counts in index["days"].items():
+        if day >= cutoff_day:
+            summary = _eval_summary(counts)
+            trend.append({
+                "date": day,
+                "total": summary["total"],
+                "passed": summary["passed"],
+                "pass_rate": summary["pass_rate"],
+                "avg_score": summary["avg_score"]
+            })
+    return trend
+
+
+# =============================================================================
+# Incremental Synthesis
+# =============================================================================
+#
+# Synthesis over all sessions keeps a checkpoint in patterns.json: for each
+# calendar day in the window, the state of every WINDOW_EXTRACTORS
+# extractor, plus the read position in events.jsonl and the open
+# ResolutionWindows stream. A run reads only what was appended since, folds
+# it into its day's state, drops days that have left the window, and merges
+# the remaining days for the outputs. The window is whole days: `days` days
+# back from today, counting the first day from midnight.
+
+CHECKPOINT_VERSION = 1
+
+# Kept per day and merged over the window
+WINDOW_EXTRACTORS = tuple(dict.fromkeys(
+    ACTIVE_CONTEXT_EXTRACTORS + ("first_decision",) + CRITERIA_EXTRACTORS
+))
+
+# Run over new events only: calibration signals and learnings are appended
+# to files, so each event should yield them once
+DELTA_EXTRACTORS = ("calibration", "resolutions", "edit_tools")
+
+
+def _read_new_events(position: Optional[Dict], cutoff_day: str) -> Tuple[List[EventRecord], Dict]:
+    """
+    Events in the window not yet folded in at position, sorted, and the
+    position after them (see event_store.read_new_events).
+    """
+    events, position = event_store.read_new_events(position, since=cutoff_day)
+    return [EventRecord.from_dict(event) for event in events], position
 
 
-def get_eval_stats() -> Dict:
-    """Get aggregate eval statistics"""
-    history = get_eval_history(limit=100)
+def update_checkpoint(checkpoint: Optional[Dict], days: int = 7,
+                      full: bool = False) -> Tuple[List[EventRecord], Dict, Dict, bool]:
+    """
+    Bring a synthesis checkpoint (None: start one) up to date.
 
-    if not history:
-        return {"total": 0, "passed": 0, "failed": 0, "pass_rate": 0.0}
+    Returns the new events, the analysis (window extractors merged over the
+    days still in the window, DELTA_EXTRACTORS over the new events only),
+    the updated checkpoint, and whether the window changed at all. A
+    checkpoint for another window length, or full=True, is rebuilt.
+    """
+    cutoff_day = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    if full or not checkpoint or checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("days") != days:
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "days": days,
+            "position": None,
+            "events_seen": 0,
+            "last_session": None,
+            "stream": None,
+            "buckets": {}
+        }
 
-    passed = sum(1 for r in history if r.get("passed"))
-    total = len(history)
+    events, position = _read_new_events(checkpoint["position"], cutoff_day)
+    buckets = {day: state for day, state in checkpoint["buckets"].items() if day >= cutoff_day}
+    changed = bool(events) or len(buckets) != len(checkpoint["buckets"])
+
+    delta = {name: EXTRACTORS[name]() for name in DELTA_EXTRACTORS}
+    if checkpoint["stream"]:
+        delta["resolutions"].merge(checkpoint["stream"])
+
+    # One pass over the new events, a day at a time: each day's extractors
+    # resume from its stored state, the delta extractors run throughout
+    index = checkpoint["events_seen"]
+    for day, day_events in groupby(events, key=lambda r: r.timestamp[:10]):
+        day_events = list(day_events)
+        extractors = {name: EXTRACTORS[name]() for name in WINDOW_EXTRACTORS}
+        counts = Counter()
+        if day in buckets:
+            for name, extractor in extractors.items():
+                extractor.merge(buckets[day][name])
+            counts.update(dict(buckets[day]["subtype_counts"]))
+        counts.update(_feed_extractors(day_events, {**extractors, **delta}, index))
+        index += len(day_events)
+
+        buckets[day] = {name: extractor.state() for name, extractor in extractors.items()}
+        buckets[day]["subtype_counts"] = _counter_state(counts)
+
+    # Merge the window, oldest day first
+    window = {name: EXTRACTORS[name]() for name in WINDOW_EXTRACTORS}
+    subtype_counts = Counter()
+    for day in sorted(buckets):
+        for name, extractor in window.items():
+            extractor.merge(buckets[day][name])
+        subtype_counts.update(dict(buckets[day]["subtype_counts"]))
+
+    analysis = {name: extractor.result() for name, extractor in {**window, **delta}.items()}
+    analysis["subtype_counts"] = subtype_counts
+
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "days": days,
+        "position": position,
+        "events_seen": index,
+        "last_session": events[-1].session_id if events else checkpoint["last_session"],
+        "stream": delta["resolutions"].state(),
+        "buckets": {day: buckets[day] for day in sorted(buckets)}
+    }
+    return events, analysis, checkpoint, changed
 
-    by_type = defaultdict(lambda: {"total": 0, "passed": 0})
-    for r in history:
-        task_type = r.get("task_type", "unknown")
-        by_type[task_type]["total"] += 1
-        if r.get("passed"):
-            by_type[task_type]["passed"] += 1
 
+# =============================================================================
+# Backfill
+# =============================================================================
+#
+# Catches up on sessions synthesis never covered (crashes, hooks disabled)
+# in one run instead of one `recover` per SessionStart. One scan partitions
+# the window by session; the per-session work that writes nothing (eval,
+# learning candidates, calibration signals, pattern counts) runs in a
+# process pool; the results are merged in session order (first event, then
+# session ID), so the outcome does not depend on the number of workers.
+# activeContext.md is left to `synthesize`, whose window already holds
+# these sessions' events.
+
+def _pending_sessions(sessions: Dict[str, List[EventRecord]],
+                      current_session_id: Optional[str]) -> List[str]:
+    """Sessions with events newer than synthesis covered, oldest first"""
+    ledger = load_session_ledger(current=False)
+    entries = ledger["sessions"] if ledger is not None else {}
+    covered_all = (ledger or {}).get("synthesized_through") or ""
+    evaluated = set()
+    if ledger is None:
+        # No ledger yet: a session counts as synthesized if it was evaluated
+        try:
+            with open(EVAL_RESULTS_FILE, 'rb') as f:
+                for line in f:
+                    try:
+                        evaluated.add(json.loads(line).get("session_id"))
+                    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                        continue
+        except FileNotFoundError:
+            pass
+
+    pending = []
+    for session_id, records in sessions.items():
+        if session_id == current_session_id or session_id in evaluated:
+            continue
+        covered = (entries.get(session_id) or {}).get("synthesized") or ""
+        if records[-1].timestamp > max(covered_all, covered):
+            pending.append(session_id)
+    return sorted(pending, key=lambda s: (sessions[s][0].timestamp, s))
+
+
+def _synthesize_session(events: List[EventRecord], skip_eval: bool = False) -> Dict:
+    """The file-free part of synthesizing one session (runs in backfill workers)"""
+    session_id = events[0].session_id
+    analysis = analyze_events(events)
     return {
-        "total": total,
-        "passed": passed,
-        "failed": total - passed,
-        "pass_rate": round(passed / total, 2) if total > 0 else 0.0,
-        "avg_score": round(sum(r.get("score", 0) for r in history) / total, 2) if total > 0 else 0.0,
-        "by_task_type": dict(by_type)
+        "session_id": session_id,
+        "events": len(events),
+        "through": events[-1].timestamp,
+        "eval": None if skip_eval else evaluate_session(events, session_id, analysis),
+        "learnings": detect_learnable_patterns(events, analysis),
+        "calibration": extract_calibration_signals(events, analysis),
+        "sequences": extract_tool_sequences(events, analysis),
+        "error_patterns": extract_error_patterns(events, analysis)
     }
 
 
+def backfill(days: int = 30, workers: Optional[int] = None, current_session_id: Optional[str] = None,
+             skip_eval: bool = False) -> Dict:
+    """
+    Synthesize every session in the last `days` days that synthesis has not
+    covered, except current_session_id, using up to `workers` processes
+    (default: one per CPU).
+    """
+    sessions: Dict[str, List[EventRecord]] = {}
+    for event in _iter_events(None, days):
+        record = EventRecord.from_dict(event)
+        if record.session_id:
+            sessions.setdefault(record.session_id, []).append(record)
+    for records in sessions.values():
+        records.sort(key=lambda r: r.timestamp)
+
+    pending = _pending_sessions(sessions, current_session_id)
+    with staged_output() as output:
+        results = _backfill_sessions(sessions, pending, workers, skip_eval)
+    results["output"] = output.report
+    return results
+
+
+def _backfill_sessions(sessions: Dict[str, List[EventRecord]], pending: List[str],
+                       workers: Optional[int], skip_eval: bool) -> Dict:
+    results = {
+        "status": "success",
+        "sessions": pending,
+        "events_processed": sum(len(sessions[s]) for s in pending),
+        "workers": 0,
+        "learnings_added": 0,
+        "calibration_signals": {"voice": 0, "keeper": 0},
+        "evals": {"passed": 0, "failed": 0}
+    }
+    if not pending:
+        results["status"] = "up_to_date"
+        return results
+
+    jobs = [sessions[s] for s in pending]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    results["workers"] = workers
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(partial(_synthesize_session, skip_eval=skip_eval), jobs,
+                                    chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        outputs = [_synthesize_session(events, skip_eval) for events in jobs]
+
+    # Merge in session order
+    existing_patterns = load_existing_patterns()
+    patterns = existing_patterns.setdefault("patterns", {})
+    for output in outputs:
+        update_pattern_counts(patterns, output["sequences"], output["error_patterns"])
+    save_patterns(existing_patterns)
+
+    candidates = [candidate for output in outputs for candidate in output["learnings"]]
+    applied = add_learnings_via_manager(candidates)
+    results["learnings_added"] = len(candidates)
+    if applied:
+        results["learnings"] = applied
+
+    for kind, append in (("voice", append_to_voice), ("keeper", append_to_keeper)):
+        signals = [signal for output in outputs for signal in output["calibration"][kind]]
+        if signals:
+            append(signals)
+        results["calibration_signals"][kind] = len(signals)
+
+    evals = [output["eval"] for output in outputs if output["eval"]]
+    save_eval_results(evals)
+    for result in evals:
+        results["evals"]["passed" if result["passed"] else "failed"] += 1
+
+    after_output(partial(event_store.mark_session_ledger,
+                         {output["session_id"]: output["through"] for output in outputs}))
+    return results
+
+
 # =============================================================================
 # CLI
 # =============================================================================
 
 def main():
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Pattern Analyzer - Extract learnings and synthesize Memory",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -983,6 +2114,7 @@ def main():
     synth_parser = subparsers.add_parser("synthesize", help="Run full synthesis pipeline")
     synth_parser.add_argument("--session-id", "-s", help="Specific session to synthesize")
     synth_parser.add_argument("--days", "-d", type=int, default=7, help="Days of history (default: 7)")
+    synth_parser.add_argument("--full", action="store_true", help="Rebuild the incremental checkpoint from the log")
 
     # Patterns command
     patterns_parser = subparsers.add_parser("patterns", help="Show extracted patterns")
@@ -1001,6 +2133,13 @@ def main():
     recover_parser = subparsers.add_parser("recover", help="Recover and synthesize orphaned session")
     recover_parser.add_argument("--session-id", "-s", required=True, help="Orphaned session ID")
 
+    # Backfill command
+    backfill_parser = subparsers.add_parser("backfill", help="Synthesize every session synthesis missed")
+    backfill_parser.add_argument("--days", "-d", type=int, default=30, help="Days of history (default: 30)")
+    backfill_parser.add_argument("--workers", "-j", type=int, help="Worker processes (default: one per CPU)")
+    backfill_parser.add_argument("--current-session", "-c", help="Session to leave alone (still in progress)")
+    backfill_parser.add_argument("--skip-eval", action="store_true", help="Don't evaluate the sessions")
+
     # Eval command
     eval_parser = subparsers.add_parser("eval", help="Evaluate a session")
     eval_parser.add_argument("--session-id", "-s", help="Session to evaluate (default: current)")
@@ -1011,7 +2150,14 @@ def main():
     history_parser.add_argument("--limit", "-n", type=int, default=10, help="Number of results")
 
     # Eval stats command
-    subparsers.add_parser("eval-stats", help="Show aggregate eval statistics")
+    stats_parser = subparsers.add_parser("eval-stats", help="Show aggregate eval statistics")
+    stats_window = stats_parser.add_mutually_exclusive_group()
+    stats_window.add_argument("--sessions", "-n", type=int, help="Last N sessions (default: 100)")
+    stats_window.add_argument("--days", "-d", type=int, help="Last N days instead")
+
+    # Eval trend command
+    trend_parser = subparsers.add_parser("eval-trend", help="Show eval pass rate per day")
+    trend_parser.add_argument("--days", "-d", type=int, default=14, help="Days of history (default: 14)")
 
     args = parser.parse_args()
 
@@ -1021,7 +2167,7 @@ def main():
 
     try:
         if args.command == "synthesize":
-            result = run_synthesis(session_id=args.session_id, days=args.days)
+            result = run_synthesis(session_id=args.session_id, days=args.days, full=args.full)
             print(json.dumps(result, indent=2))
 
         elif args.command == "patterns":
@@ -1034,7 +2180,7 @@ def main():
             print(json.dumps(filtered, indent=2))
 
         elif args.command == "calibration":
-            events = load_events(session_id=args.session_id, days=args.days)
+            events = load_event_records(session_id=args.session_id, days=args.days)
             signals = extract_calibration_signals(events)
             print(json.dumps(signals, indent=2))
 
@@ -1046,12 +2192,16 @@ def main():
                 print(json.dumps({"orphaned_session": None}))
 
         elif args.command == "recover":
-            result = run_synthesis(session_id=args.session_id, days=30)
-            result["recovered"] = True
+            result = recover_session(args.session_id)
+            print(json.dumps(result, indent=2))
+
+        elif args.command == "backfill":
+            result = backfill(days=args.days, workers=args.workers,
+                              current_session_id=args.current_session, skip_eval=args.skip_eval)
             print(json.dumps(result, indent=2))
 
         elif args.command == "eval":
-            events = load_events(session_id=args.session_id, days=args.days)
+            events = load_event_records(session_id=args.session_id, days=args.days)
             if not events:
                 print(json.dumps({"error": "No events found"}))
             else:
@@ -1064,9 +2214,13 @@ def main():
             print(json.dumps(history, indent=2))
 
         elif args.command == "eval-stats":
-            stats = get_eval_stats()
+            stats = get_eval_stats(sessions=args.sessions, days=args.days)
             print(json.dumps(stats, indent=2))
 
+        elif args.command == "eval-trend":
+            trend = get_eval_trend(days=args.days)
+            print(json.dumps(trend, indent=2))
+
     except Exception as e:
         import sys
         print(json.dumps({"error": str(e)}), file=sys.stderr)
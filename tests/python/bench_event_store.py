@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for event_store.py hot paths
+
+Not collected by pytest. Prints JSON like the tools themselves.
+Run with: python tests/python/bench_event_store.py scrub [--iterations N]
+          python tests/python/bench_event_store.py startup [--runs N]
+          python tests/python/bench_event_store.py importtime [--budget-ms MS]
+          python tests/python/bench_event_store.py columnar [--events N]
+          python tests/python/bench_event_store.py records [--events N]
+          python tests/python/bench_event_store.py synthesis [--events N]
+          python tests/python/bench_event_store.py incremental [--events N] [--delta N]
+"""
+
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+# Add tools directory to path
+TOOLS_DIR = Path(__file__).parent.parent.parent / "plugins" / "asha" / "tools"
+sys.path.insert(0, str(TOOLS_DIR))
+
+
+# Payloads shaped like what hooks/handlers/*.sh emit
+HOOK_PAYLOADS = {
+    "file_modified": {
+        "file_path": "plugins/asha/tools/event_store.py",
+        "detail": "Modified: plugins/asha/tools/event_store.py"
+    },
+    "command": {
+        "command": "/asha:save",
+        "detail": "Skill: /asha:save"
+    },
+    "agent_deployed": {
+        "agent_type": "code-reviewer",
+        "description": "Review the rotation changes for crash safety",
+        "detail": "Agent: code-reviewer → Review the rotation changes for crash safety"
+    },
+    "error": {
+        "error": "Command failed with exit code 1: pytest -q tests/python",
+        "context": "Bash: python -m pytest -q tests/python/test_event_store.py"
+    },
+    "decision": {
+        "detail": "Let's keep the JSONL backend as default and make sqlite opt-in via config",
+        "files": ["plugins/asha/tools/event_store.py", "plugins/asha/README.md"]
+    },
+    "secret_bearing": {
+        "command": "curl -H 'Authorization: Bearer abcdef1234567890' https://api.example.com",
+        "detail": "export GITHUB_TOKEN=ghp_" + "a" * 36
+    },
+}
+
+
+def import_event_store():
+    """Import event_store against a throwaway project"""
+    project = tempfile.mkdtemp(prefix="event_store_bench_")
+    (Path(project) / "Memory").mkdir()
+    os.environ["CLAUDE_PROJECT_DIR"] = project
+    import event_store
+    return event_store
+
+
+def bench_scrub(iterations: int) -> dict:
+    es = import_event_store()
+    results = {}
+    for name, payload in HOOK_PAYLOADS.items():
+        seconds = timeit.timeit(lambda: es.scrub_payload(payload), number=iterations)
+        results[name] = round(seconds / iterations * 1e6, 2)
+
+    mix = list(HOOK_PAYLOADS.values())
+    seconds = timeit.timeit(lambda: [es.scrub_payload(p) for p in mix], number=iterations)
+    return {
+        "benchmark": "scrub_payload",
+        "unit": "us/event",
+        "iterations": iterations,
+        "per_payload": results,
+        "mixed_average": round(seconds / (iterations * len(mix)) * 1e6, 2)
+    }
+
+
+def _import_seconds(module: str, cwd: Path, env: dict) -> float:
+    """Wall time of a fresh interpreter importing module, minus bare startup"""
+    code = (
+        "import sys, time; t = time.perf_counter(); "
+        f"sys.path.insert(0, {str(TOOLS_DIR)!r}); import {module}; "
+        "print(time.perf_counter() - t)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout)
+
+
+def bench_startup(runs: int) -> dict:
+    """
+    Import cost of each tool the way a CLI run sees it: started from a
+    subdirectory of a git project, without CLAUDE_PROJECT_DIR. "uncached"
+    removes the project-root marker before every run so git is consulted;
+    "cached" leaves the marker from the previous run in place.
+    """
+    project = Path(tempfile.mkdtemp(prefix="event_store_bench_"))
+    subprocess.run(["git", "init", "-q", str(project)], check=True)
+    (project / "Memory").mkdir()
+    (project / "Work" / "markers").mkdir(parents=True)
+    (project / "Work" / "markers" / "session-id").write_text("session_bench\n")
+    cwd = project / "src"
+    cwd.mkdir()
+    marker = project / "Work" / "markers" / "project-root"
+    env = {k: v for k, v in os.environ.items() if k != "CLAUDE_PROJECT_DIR"}
+
+    results = {}
+    for module in ("event_store", "pattern_analyzer"):
+        uncached, cached = [], []
+        for _ in range(runs):
+            if marker.exists():
+                marker.unlink()
+            uncached.append(_import_seconds(module, cwd, env))
+            cached.append(_import_seconds(module, cwd, env))
+        results[module] = {
+            "uncached_ms": round(statistics.median(uncached) * 1e3, 2),
+            "cached_ms": round(statistics.median(cached) * 1e3, 2)
+        }
+
+    os.environ["CLAUDE_PROJECT_DIR"] = str(project)
+    sys.path.insert(0, str(TOOLS_DIR))
+    import event_store
+    iterations = 20000
+    seconds = timeit.timeit(event_store.get_current_session_id, number=iterations)
+    return {
+        "benchmark": "startup",
+        "unit": "ms (median import time)",
+        "runs": runs,
+        "imports": results,
+        "session_id_lookup_us": round(seconds / iterations * 1e6, 2)
+    }
+
+
+# The hot commands (`emit` is what a hook starts when the daemon is down;
+# `claims` and `query --limit` are what agents poll): what each may load
+HOT_COMMANDS = {
+    "emit": ["emit", "--type", "event", "--subtype", "command", "--payload", '{"detail": "x"}'],
+    "claims": ["claims"],
+    "query": ["query", "--limit", "1"],
+}
+EMIT_ARGS = HOT_COMMANDS["emit"]
+EMIT_IMPORT_BUDGET_MS = 35.0
+EMIT_MODULE_BUDGET = 50
+
+
+def parse_importtime(stderr: str) -> list:
+    """(module, cumulative us, depth) for each line of -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _self, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        modules.append((name.strip(), int(cumulative), depth))
+    return modules
+
+
+def emit_imports(project: Path, args: list = EMIT_ARGS) -> list:
+    """Modules imported by an `event_store.py <args>` run beyond bare interpreter startup"""
+    env = dict(os.environ, CLAUDE_PROJECT_DIR=str(project))
+    bare = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"],
+                          env=env, capture_output=True, text=True, check=True)
+    baseline = {name for name, _, _ in parse_importtime(bare.stderr)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(TOOLS_DIR / "event_store.py"), *args],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return [m for m in parse_importtime(result.stderr) if m[0] not in baseline]
+
+
+def bench_importtime(runs: int, budget_ms: float, module_budget: int) -> dict:
+    """
+    -X importtime regression check for the HOT_COMMANDS startup paths.
+    Reports each command's median import cost over runs and fails (exit
+    status 1) if any exceeds budget_ms or loads more than module_budget
+    modules.
+    """
+    project = Path(tempfile.mkdtemp(prefix="event_store_bench_"))
+    (project / "Memory").mkdir()
+
+    commands = {}
+    for command, args in HOT_COMMANDS.items():
+        totals = []
+        for _ in range(runs):
+            modules = emit_imports(project, args)
+            totals.append(sum(cumulative for _, cumulative, depth in modules if depth == 0) / 1e3)
+        slowest = sorted((m for m in modules if m[2] == 0), key=lambda m: -m[1])[:8]
+        median = statistics.median(totals)
+        commands[command] = {
+            "args": " ".join(args[1:]),
+            "import_ms": round(median, 2),
+            "modules": len(modules),
+            "slowest": {name: round(cumulative / 1e3, 2) for name, cumulative, _ in slowest},
+            "within_budget": median <= budget_ms and len(modules) <= module_budget
+        }
+    return {
+        "benchmark": "importtime",
+        "budget_ms": budget_ms,
+        "module_budget": module_budget,
+        "commands": commands,
+        "within_budget": all(result["within_budget"] for result in commands.values())
+    }
+
+
+def bench_columnar(n_events: int) -> dict:
+    """
+    Daily counts per subtype over a year of history: parsing every JSON
+    event versus the columnar snapshot (stdlib arrays, and NumPy if present)
+    """
+    from collections import Counter
+    from datetime import datetime, timedelta
+
+    es = import_event_store()
+    subtypes = ["file_modified", "file_created", "command", "error", "agent_deployed"]
+    start = datetime.now() - timedelta(days=365)
+    step = timedelta(days=365) / n_events
+    with open(es.EVENTS_FILE, "w") as f:
+        for i in range(n_events):
+            event = es.build_event("event", subtypes[i % len(subtypes)], HOOK_PAYLOADS["file_modified"],
+                                   tool_name="Edit", session_id=f"session_{i // 500}")
+            event["timestamp"] = (start + step * i).isoformat() + "Z"
+            f.write(json.dumps(event) + "\n")
+    es.rotate_events(days_threshold=30)
+
+    def json_counts():
+        return Counter((e["timestamp"][:10], e["subtype"]) for e in es.iter_events())
+
+    timings = {}
+    t0 = time.perf_counter()
+    expected = json_counts()
+    timings["json_parse_ms"] = (time.perf_counter() - t0) * 1e3
+
+    t0 = time.perf_counter()
+    export = es.export_columnar()
+    timings["export_ms"] = (time.perf_counter() - t0) * 1e3
+
+    t0 = time.perf_counter()
+    snapshot = es.load_columnar()
+    counts = es.columnar_daily_counts(snapshot)
+    timings["columnar_stdlib_ms"] = (time.perf_counter() - t0) * 1e3
+    assert sum(sum(day.values()) for day in counts.values()) == sum(expected.values())
+
+    try:
+        import numpy as np
+    except ImportError:
+        timings["columnar_numpy_ms"] = None
+    else:
+        t0 = time.perf_counter()
+        manifest = json.loads((es.COLUMNAR_DIR / "manifest.json").read_text())["columns"]
+        days = np.fromfile(es.COLUMNAR_DIR / "timestamp.bin", dtype="<i8") // 86_400_000_000
+        codes = np.fromfile(es.COLUMNAR_DIR / "subtype.bin", dtype=manifest["subtype"]["dtype"])
+        keys = (days - days.min()) * len(manifest["subtype"]["dictionary"]) + codes
+        np.bincount(keys)
+        timings["columnar_numpy_ms"] = (time.perf_counter() - t0) * 1e3
+
+    return {
+        "benchmark": "columnar",
+        "events": n_events,
+        "snapshot_bytes": export["bytes"],
+        "jsonl_bytes": sum(p.stat().st_size for p in es.list_archive_files()) + es.EVENTS_FILE.stat().st_size,
+        **{name: (round(ms, 1) if ms is not None else None) for name, ms in timings.items()}
+    }
+
+
+def bench_records(n_events: int) -> dict:
+    """
+    Peak traced memory and time to load a history and synthesize
+    activeContext's sections from it: event dicts versus EventRecords
+    """
+    import tracemalloc
+
+    es = import_event_store()
+    import pattern_analyzer as pa
+    subtypes = list(HOOK_PAYLOADS)
+    with open(es.EVENTS_FILE, "w") as f:
+        for i in range(n_events):
+            subtype = subtypes[i % len(subtypes)]
+            event = es.build_event("event", subtype, HOOK_PAYLOADS[subtype],
+                                   tool_name="Edit", session_id=f"session_{i // 500}")
+            f.write(json.dumps(event) + "\n")
+
+    def synthesize(loader):
+        events = loader(days=1)
+        sections = (pa.synthesize_accomplishments(events), pa.synthesize_blockers(events),
+                    pa.synthesize_next_steps(events), pa.detect_learnable_patterns(events))
+        return events, sections
+
+    results = {}
+    for loader in (pa.load_events, pa.load_event_records):
+        t0 = time.perf_counter()
+        _, sections = synthesize(loader)
+        elapsed = time.perf_counter() - t0
+
+        # Memory is traced on a second run: tracing slows allocation severalfold
+        tracemalloc.start()
+        events = loader(days=1)
+        retained = tracemalloc.get_traced_memory()[0]
+        del events
+        tracemalloc.reset_peak()
+        synthesize(loader)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[loader.__name__] = {
+            "retained_mb": round(retained / 1e6, 1),
+            "peak_mb": round(peak / 1e6, 1),
+            "ms": round(elapsed * 1e3, 1),
+            "sections": sections
+        }
+
+    dicts, records = results["load_events"], results["load_event_records"]
+    assert dicts.pop("sections") == records.pop("sections")
+    return {"benchmark": "records", "events": n_events, **results}
+
+
+def bench_synthesis(n_events: int) -> dict:
+    """
+    Everything run_synthesis derives from one session: one pass per output
+    (each function analyzing the events itself) versus a single
+    analyze_events() pass shared by all of them
+    """
+    es = import_event_store()
+    import pattern_analyzer as pa
+    subtypes = ["file_modified", "command", "agent_deployed", "error", "decision", "file_modified"]
+    events = []
+    for i in range(n_events):
+        subtype = subtypes[i % len(subtypes)]
+        event_type = "context" if subtype == "decision" else "event"
+        event = es.build_event(event_type, subtype, HOOK_PAYLOADS[subtype], tool_name="Edit", session_id="bench")
+        events.append(pa.EventRecord.from_dict(event))
+
+    def outputs(analysis):
+        patterns = {"patterns": {}}
+        return (
+            pa.synthesize_accomplishments(events, analysis),
+            pa.synthesize_learnings(events, patterns, analysis),
+            pa.synthesize_blockers(events, analysis),
+            pa.synthesize_next_steps(events, analysis),
+            pa.detect_learnable_patterns(events, analysis),
+            pa.extract_calibration_signals(events, analysis),
+            pa.evaluate_session(events, "bench", analysis)["criteria"]
+        )
+
+    t0 = time.perf_counter()
+    per_output = outputs(None)
+    per_output_ms = (time.perf_counter() - t0) * 1e3
+
+    t0 = time.perf_counter()
+    single = outputs(pa.analyze_events(events))
+    single_ms = (time.perf_counter() - t0) * 1e3
+    assert single == per_output
+
+    return {
+        "benchmark": "synthesis",
+        "events": n_events,
+        "pass_per_output_ms": round(per_output_ms, 1),
+        "single_pass_ms": round(single_ms, 1),
+        "speedup": round(per_output_ms / single_ms, 2)
+    }
+
+
+def bench_incremental(n_events: int, n_delta: int) -> dict:
+    """
+    run_synthesis over a week of history: rebuilding the checkpoint from
+    the log versus folding in a handful of newly appended events
+    """
+    from unittest.mock import patch
+    from datetime import datetime, timedelta
+
+    es = import_event_store()
+    import pattern_analyzer as pa
+    subtypes = ["file_modified", "command", "agent_deployed", "error", "file_modified"]
+    start = datetime.now() - timedelta(days=6)
+    step = timedelta(days=6) / n_events
+
+    def append(count, offset):
+        with open(es.EVENTS_FILE, "a") as f:
+            for i in range(offset, offset + count):
+                subtype = subtypes[i % len(subtypes)]
+                event = es.build_event("event", subtype, HOOK_PAYLOADS[subtype],
+                                       tool_name="Edit", session_id=f"session_{i // 500}")
+                event["timestamp"] = (start + step * i).isoformat() + "Z"
+                f.write(json.dumps(event) + "\n")
+
+    append(n_events, 0)
+    timings = {}
+    with patch.object(pa, "add_learnings_via_manager"):
+        t0 = time.perf_counter()
+        pa.run_synthesis(full=True, skip_eval=True)
+        timings["full_ms"] = (time.perf_counter() - t0) * 1e3
+
+        append(n_delta, n_events)
+        t0 = time.perf_counter()
+        result = pa.run_synthesis(skip_eval=True)
+        timings["incremental_ms"] = (time.perf_counter() - t0) * 1e3
+        assert result["events_new"] == n_delta
+
+        t0 = time.perf_counter()
+        pa.run_synthesis(skip_eval=True)
+        timings["unchanged_ms"] = (time.perf_counter() - t0) * 1e3
+
+    return {
+        "benchmark": "incremental",
+        "events": n_events,
+        "delta": n_delta,
+        "checkpoint_bytes": pa.PATTERNS_FILE.stat().st_size,
+        **{name: round(ms, 1) for name, ms in timings.items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="event_store micro-benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrub_parser = subparsers.add_parser("scrub", help="Per-event secret scrubbing cost")
+    scrub_parser.add_argument("--iterations", "-n", type=int, default=20000)
+
+    startup_parser = subparsers.add_parser("startup", help="Tool import cost with and without the root cache")
+    startup_parser.add_argument("--runs", "-n", type=int, default=15)
+
+    importtime_parser = subparsers.add_parser("importtime",
+                                              help="Fail if emit/claims/query startup exceeds its import budget")
+    importtime_parser.add_argument("--runs", "-n", type=int, default=7)
+    importtime_parser.add_argument("--budget-ms", type=float, default=EMIT_IMPORT_BUDGET_MS)
+    importtime_parser.add_argument("--module-budget", type=int, default=EMIT_MODULE_BUDGET)
+
+    columnar_parser = subparsers.add_parser("columnar", help="Daily subtype counts: JSON vs columnar snapshot")
+    columnar_parser.add_argument("--events", "-n", type=int, default=200000)
+
+    records_parser = subparsers.add_parser("records", help="Synthesis memory: event dicts vs EventRecords")
+    records_parser.add_argument("--events", "-n", type=int, default=100000)
+
+    synthesis_parser = subparsers.add_parser("synthesis", help="Synthesis outputs: a pass each vs one shared pass")
+    synthesis_parser.add_argument("--events", "-n", type=int, default=50000)
+
+    incremental_parser = subparsers.add_parser("incremental", help="Synthesis: checkpoint rebuild vs delta")
+    incremental_parser.add_argument("--events", "-n", type=int, default=100000)
+    incremental_parser.add_argument("--delta", type=int, default=12)
+
+    args = parser.parse_args()
+    if args.command == "scrub":
+        print(json.dumps(bench_scrub(args.iterations), indent=2, ensure_ascii=False))
+    elif args.command == "startup":
+        print(json.dumps(bench_startup(args.runs), indent=2, ensure_ascii=False))
+    elif args.command == "importtime":
+        result = bench_importtime(args.runs, args.budget_ms, args.module_budget)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        if not result["within_budget"]:
+            sys.exit(1)
+    elif args.command == "columnar":
+        print(json.dumps(bench_columnar(args.events), indent=2, ensure_ascii=False))
+    elif args.command == "records":
+        print(json.dumps(bench_records(args.events), indent=2, ensure_ascii=False))
+    elif args.command == "synthesis":
+        print(json.dumps(bench_synthesis(args.events), indent=2, ensure_ascii=False))
+    elif args.command == "incremental":
+        print(json.dumps(bench_incremental(args.events, args.delta), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Unit tests for learnings_manager.py
+
+Run with: python -m pytest tests/python/test_learnings_manager.py -v
+Or:       python tests/python/test_learnings_manager.py
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add tools directory to path
+TOOLS_DIR = Path(__file__).parent.parent.parent / "plugins" / "asha" / "tools"
+sys.path.insert(0, str(TOOLS_DIR))
+
+import learnings_manager
+
+
+class LearningsManagerTestCase(unittest.TestCase):
+    """Base class: learnings.md in a fresh temporary directory"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="learnings_manager_test_")
+        self.path = Path(self.temp_dir) / ".asha" / "learnings.md"
+        self.patcher = patch.object(learnings_manager, "LEARNINGS_PATH", self.path)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _candidate(self, learning_id, category="Workflow", reason="Observed"):
+        return {"category": category, "id": learning_id, "trigger": f"When {learning_id}",
+                "action": f"Do {learning_id}", "reason": reason}
+
+
+class TestApplyLearnings(LearningsManagerTestCase):
+    """Test batched learning ingestion"""
+
+    def test_matches_sequential_adds(self):
+        """A batch leaves learnings.md as the same add_learning() calls would"""
+        candidates = [self._candidate("alpha"), self._candidate("beta", "Tool Usage"),
+                      self._candidate("alpha", reason="Again")] + \
+                     [self._candidate("gamma", reason=f"Seen {i}") for i in range(8)]
+
+        for candidate in candidates:
+            learnings_manager.add_learning(candidate["category"], candidate["id"], candidate["trigger"],
+                                           candidate["action"], "proj", candidate["reason"])
+        sequential = self.path.read_text()
+        self.path.unlink()
+
+        result = learnings_manager.apply_learnings(candidates, "proj")
+        self.assertEqual(self.path.read_text(), sequential)
+        self.assertEqual((result["created"], result["updated"], result["unchanged"]), (3, 8, 0))
+        self.assertEqual([r["status"] for r in result["results"][:3]], ["created", "created", "updated"])
+
+    def test_one_parse_and_one_write(self):
+        """The whole batch costs a single read and a single write"""
+        learnings_manager.add_learning("Workflow", "alpha", "t", "a", "proj", "r")
+        reads, writes = [], []
+        result = learnings_manager.apply_learnings(
+            [self._candidate("alpha")] + [self._candidate(f"new-{i}") for i in range(20)], "proj",
+            read=lambda: reads.append(1) or self.path.read_text(), write=writes.append)
+        self.assertEqual((len(reads), len(writes)), (1, 1))
+        self.assertEqual((result["created"], result["updated"]), (20, 1))
+        self.assertIn("### new-19", writes[0])
+
+    def test_unchanged_confirms_skip_write(self):
+        """Confirms that do not change the persisted entry leave the file alone"""
+        self.path.parent.mkdir(parents=True)
+        learnings_manager.add_learning("Workflow", "alpha", "t", "a", "proj", "r")
+        learnings = learnings_manager.parse_learnings()
+        learning = learnings["Workflow"][0]
+        learning.confidence = 0.9
+        for _ in range(5):
+            learning.add_evidence("proj", "Observed", "confirm")
+        learnings_manager.write_learnings(learnings)
+
+        writes = []
+        result = learnings_manager.apply_learnings([self._candidate("alpha"), {"id": "broken"}], "proj",
+                                                   write=writes.append)
+        self.assertEqual(writes, [])
+        self.assertEqual((result["unchanged"], result["skipped"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+Unit tests for pattern_analyzer.py
+
+Run with: python -m pytest tests/python/test_pattern_analyzer.py -v
+Or:       python tests/python/test_pattern_analyzer.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add tools directory to path
+TOOLS_DIR = Path(__file__).parent.parent.parent / "plugins" / "asha" / "tools"
+sys.path.insert(0, str(TOOLS_DIR))
+
+
+def days_ago(days: int, seconds: int = 0) -> str:
+    return (datetime.now() - timedelta(days=days) + timedelta(seconds=seconds)).isoformat() + "Z"
+
+
+class PatternAnalyzerTestCase(unittest.TestCase):
+    """Base class: fresh project directory and module import per test"""
+
+    def setUp(self):
+        """Create a temporary project with Memory/events/"""
+        self.temp_dir = tempfile.mkdtemp(prefix="pattern_analyzer_test_")
+        self.project = Path(self.temp_dir)
+        (self.project / "Memory" / "events").mkdir(parents=True)
+        self.pa = self._import("pattern_analyzer")
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _import(self, name, backend="jsonl"):
+        """Import a tool module with mocked project root"""
+        if name in sys.modules:
+            del sys.modules[name]
+        env = {"CLAUDE_PROJECT_DIR": self.temp_dir, "ASHA_EVENT_BACKEND": backend}
+        with patch.dict(os.environ, env):
+            module = __import__(name)
+            # Resolve the backend while the env is patched
+            for store in (module, getattr(module, "event_store", None)):
+                if hasattr(store, "get_event_backend"):
+                    store.get_event_backend()
+            return module
+
+    def _write_events(self, events):
+        with open(self.pa.EVENTS_FILE, "a") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+
+    def _event(self, timestamp, session_id="s1", subtype="command", **payload):
+        return {
+            "id": f"evt_{timestamp}", "timestamp": timestamp, "session_id": session_id,
+            "type": "event", "subtype": subtype, "payload": payload
+        }
+
+    def _history(self):
+        events = [
+            self._event(days_ago(0, 1), subtype="decision", detail="Please add a feature flag"),
+            self._event(days_ago(0, 2), subtype="error", error="exit 1: pytest"),
+            self._event(days_ago(0, 3), subtype="file_modified", file_path="src/app.py"),
+            self._event(days_ago(0, 4), subtype="agent_deployed", agent_type="code-reviewer"),
+            self._event(days_ago(0, 5), subtype="command", command="/asha:save"),
+            self._event(days_ago(0, 6), subtype="session_end"),
+        ]
+        for event in events:
+            event["metadata"] = {"tool_name": "Edit", "project_dir": str(self.project), "source": "hook"}
+        events[1]["metadata"]["tool_name"] = "Bash"
+        return events
+
+
+class TestLoadEvents(PatternAnalyzerTestCase):
+    """Test event loading across the live log and rotated archives"""
+
+    def test_reads_rotated_archives(self):
+        """Test that events rotated into compressed archives are still loaded"""
+        self._write_events([self._event(days_ago(45, i), session_id="old") for i in range(3)])
+        self._write_events([self._event(days_ago(1), session_id="new")])
+        es = self._import("event_store")
+        self.assertEqual(es.rotate_events(days_threshold=30)["archived"], 3)
+
+        events = self.pa.load_events(days=60)
+        self.assertEqual([e["session_id"] for e in events], ["old", "old", "old", "new"])
+        self.assertEqual(len(self.pa.load_events(days=7)), 1)
+        self.assertEqual(len(self.pa.load_events(session_id="old", days=60)), 3)
+
+    def test_skips_months_before_window(self):
+        """Test that archive months older than the window are not opened"""
+        archive_dir = self.pa.ARCHIVE_DIR
+        archive_dir.mkdir()
+        (archive_dir / "events-2000-01.jsonl.gz").write_bytes(b"not gzip at all")
+        (archive_dir / "events-2000-01.jsonl").write_text("{}\n")
+        self._write_events([self._event(days_ago(0))])
+
+        real_open = open
+        opened = []
+
+        def tracking_open(path, *args, **kwargs):
+            opened.append(Path(path).name)
+            return real_open(path, *args, **kwargs)
+
+        with patch("builtins.open", side_effect=tracking_open):
+            events = self.pa.load_events(days=7)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(opened, ["events.jsonl"])
+
+
+class TestEventRecords(PatternAnalyzerTestCase):
+    """Test the compact event records used by synthesis"""
+
+    def test_record_mirrors_event_dict(self):
+        """Test that records expose the fields synthesis reads, and only those"""
+        event = self._history()[1]
+        record = self.pa.EventRecord.from_dict(event)
+
+        self.assertEqual(record["payload"], {"error": "exit 1: pytest"})
+        self.assertEqual(record.get("metadata", {}).get("tool_name"), "Bash")
+        self.assertEqual(record.get("missing", "default"), "default")
+        with self.assertRaises(KeyError):
+            record["metadata_extra"]
+        self.assertEqual(record.to_dict(), dict(event, metadata={"tool_name": "Bash"}))
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_strings_interned_and_payload_lazy(self):
+        """Test that repeated strings are shared and payloads are decoded on access"""
+        self._write_events(self._history())
+        records = self.pa.load_event_records(days=1)
+        self.assertIs(records[0].session_id, records[-1].session_id)
+        self.assertIs(records[2].tool_name, records[3].tool_name)
+        self.assertIsInstance(records[2]._payload, str)
+        self.assertEqual(records[-1].payload, {})
+
+    def test_synthesis_matches_dicts(self):
+        """Test that synthesis over records gives the same sections as over dicts"""
+        self._write_events(self._history())
+        dicts = self.pa.load_events(days=1)
+        records = self.pa.load_event_records(days=1)
+        self.assertEqual([r.id for r in records], [e["id"] for e in dicts])
+
+        for func in (self.pa.synthesize_accomplishments, self.pa.synthesize_blockers,
+                     self.pa.synthesize_next_steps, self.pa.detect_learnable_patterns,
+                     self.pa.extract_calibration_signals, self.pa.classify_task_type):
+            self.assertEqual(func(records), func(dicts), func.__name__)
+        self.assertEqual(self.pa.evaluate_session(records, "s1")["criteria"],
+                         self.pa.evaluate_session(dicts, "s1")["criteria"])
+
+
+class TestExtractorEngine(PatternAnalyzerTestCase):
+    """Test the single-pass extractor engine behind synthesis"""
+
+    def test_shared_analysis_matches_own_passes(self):
+        """Test that outputs from one shared analysis equal each function's own pass"""
+        events = self._history() + [self._event(days_ago(0, 7), subtype="agent_deployed", agent_type="tdd-runner")]
+        analysis = self.pa.analyze_events(events)
+        self.assertEqual(analysis["subtype_counts"]["agent_deployed"], 2)
+        self.assertEqual(analysis["agent_pairs"], {("code-reviewer", "tdd-runner"): 1})
+
+        for func in (self.pa.synthesize_accomplishments, self.pa.synthesize_blockers,
+                     self.pa.synthesize_next_steps, self.pa.detect_learnable_patterns,
+                     self.pa.extract_calibration_signals, self.pa.classify_task_type,
+                     self.pa.extract_tool_sequences, self.pa.extract_error_patterns):
+            self.assertEqual(func(events, analysis), func(events), func.__name__)
+
+    def test_payload_decoded_at_most_once(self):
+        """Test that each payload is decoded once, and only for subscribed subtypes"""
+        decoded = []
+
+        class CountingRecord(self.pa.EventRecord):
+            __slots__ = ()
+
+            @property
+            def payload(self):
+                decoded.append(self.id)
+                return super().payload
+
+        records = [CountingRecord.from_dict(event) for event in self._history()]
+        self.pa.analyze_events(records)
+        self.assertEqual(sorted(decoded), sorted(set(decoded)))
+        self.assertNotIn(records[-1].id, decoded)  # session_end: no extractor wants it
+
+    def test_run_synthesis_makes_one_pass(self):
+        """Test that the full pipeline feeds each event to the extractors exactly once"""
+        history = self._history()
+        self._write_events(history)
+        fed = []
+        real_feed = self.pa._feed_extractors
+
+        def counting_feed(events, extractors, start=0):
+            fed.extend(event.id for event in events)
+            return real_feed(events, extractors, start)
+
+        with patch.object(self.pa, "_feed_extractors", side_effect=counting_feed), \
+                patch.object(self.pa, "add_learnings_via_manager"), \
+                patch.object(self.pa, "append_to_voice"), patch.object(self.pa, "append_to_keeper"):
+            result = self.pa.run_synthesis(days=1)
+            self.assertEqual(result["events_processed"], 6)
+            self.assertEqual(result["eval"]["task_type"], "feature")
+            self.assertEqual(sorted(fed), sorted(e["id"] for e in history))
+            self.assertIn("src/app.py", self.pa.ACTIVE_CONTEXT.read_text())
+
+            fed.clear()
+            self.assertEqual(self.pa.run_synthesis(session_id="s1", days=1)["events_processed"], 6)
+            self.assertEqual(len(fed), 6)
+
+
+class TestLearnablePatterns(PatternAnalyzerTestCase):
+    """Test error→resolution and hand-off detection"""
+
+    def _session(self, subtypes):
+        payloads = {"error": {"error": "boom"}, "file_modified": {"file_path": "src/fix.py"},
+                    "agent_deployed": {"agent_type": "planner"}}
+        return [self._event(days_ago(0, i), subtype=subtype, **payloads.get(subtype, {}))
+                for i, subtype in enumerate(subtypes)]
+
+    def test_resolution_window_bounds(self):
+        """Test that an edit resolves the errors at most RESOLUTION_WINDOW events before it"""
+        window = self.pa.RESOLUTION_WINDOW
+        fillers = ["command"] * (window - 1)
+        events = self._session(["error", "error", *fillers, "file_modified", "error", *fillers, "command", "file_modified"])
+        resolutions = self.pa.analyze_events(events)["resolutions"]["resolutions"]
+        # The first error is window + 1 events before the edit; the last is one too many
+        self.assertEqual(resolutions, [("unknown", "boom", "src/fix.py")])
+
+    def test_handoffs_need_clean_gap(self):
+        """Test that agent hand-offs count only without an error between deployments"""
+        events = self._session(["agent_deployed", "command", "agent_deployed", "error", "agent_deployed"])
+        self.assertEqual(self.pa.analyze_events(events)["resolutions"]["handoffs"], [("planner", "planner")])
+
+    def test_pending_errors_bounded(self):
+        """Test that a long run of errors without edits keeps only the window in memory"""
+        extractor = self.pa.ResolutionWindows()
+        for index in range(10000):
+            extractor.feed(index, {"subtype": "error"}, {"error": "boom"})
+        self.assertLessEqual(len(extractor.pending), self.pa.RESOLUTION_WINDOW + 1)
+        extractor.feed(10000, {"subtype": "file_modified"}, {"file_path": "a.py"})
+        self.assertEqual(len(extractor.result()["resolutions"]), self.pa.RESOLUTION_WINDOW)
+
+
+class TestPatternMatcher(PatternAnalyzerTestCase):
+    """Test the compiled pattern tables shared by calibration and task typing"""
+
+    def test_priority_and_all(self):
+        """Test that first() honours table order and all() lists every category"""
+        matcher = self.pa.PatternMatcher([(r"\bfix\b", "bugfix"), (r"(", "broken"), (r"\badd\b", "feature")])
+        self.assertEqual(len(matcher.patterns), 2)
+        self.assertEqual(matcher.first("add a FIX"), "bugfix")
+        self.assertEqual(matcher.all("add a fix"), ["bugfix", "feature"])
+        self.assertIsNone(matcher.first("nothing here"))
+
+    def test_config_extends_tables(self):
+        """Test that user pattern tables from config are appended to the built-ins"""
+        config = self.project / ".asha" / "config.json"
+        config.parent.mkdir()
+        config.write_text(json.dumps({
+            "voicePatterns": [["(skip|drop) the (preamble|recap)", "style"], "malformed"],
+            "taskTypePatterns": {"release": [r"\b(release|publish)\b"]}
+        }))
+        with patch.object(self.pa, "PATTERN_CONFIG_FILES", (config,)):
+            self.pa._matchers.clear()
+            self.assertEqual(self.pa.get_matcher("voice").first("please skip the preamble"), "style")
+            self.assertEqual(self.pa.get_matcher("voice").first("too wordy"), "tone")
+
+            events = [self._event(days_ago(0), subtype="decision", detail="Publish 2.0 today")]
+            self.assertEqual(self.pa.classify_task_type(events), "release")
+            events[0]["payload"]["detail"] = "Fix and publish"
+            self.assertEqual(self.pa.classify_task_type(events), "bugfix")
+
+
+class TestEvalIndex(PatternAnalyzerTestCase):
+    """Test the eval history index and its rolling aggregates"""
+
+    def _result(self, i, days=0):
+        # Seconds after midnight, so a run near midnight keeps each batch on one day
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            "session_id": f"s{i}", "timestamp": (midnight - timedelta(days=days, seconds=-i)).isoformat(),
+            "task_type": ["feature", "bugfix", "research"][i % 3],
+            "score": round((i % 10) / 10, 2), "passed": i % 10 >= 6, "criteria": []
+        }
+
+    def _expected(self, results):
+        by_type = {}
+        for r in results:
+            counts = by_type.setdefault(r["task_type"], {"total": 0, "passed": 0})
+            counts["total"] += 1
+            counts["passed"] += r["passed"]
+        passed = sum(r["passed"] for r in results)
+        return (len(results), passed, round(passed / len(results), 2),
+                round(sum(r["score"] for r in results) / len(results), 2), by_type)
+
+    def _actual(self, stats):
+        by_type = {t: {"total": c["total"], "passed": c["passed"]} for t, c in stats["by_task_type"].items()}
+        return stats["total"], stats["passed"], stats["pass_rate"], stats["avg_score"], by_type
+
+    def test_windows_match_recompute(self):
+        """Test session, day and all-time aggregates against the raw history"""
+        results = [self._result(i, days=3) for i in range(40)] + [self._result(i) for i in range(40, 130)]
+        for result in results:
+            self.pa.save_eval_result(result)
+
+        self.assertEqual(self._actual(self.pa.get_eval_stats()), self._expected(results[-100:]))
+        self.assertEqual(self._actual(self.pa.get_eval_stats(sessions=7)), self._expected(results[-7:]))
+        self.assertEqual(self._actual(self.pa.get_eval_stats(sessions=500)), self._expected(results))
+        self.assertEqual(self._actual(self.pa.get_eval_stats(days=1)), self._expected(results[40:]))
+        self.assertEqual(self.pa.get_eval_stats()["all_time"]["total"], 130)
+        self.assertEqual([day["total"] for day in self.pa.get_eval_trend(days=7)], [40, 90])
+
+    def test_history_read_from_tail(self):
+        """Test that history is read back from the end, skipping a torn last line"""
+        results = [self._result(i) for i in range(50)]
+        with open(self.pa.EVAL_RESULTS_FILE, "w") as f:
+            f.writelines(json.dumps(r) + "\n" for r in results)
+            f.write('{"session_id": "s5')
+        self.assertEqual(self.pa.get_eval_history(limit=3), results[-3:])
+        self.assertEqual(self.pa.get_eval_history(limit=500), results)
+
+    def test_index_follows_history_file(self):
+        """Test that lines appended directly are folded in and a rewrite rebuilds"""
+        self.pa.save_eval_result(self._result(6))
+        with open(self.pa.EVAL_RESULTS_FILE, "a") as f:
+            f.write(json.dumps(self._result(7)) + "\n")
+        self.assertEqual(self.pa.get_eval_stats()["total"], 2)
+        self.assertEqual(json.loads(self.pa.EVAL_INDEX_FILE.read_text())["position"]["offset"],
+                         self.pa.EVAL_RESULTS_FILE.stat().st_size)
+
+        self.pa.EVAL_RESULTS_FILE.write_text(json.dumps(self._result(1)) + "\n")
+        stats = self.pa.get_eval_stats()
+        self.assertEqual((stats["total"], stats["passed"], stats["all_time"]["total"]), (1, 0, 1))
+
+
+class TestStagedOutput(PatternAnalyzerTestCase):
+    """Test the write-coalescing output layer"""
+
+    def test_coalesces_and_skips_unchanged(self):
+        """Test that writes land once at commit and unchanged files are left alone"""
+        target = self.project / "Memory" / "out.md"
+        log = self.project / "Memory" / "out.jsonl"
+        with self.pa.staged_output() as output:
+            self.pa.write_output(target, "lastUpdated: 1\nfirst\n", self.pa.ACTIVE_CONTEXT_VOLATILE)
+            self.pa.write_output(target, "lastUpdated: 2\nbody\n", self.pa.ACTIVE_CONTEXT_VOLATILE)
+            self.pa.append_output(log, "a\n")
+            self.pa.append_output(log, "b\n")
+            self.assertEqual(self.pa.read_output(target), "lastUpdated: 2\nbody\n")
+            self.assertFalse(target.exists())
+        self.assertEqual(output.report["bytes_written"], len("lastUpdated: 2\nbody\n") + 4)
+        self.assertEqual((target.read_text(), log.read_text()), ("lastUpdated: 2\nbody\n", "a\nb\n"))
+
+        with self.pa.staged_output() as output:
+            self.pa.write_output(target, "lastUpdated: 3\nbody\n", self.pa.ACTIVE_CONTEXT_VOLATILE)
+        self.assertEqual(output.report["files_unchanged"], [str(target)])
+        self.assertEqual(target.read_text(), "lastUpdated: 2\nbody\n")
+
+        with self.assertRaises(RuntimeError), self.pa.staged_output():
+            self.pa.write_output(target, "discarded\n")
+            raise RuntimeError("synthesis failed")
+        self.assertEqual(target.read_text(), "lastUpdated: 2\nbody\n")
+
+    def test_failed_write_is_reported(self):
+        """Test that a file that can't be replaced is reported, the rest land and callbacks wait"""
+        memory = self.project / "Memory"
+        real_replace = os.replace
+        called = []
+
+        def failing_replace(src, dst):
+            if Path(dst).name == "a.md":
+                raise FileNotFoundError(src)
+            return real_replace(src, dst)
+
+        with patch.object(self.pa.os, "replace", failing_replace), self.pa.staged_output() as output:
+            self.pa.write_output(memory / "a.md", "a\n")
+            self.pa.write_output(memory / "b.md", "b\n")
+            self.pa.after_output(lambda: called.append(1))
+        self.assertEqual(list(output.report["files_failed"]), [str(memory / "a.md")])
+        self.assertEqual(((memory / "b.md").read_text(), called), ("b\n", []))
+        self.assertEqual([p.name for p in memory.iterdir() if p.name.endswith(".tmp")], [])
+
+    def test_commits_are_serialized(self):
+        """Test that a commit waits for another run's commit to finish"""
+        import fcntl
+        import threading
+
+        target = self.project / "Memory" / "out.md"
+        self.pa.SYNTHESIS_LOCK.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.pa.SYNTHESIS_LOCK, 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            writer = threading.Thread(target=self.pa.write_output, args=(target, "body\n"))
+            writer.start()
+            writer.join(0.2)
+            self.assertFalse(target.exists())
+        writer.join(5)
+        self.assertEqual(target.read_text(), "body\n")
+
+    def test_learnings_written_once_per_run(self):
+        """Test that every learning candidate of a run shares one learnings.md write"""
+        home = self.project / "home"
+        candidates = [{"category": "Workflow", "id": f"learning-{i}", "trigger": "t", "action": "a",
+                       "reason": "r"} for i in range(3)]
+        replaced = []
+        real_replace = os.replace
+
+        def tracking_replace(src, dst):
+            replaced.append(Path(dst).name)
+            return real_replace(src, dst)
+
+        with patch.dict(os.environ, {"HOME": str(home)}), patch.object(self.pa.os, "replace", tracking_replace):
+            self.pa.add_learnings_via_manager(candidates)
+        self.assertEqual(replaced, ["learnings.md"])
+        text = (home / ".asha" / "learnings.md").read_text()
+        self.assertTrue(all(f"### learning-{i}" in text for i in range(3)))
+
+
+class TestIncrementalSynthesis(PatternAnalyzerTestCase):
+    """Test the checkpointed, delta-only synthesis over all sessions"""
+
+    def _activity(self, days, count, start=0):
+        subtypes = ["file_modified", "agent_deployed", "error", "command", "file_created"]
+        payloads = {"file_modified": {"file_path": "src/app.py"}, "file_created": {"file_path": "docs/new.md"},
+                    "agent_deployed": {"agent_type": "planner"}, "error": {"error": "boom"},
+                    "command": {"command": "/asha:save"}}
+        events = []
+        for i in range(start, start + count):
+            subtype = subtypes[i % len(subtypes)]
+            event = self._event(days_ago(days, i), session_id=f"s{days}", subtype=subtype, **payloads[subtype])
+            event["id"] = f"evt_{days}_{i}"
+            event["metadata"] = {"tool_name": "Edit"}
+            events.append(event)
+        return events
+
+    def _window(self, analysis):
+        return {name: analysis[name] for name in self.pa.WINDOW_EXTRACTORS + ("subtype_counts",)}
+
+    def test_folds_only_new_events(self):
+        """Test that a second run reads only appended events and matches a rebuild"""
+        self._write_events(self._activity(2, 30) + self._activity(0, 10))
+        events, _, checkpoint, changed = self.pa.update_checkpoint(None, days=7)
+        self.assertEqual((len(events), changed), (40, True))
+        checkpoint = json.loads(json.dumps(checkpoint))  # as stored in patterns.json
+
+        self._write_events(self._activity(0, 15, start=10))
+        events, analysis, checkpoint, changed = self.pa.update_checkpoint(checkpoint, days=7)
+        self.assertEqual([e.id for e in events], [f"evt_0_{i}" for i in range(10, 25)])
+        self.assertTrue(changed)
+
+        _, rebuilt, _, _ = self.pa.update_checkpoint(None, days=7)
+        self.assertEqual(self._window(analysis), self._window(rebuilt))
+        self.assertEqual(sum(analysis["subtype_counts"].values()), 55)
+
+        events, _, _, changed = self.pa.update_checkpoint(checkpoint, days=7)
+        self.assertEqual((events, changed), ([], False))
+
+    def test_expires_days_leaving_window(self):
+        """Test that a day's state is dropped once it slides out of the window"""
+        self._write_events(self._activity(2, 5) + self._activity(0, 5))
+        _, analysis, checkpoint, _ = self.pa.update_checkpoint(None, days=3)
+        self.assertEqual(len(checkpoint["buckets"]), 2)
+
+        later = datetime.now() + timedelta(days=2)
+        with patch.object(self.pa, "datetime") as clock:
+            clock.now.return_value = later
+            events, analysis, checkpoint, changed = self.pa.update_checkpoint(checkpoint, days=3)
+        self.assertEqual((events, changed), ([], True))
+        self.assertEqual(list(checkpoint["buckets"]), [days_ago(0)[:10]])
+        self.assertEqual(sum(analysis["subtype_counts"].values()), 5)
+
+    def test_resumes_after_rotation(self):
+        """Test that a replaced events.jsonl is re-read by timestamp, without duplicates"""
+        self._write_events(self._activity(45, 5) + self._activity(0, 5))
+        _, _, checkpoint, _ = self.pa.update_checkpoint(None, days=60)
+
+        es = self._import("event_store")
+        self.assertEqual(es.rotate_events(days_threshold=30)["archived"], 5)
+        self._write_events(self._activity(0, 3, start=5))
+
+        events, analysis, checkpoint, _ = self.pa.update_checkpoint(checkpoint, days=60)
+        self.assertEqual([e.id for e in events], ["evt_0_5", "evt_0_6", "evt_0_7"])
+        _, rebuilt, _, _ = self.pa.update_checkpoint(None, days=60)
+        self.assertEqual(self._window(analysis), self._window(rebuilt))
+
+    def test_late_stamped_event_survives_rotation(self):
+        """Test that an event appended after the checkpoint with an older timestamp is still read"""
+        self._write_events(self._activity(45, 5) + self._activity(0, 5, start=60))
+        _, _, checkpoint, _ = self.pa.update_checkpoint(None, days=60)
+
+        # Stamped a minute before the newest event already folded in
+        self._write_events(self._activity(0, 1, start=0))
+        es = self._import("event_store")
+        es.rotate_events(days_threshold=30)
+
+        events, _, checkpoint, _ = self.pa.update_checkpoint(checkpoint, days=60)
+        self.assertEqual([e.id for e in events], ["evt_0_0"])
+        self.assertEqual(self.pa.update_checkpoint(checkpoint, days=60)[0], [])
+
+    def test_unchanged_window_not_rewritten(self):
+        """Test that synthesis with nothing new leaves activeContext.md alone"""
+        self._write_events(self._activity(0, 10))
+        with patch.object(self.pa, "add_learnings_via_manager"):
+            first = self.pa.run_synthesis(days=1, skip_eval=True)
+            self.assertEqual((first["status"], first["events_new"]), ("success", 10))
+            self.pa.ACTIVE_CONTEXT.write_text("kept")
+
+            second = self.pa.run_synthesis(days=1, skip_eval=True)
+            self.assertEqual((second["status"], second["events_new"]), ("up_to_date", 0))
+            self.assertEqual(self.pa.ACTIVE_CONTEXT.read_text(), "kept")
+
+            rebuilt = self.pa.run_synthesis(days=1, skip_eval=True, full=True)
+            self.assertEqual((rebuilt["status"], rebuilt["events_new"]), ("success", 10))
+        self.assertIn("checkpoint", json.loads(self.pa.PATTERNS_FILE.read_text()))
+
+    def test_learnings_only_from_new_events(self):
+        """Test that a run confirms no learnings for events an earlier run already saw"""
+        self._write_events(self._activity(0, 25))
+        with patch.object(self.pa, "add_learnings_via_manager") as add:
+            self.pa.run_synthesis(days=1, skip_eval=True)
+            self.assertIn("prefer-edit", [c["id"] for c in add.call_args[0][0]])
+            add.reset_mock()
+
+            self._write_events(self._activity(0, 1, start=25))
+            self.assertEqual(self.pa.run_synthesis(days=1, skip_eval=True)["events_new"], 1)
+        candidates = add.call_args[0][0] if add.called else []
+        self.assertNotIn("prefer-edit", [c["id"] for c in candidates])
+
+
+class TestBackfill(PatternAnalyzerTestCase):
+    """Test multi-session backfill"""
+
+    def _sessions(self, count=4):
+        events = []
+        for s in range(count):
+            for event in self._history():
+                event["session_id"] = f"s{s}"
+                event["id"] = f"{event['id']}_{s}"
+                event["timestamp"] = days_ago(count - s) if event["subtype"] == "decision" else event["timestamp"]
+                events.append(event)
+        self._write_events(events)
+
+    def _run(self, **kwargs):
+        for path in (self.pa.EVAL_RESULTS_FILE, self.pa.EVAL_INDEX_FILE, self.pa.PATTERNS_FILE):
+            path.unlink(missing_ok=True)
+        with patch.object(self.pa, "add_learnings_via_manager") as add:
+            result = self.pa.backfill(**kwargs)
+        evals = [json.loads(line) for line in self.pa.EVAL_RESULTS_FILE.read_text().splitlines()]
+        for record in evals:
+            del record["timestamp"]
+        candidates = add.call_args[0][0] if add.called else []
+        return result, evals, candidates, self.pa.load_existing_patterns()["patterns"]
+
+    def test_deterministic_across_workers(self):
+        """Test that a process pool merges to the same outcome as one worker"""
+        self._sessions()
+        serial = self._run(days=7, workers=1, current_session_id="s3")
+        # Backfill marks the sessions in the ledger it creates
+        self.assertTrue(all(self.pa.session_synthesized(self.pa.load_session_ledger(), s)
+                            for s in ("s0", "s1", "s2")))
+        self.pa.SESSIONS_FILE.unlink()
+        parallel = self._run(days=7, workers=2, current_session_id="s3")
+        self.assertEqual(serial[0]["sessions"], ["s0", "s1", "s2"])
+        self.assertEqual(parallel[0]["workers"], 2)
+        self.assertEqual(serial[1:], parallel[1:])
+        self.assertEqual([record["session_id"] for record in serial[1]], ["s0", "s1", "s2"])
+
+        # Evaluated sessions count as synthesized without a ledger
+        self.pa.SESSIONS_FILE.unlink()
+        with patch.object(self.pa, "add_learnings_via_manager"):
+            self.assertEqual(self.pa.backfill(days=7, current_session_id="s3")["status"], "up_to_date")
+
+    def test_ledger_marks_skip_sessions(self):
+        """Test that sessions synthesis covered are skipped and backfilled ones marked"""
+        self._sessions(2)
+        es = self._import("event_store")
+        es.get_session_ledger()
+        self.pa.mark_synthesized(days_ago(0, 100), "s0")
+
+        result = self._run(days=7, workers=1)[0]
+        self.assertEqual(result["sessions"], ["s1"])
+        ledger = self.pa.load_session_ledger()
+        self.assertTrue(self.pa.session_synthesized(ledger, "s1"))
+
+
+class TestOrphanCheck(PatternAnalyzerTestCase):
+    """Test orphaned-session detection"""
+
+    def test_last_session_found_after_rotation(self):
+        """Test that a fully rotated log still yields the last session"""
+        self._write_events([self._event(days_ago(45, i), session_id=f"s{i}") for i in range(3)])
+        es = self._import("event_store")
+        es.rotate_events(days_threshold=30)
+        self.assertEqual(self.pa.EVENTS_FILE.read_text(), "")
+
+        self.assertEqual(self.pa.get_last_session_id(), "s2")
+        self.assertIsNone(self.pa.check_orphaned_session("s2"))
+
+    def test_live_log_wins(self):
+        """Test that the live log is preferred over archives"""
+        self._write_events([self._event(days_ago(1), session_id="live")])
+        self.assertEqual(self.pa.get_last_session_id(), "live")
+        self.assertEqual(self.pa.check_orphaned_session("current"), "live")
+
+    def test_ledger_lookup_and_synthesis_marks(self):
+        """Test that the ledger answers without reading the log and tracks synthesis"""
+        es = self._import("event_store")
+        appender = es.EventAppender()
+        appender.write([es.build_event("event", "command", {"command": "ls"}, session_id="prev")])
+
+        with patch.object(self.pa, "get_last_session_id", side_effect=AssertionError("scanned")), \
+                patch.object(self.pa, "load_event_records", side_effect=AssertionError("scanned")):
+            self.assertEqual(self.pa.check_orphaned_session("current"), "prev")
+            self.assertIsNone(self.pa.check_orphaned_session("prev"))
+
+        with patch.object(self.pa, "add_learnings_via_manager"):
+            self.assertTrue(self.pa.recover_session("prev")["recovered"])
+            self.assertIsNone(self.pa.check_orphaned_session("current"))
+            self.assertEqual(self.pa.recover_session("prev")["status"], "already_synthesized")
+
+            # New events reopen it until synthesis over all sessions covers them
+            appender.write([es.build_event("event", "command", {"command": "pwd"}, session_id="prev")])
+            self.assertEqual(self.pa.check_orphaned_session("current"), "prev")
+            self.pa.run_synthesis(days=1, skip_eval=True)
+            self.assertIsNone(self.pa.check_orphaned_session("current"))
+        appender.close()
+
+    def test_ledger_catches_up_with_log(self):
+        """Test that appends the ledger has not saved are read from the log tail"""
+        es = self._import("event_store")
+        es.emit_many([{"type": "event", "subtype": "command", "payload": {}}])
+        self._write_events([self._event(days_ago(0), session_id="unrecorded")])
+        self.assertEqual(self.pa.load_session_ledger()["last_session"], "unrecorded")
+        with patch.object(self.pa, "get_last_session_id", side_effect=AssertionError("scanned log")):
+            self.assertEqual(self.pa.check_orphaned_session("current"), "unrecorded")
+
+
+
+class TestSqliteBackend(PatternAnalyzerTestCase):
+    """Test synthesis over the SQLite event store"""
+
+    def setUp(self):
+        super().setUp()
+        self.pa = self._import("pattern_analyzer", backend="sqlite")
+        self.es = self._import("event_store", backend="sqlite")
+
+    def _write_rows(self, events):
+        writer = self.es.SqliteEventWriter()
+        writer.write(events)
+        writer.close()
+
+    def test_synthesis_reads_events_db(self):
+        """Test that synthesis, orphan checks and backfill see events only in events.db"""
+        self._write_rows(self._history())
+        self.assertFalse(self.pa.EVENTS_FILE.exists())
+
+        with patch.object(self.pa, "add_learnings_via_manager"):
+            first = self.pa.run_synthesis(days=1, skip_eval=True)
+            self.assertEqual((first["status"], first["events_new"]), ("success", 6))
+            self.assertEqual(self.pa.run_synthesis(days=1, skip_eval=True)["status"], "up_to_date")
+
+            self._write_rows([self._event(days_ago(0, 10), session_id="s2", subtype="file_created",
+                                          file_path="notes.md")])
+            self.assertEqual(self.pa.run_synthesis(days=1, skip_eval=True)["events_new"], 1)
+
+            self.assertEqual(self.pa.get_last_session_id(), "s2")
+            self.assertEqual(self.pa.check_orphaned_session("current"), "s2")
+            self.assertEqual(self.pa.backfill(days=7, workers=1, current_session_id="s2")["sessions"], ["s1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,7 +19,17 @@ SKIPPED=0
 
 # Create temp directory for test environment
 TEST_DIR=$(mktemp -d)
-trap "rm -rf $TEST_DIR" EXIT
+
+cleanup() {
+    # Stop the emitter daemons SessionStart started in test projects
+    local socket
+    while IFS= read -r socket; do
+        CLAUDE_PROJECT_DIR="${socket%/Work/markers/emitter.sock}" \
+            python3 "$REPO_ROOT/plugins/asha/tools/event_store.py" daemon stop >/dev/null 2>&1 || true
+    done < <(find "$TEST_DIR" -name emitter.sock 2>/dev/null)
+    rm -rf "$TEST_DIR"
+}
+trap cleanup EXIT
 
 setup_test_project() {
     # Create mock project structure
@@ -195,6 +205,12 @@ else
     echo "  Session file was not created"
     FAILED=$((FAILED + 1))
 fi
+# The decision event is emitted in the background: let it land before the
+# project goes away, or it resolves to whatever project the cwd is in
+for _ in $(seq 50); do
+    [[ -s "$TEST6_DIR/Memory/events/events.jsonl" ]] && break
+    sleep 0.1
+done
 rm -rf "$TEST6_DIR"
 
 # ============================================================================
@@ -2916,11 +2932,72 @@ else
 fi
 
 # ============================================================================
-# Test 104: Total test count matches expected
+# Test 104: run_tool resolves the project from the caller's directory
+# ============================================================================
+echo -n "Test 104: run_tool keeps the caller's working directory... "
+TEST104_DIR=$(mktemp -d)
+mkdir -p "$TEST104_DIR/Memory" "$TEST104_DIR/nested"
+git init -q "$TEST104_DIR" 2>/dev/null || true
+PLUGIN_EVENTS="$REPO_ROOT/Memory/events/events.jsonl"
+PLUGIN_EVENTS_BEFORE=$( (wc -l < "$PLUGIN_EVENTS") 2>/dev/null || echo 0)
+# CLAUDE_PROJECT_DIR without Memory/: the tools fall back to the git root of the cwd
+export CLAUDE_PROJECT_DIR="$TEST104_DIR/nested"
+
+(cd "$TEST104_DIR/nested" && bash -c "
+    source '$COMMON_SH'
+    run_tool event_store.py emit --type event --subtype command --payload '{}' --source hook
+" >/dev/null 2>&1) || true
+PLUGIN_EVENTS_AFTER=$( (wc -l < "$PLUGIN_EVENTS") 2>/dev/null || echo 0)
+
+if [[ -s "$TEST104_DIR/Memory/events/events.jsonl" && "$PLUGIN_EVENTS_AFTER" -eq "$PLUGIN_EVENTS_BEFORE" ]]; then
+    echo -e "${GREEN}PASS${NC}"
+    PASSED=$((PASSED + 1))
+else
+    echo -e "${RED}FAIL${NC}"
+    echo "  Event was not written to the project of the working directory"
+    FAILED=$((FAILED + 1))
+fi
+rm -rf "$TEST104_DIR"
+
+# ============================================================================
+# Test 105: send_to_emitter only counts events the daemon acknowledged
+# ============================================================================
+echo -n "Test 105: send_to_emitter requires the daemon's ack... "
+TEST105_DIR=$(mktemp -d)
+mkdir -p "$TEST105_DIR/Memory" "$TEST105_DIR/Work/markers"
+export CLAUDE_PROJECT_DIR="$TEST105_DIR"
+# A listener that accepts the request but never answers
+python3 -c '
+import socket, sys, time
+s = socket.socket(socket.AF_UNIX)
+s.bind(sys.argv[1])
+s.listen(1)
+conn, _ = s.accept()
+time.sleep(3)' "$TEST105_DIR/Work/markers/emitter.sock" &
+LISTENER_PID=$!
+for _ in $(seq 50); do
+    [[ -S "$TEST105_DIR/Work/markers/emitter.sock" ]] && break
+    sleep 0.1
+done
+
+if bash -c "source '$COMMON_SH'; send_to_emitter event command '{}'"; then
+    echo -e "${RED}FAIL${NC}"
+    echo "  An unanswered send counted as delivered"
+    FAILED=$((FAILED + 1))
+else
+    echo -e "${GREEN}PASS${NC}"
+    PASSED=$((PASSED + 1))
+fi
+kill "$LISTENER_PID" 2>/dev/null || true
+wait "$LISTENER_PID" 2>/dev/null || true
+rm -rf "$TEST105_DIR"
+
+# ============================================================================
+# Test 106: Total test count matches expected
 # ============================================================================
-echo -n "Test 104: Test infrastructure self-check... "
+echo -n "Test 106: Test infrastructure self-check... "
 # This test verifies the test suite is complete
-EXPECTED_TESTS=104
+EXPECTED_TESTS=106
 if [[ $((PASSED + FAILED + SKIPPED + 1)) -eq $EXPECTED_TESTS ]]; then
     echo -e "${GREEN}PASS${NC} ($EXPECTED_TESTS tests)"
     PASSED=$((PASSED + 1))